@@ -1,11 +1,24 @@
-from django.contrib import admin
+import codecs
+
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from django.utils.html import format_html
 
+from .bulk import cancel_sessions, deactivate_slots
+from .forms import TeacherImportUploadForm
+from .imports import TeacherImportError, import_teachers
 from .models import (
     ClassSession,
+    OutboxTask,
+    SessionEvent,
     StudentProfile,
     TeacherAvailabilitySlot,
+    TeacherDailyStats,
     TeacherProfile,
     User,
 )
@@ -33,6 +46,7 @@ class UserAdmin(DjangoUserAdmin):
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "preferred_subject")
+    list_select_related = ("user",)
     search_fields = (
         "user__username",
         "user__first_name",
@@ -44,12 +58,52 @@ class StudentProfileAdmin(admin.ModelAdmin):
 @admin.register(TeacherProfile)
 class TeacherProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "subjects", "hourly_rate")
+    list_select_related = ("user",)
     search_fields = (
         "user__username",
         "user__first_name",
         "user__last_name",
         "subjects",
     )
+    change_list_template = "admin/accounts/teacherprofile/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "importar/",
+                self.admin_site.admin_view(self.import_csv_view),
+                name="accounts_teacherprofile_import",
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_csv_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        result = None
+        form = TeacherImportUploadForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            lines = codecs.iterdecode(form.cleaned_data["file"], "utf-8-sig")
+            try:
+                result = import_teachers(lines, dry_run=form.cleaned_data["dry_run"])
+            except (TeacherImportError, UnicodeDecodeError) as error:
+                form.add_error("file", str(error))
+            else:
+                prefix = "[simulacion] " if form.cleaned_data["dry_run"] else ""
+                self.message_user(
+                    request,
+                    f"{prefix}Profesores importados: {result['created']}. Horarios creados: {result['slots']}. "
+                    f"Filas con errores: {len(result['errors'])}.",
+                    messages.WARNING if result["errors"] else messages.SUCCESS,
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Importar profesores desde CSV",
+            "form": form,
+            "result": result,
+        }
+        return TemplateResponse(request, "admin/accounts/teacherprofile/import_csv.html", context)
 
 
 @admin.register(ClassSession)
@@ -63,13 +117,15 @@ class ClassSessionAdmin(admin.ModelAdmin):
         "status",
         "virtual_room_link",
     )
+    list_select_related = ("teacher", "student")
+    date_hierarchy = "start_time"
+    show_full_result_count = False
+    actions = ("cancel_and_block_slots", "cancel_and_release_slots")
     autocomplete_fields = ("teacher", "student")
     search_fields = (
         "topic",
-        "teacher__user__first_name",
-        "teacher__user__last_name",
-        "student__user__first_name",
-        "student__user__last_name",
+        "teacher__display_name",
+        "student__display_name",
     )
     list_filter = ("status", "start_time")
     readonly_fields = (
@@ -89,21 +145,129 @@ class ClassSessionAdmin(admin.ModelAdmin):
 
     virtual_room_preview.short_description = "Enlace de la sala"
 
+    def cancel_and_block_slots(self, request, queryset):
+        result = cancel_sessions(
+            queryset,
+            block_slots=True,
+            actor=request.user,
+            source=SessionEvent.Source.ADMIN,
+        )
+        self.message_user(
+            request,
+            f"Sesiones canceladas: {result['cancelled']}. Horarios bloqueados: {result['blocked_slots']}.",
+            messages.SUCCESS,
+        )
+
+    cancel_and_block_slots.short_description = "Cancelar sesiones y bloquear sus horarios"
+
+    def cancel_and_release_slots(self, request, queryset):
+        result = cancel_sessions(
+            queryset,
+            block_slots=False,
+            actor=request.user,
+            source=SessionEvent.Source.ADMIN,
+        )
+        self.message_user(
+            request,
+            f"Sesiones canceladas: {result['cancelled']}. Sus horarios vuelven a estar disponibles.",
+            messages.SUCCESS,
+        )
+
+    cancel_and_release_slots.short_description = "Cancelar sesiones y liberar sus horarios"
+
 
 @admin.register(TeacherAvailabilitySlot)
 class TeacherAvailabilitySlotAdmin(admin.ModelAdmin):
     list_display = ("teacher", "start_time", "is_active", "is_slot_available")
     list_filter = ("is_active",)
-    search_fields = (
-        "teacher__user__first_name",
-        "teacher__user__last_name",
-        "teacher__user__username",
-    )
+    list_select_related = ("teacher",)
+    date_hierarchy = "start_time"
+    show_full_result_count = False
+    actions = ("deactivate_free_slots", "deactivate_and_cancel_sessions")
+    search_fields = ("teacher__display_name",)
     autocomplete_fields = ("teacher",)
     ordering = ("start_time",)
 
+    def get_queryset(self, request):
+        scheduled_sessions = ClassSession.objects.filter(
+            slot=OuterRef("pk"),
+            status=ClassSession.Status.SCHEDULED,
+        )
+        return super().get_queryset(request).annotate(has_scheduled_session=Exists(scheduled_sessions))
+
     def is_slot_available(self, obj):
-        return obj.is_available()
+        return obj.is_active and obj.start_time >= timezone.now() and not obj.has_scheduled_session
 
     is_slot_available.boolean = True
     is_slot_available.short_description = "Disponible"
+
+    def deactivate_free_slots(self, request, queryset):
+        result = deactivate_slots(queryset, cancel_sessions=False)
+        self.message_user(
+            request,
+            f"Horarios desactivados: {result['deactivated']}. "
+            f"Horarios reservados sin cambios: {result['skipped_booked']}.",
+            messages.SUCCESS,
+        )
+
+    deactivate_free_slots.short_description = "Desactivar horarios libres"
+
+    def deactivate_and_cancel_sessions(self, request, queryset):
+        result = deactivate_slots(
+            queryset,
+            cancel_sessions=True,
+            actor=request.user,
+            source=SessionEvent.Source.ADMIN,
+        )
+        self.message_user(
+            request,
+            f"Horarios desactivados: {result['deactivated']}. Sesiones canceladas: {result['cancelled']}.",
+            messages.SUCCESS,
+        )
+
+    deactivate_and_cancel_sessions.short_description = "Desactivar horarios y cancelar sus sesiones"
+
+
+@admin.register(OutboxTask)
+class OutboxTaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "updated_at")
+    list_filter = ("status", "name")
+    show_full_result_count = False
+    readonly_fields = ("created_at", "updated_at", "locked_by", "locked_at", "last_error")
+
+
+@admin.register(SessionEvent)
+class SessionEventAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "session_id", "teacher_id", "kind", "from_status", "to_status", "actor", "source")
+    list_filter = ("kind", "source")
+    list_select_related = ("actor",)
+    search_fields = ("=session__id", "=teacher__id")
+    date_hierarchy = "created_at"
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TeacherDailyStats)
+class TeacherDailyStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "day",
+        "teacher",
+        "slots_offered",
+        "slots_booked",
+        "sessions_completed",
+        "sessions_cancelled",
+        "revenue",
+    )
+    list_select_related = ("teacher",)
+    date_hierarchy = "day"
+    show_full_result_count = False
+    search_fields = ("teacher__display_name",)
+    readonly_fields = ("updated_at",)
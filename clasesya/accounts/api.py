@@ -0,0 +1,151 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import DateTimeField, Exists, ExpressionWrapper, F, OuterRef, Q
+from django.utils import timezone
+
+from .models import ClassSession, TeacherAvailabilitySlot, TeacherProfile
+
+CURSOR_SALT = "accounts.api-cursor"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+TEACHER_FIELDS = {
+    "id": "pk",
+    "display_name": "display_name",
+    "subjects": "subjects",
+    "hourly_rate": "hourly_rate",
+    "availability": "availability",
+    "bio": "bio",
+}
+TEACHER_DEFAULT_FIELDS = ("id", "display_name", "subjects", "hourly_rate", "availability")
+TEACHER_ORDERING = ("display_name", "pk")
+
+SLOT_FIELDS = {
+    "id": "pk",
+    "start_time": "start_time",
+    "end_time": "slot_end_time",
+}
+SLOT_DEFAULT_FIELDS = ("id", "start_time", "end_time")
+SLOT_ORDERING = ("start_time", "pk")
+
+SESSION_FIELDS = {
+    "id": "pk",
+    "topic": "topic",
+    "description": "description",
+    "status": "status",
+    "start_time": "start_time",
+    "end_time": "end_time",
+    "teacher_id": "teacher_id",
+    "teacher_name": "teacher__display_name",
+    "student_id": "student_id",
+    "student_name": "student__display_name",
+    "virtual_room_code": "virtual_room_code",
+}
+SESSION_DEFAULT_FIELDS = ("id", "topic", "status", "start_time", "end_time", "teacher_name", "student_name")
+SESSION_ORDERING = ("-start_time", "-pk")
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fields(params, available: dict, default) -> list[str]:
+    raw = params.get("fields")
+    if not raw:
+        return list(default)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown or not fields:
+        raise ApiError(f"Campos desconocidos: {', '.join(unknown) or raw}. Disponibles: {', '.join(available)}.")
+    return list(dict.fromkeys(fields))
+
+
+def parse_limit(params) -> int:
+    raw = params.get("limit")
+    if not raw:
+        return DEFAULT_PAGE_SIZE
+    if not raw.isdecimal() or not 1 <= int(raw) <= MAX_PAGE_SIZE:
+        raise ApiError(f"limit debe ser un entero entre 1 y {MAX_PAGE_SIZE}.")
+    return int(raw)
+
+
+def encode_cursor(values) -> str:
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return signing.dumps(values, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor: str, ordering) -> list:
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ApiError("Cursor invalido.")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ApiError("Cursor invalido.")
+    return values
+
+
+def _after_cursor(ordering, values) -> Q:
+    keyset = Q()
+    for position in reversed(range(len(ordering))):
+        field = ordering[position].lstrip("-")
+        comparison = "lt" if ordering[position].startswith("-") else "gt"
+        condition = Q(**{f"{field}__{comparison}": values[position]})
+        for previous in range(position):
+            condition &= Q(**{ordering[previous].lstrip("-"): values[previous]})
+        keyset |= condition
+    return keyset
+
+
+def paginate(queryset, available: dict, fields, ordering, params) -> dict:
+    limit = parse_limit(params)
+    if params.get("cursor"):
+        queryset = queryset.filter(_after_cursor(ordering, decode_cursor(params["cursor"], ordering)))
+
+    ordering_lookups = [name.lstrip("-") for name in ordering]
+    lookups = list(dict.fromkeys([available[name] for name in fields] + ordering_lookups))
+    rows = list(queryset.order_by(*ordering).values(*lookups)[: limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][lookup] for lookup in ordering_lookups])
+    return {
+        "results": [{name: row[available[name]] for name in fields} for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def render_payload(payload) -> tuple[bytes, str]:
+    body = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False).encode("utf-8")
+    return body, hashlib.md5(body, usedforsecurity=False).hexdigest()
+
+
+def teacher_search_queryset(subject: str, availability):
+    queryset = TeacherProfile.objects.all()
+    if subject:
+        queryset = queryset.filter(subjects__icontains=subject)
+    for option in availability or ():
+        queryset = queryset.filter(availability__icontains=f'"{option}"')
+    return queryset
+
+
+def free_slots_queryset(teacher_id: int):
+    booked = ClassSession.objects.filter(slot=OuterRef("pk"), status=ClassSession.Status.SCHEDULED)
+    return (
+        TeacherAvailabilitySlot.objects.filter(
+            teacher_id=teacher_id,
+            is_active=True,
+            start_time__gte=timezone.now(),
+        )
+        .exclude(Exists(booked))
+        .annotate(
+            slot_end_time=ExpressionWrapper(F("start_time") + timedelta(hours=1), output_field=DateTimeField())
+        )
+    )
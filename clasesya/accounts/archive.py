@@ -0,0 +1,103 @@
+import heapq
+from operator import attrgetter
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .caching import invalidate_session_caches
+from .models import (
+    ArchivedAvailabilitySlot,
+    ArchivedClassSession,
+    ClassSession,
+    SessionReminder,
+    SlotHold,
+    TeacherAvailabilitySlot,
+)
+
+ARCHIVABLE_STATUSES = (ClassSession.Status.COMPLETED, ClassSession.Status.CANCELLED)
+SESSION_FIELDS = (
+    "id",
+    "teacher_id",
+    "student_id",
+    "topic",
+    "description",
+    "start_time",
+    "end_time",
+    "status",
+    "virtual_room_code",
+    "slot_id",
+    "created_at",
+    "updated_at",
+)
+SLOT_FIELDS = ("id", "teacher_id", "start_time", "is_active", "created_at", "updated_at")
+
+
+def _move_rows(queryset, archive_model, fields, batch_size, dependents=()) -> list[dict]:
+    rows = list(queryset.select_for_update().order_by("pk").values(*fields)[:batch_size])
+    if rows:
+        ids = [row["id"] for row in rows]
+        archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+        # _raw_delete skips the ORM cascade, so rows pointing at the moved ones go first.
+        for dependent_model, field in dependents:
+            dependent_model.objects.filter(**{f"{field}__in": ids}).delete()
+        # Archiving moves history instead of deleting it, so post_delete handlers (rollups, caches) must not run.
+        queryset.model.objects.filter(pk__in=ids)._raw_delete(queryset.db)
+    return rows
+
+
+def archive_sessions(cutoff, batch_size: int = 1000) -> dict[str, int]:
+    archived_sessions = 0
+    while True:
+        with transaction.atomic():
+            old_sessions = ClassSession.objects.filter(status__in=ARCHIVABLE_STATUSES, end_time__lt=cutoff)
+            rows = _move_rows(
+                old_sessions,
+                ArchivedClassSession,
+                SESSION_FIELDS,
+                batch_size,
+                dependents=((SessionReminder, "session_id"),),
+            )
+            if not rows:
+                break
+            invalidate_session_caches(
+                {row["teacher_id"] for row in rows},
+                {row["student_id"] for row in rows},
+                [row["id"] for row in rows],
+            )
+        archived_sessions += len(rows)
+
+    archived_slots = 0
+    while True:
+        with transaction.atomic():
+            unused_slots = TeacherAvailabilitySlot.objects.filter(start_time__lt=cutoff).exclude(
+                Exists(ClassSession.objects.filter(slot=OuterRef("pk")))
+            )
+            rows = _move_rows(
+                unused_slots,
+                ArchivedAvailabilitySlot,
+                SLOT_FIELDS,
+                batch_size,
+                dependents=((SlotHold, "slot_id"),),
+            )
+            if not rows:
+                break
+        archived_slots += len(rows)
+
+    return {"sessions": archived_sessions, "slots": archived_slots}
+
+
+def past_sessions(participant_filter: Q, now, limit: int) -> list:
+    hot = list(
+        ClassSession.objects.select_related("teacher", "student")
+        .filter(participant_filter)
+        .exclude(Q(status=ClassSession.Status.SCHEDULED) & Q(start_time__gte=now))
+        .order_by("-start_time")[:limit]
+    )
+    archived = ArchivedClassSession.objects.select_related("teacher", "student").filter(
+        participant_filter
+    )
+    if len(hot) == limit:
+        archived = archived.filter(start_time__gt=hot[-1].start_time)
+    archived = list(archived.order_by("-start_time")[:limit])
+    merged = heapq.merge(hot, archived, key=attrgetter("start_time"), reverse=True)
+    return list(merged)[:limit]
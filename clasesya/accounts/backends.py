@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import hashing_service
+
+UserModel = get_user_model()
+
+
+class PooledHashingBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Like ModelBackend, hash once so unknown usernames take as long as wrong passwords.
+            hashing_service.hash(password)
+            return None
+        is_correct, rehashed = hashing_service.verify(password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if rehashed:
+            user.password = rehashed
+            user.save(update_fields=["password"])
+        return user
@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .caching import delete_on_commit, invalidate_session_caches, session_snapshot_key
+from .events import record_bulk_status_change
+from .feed import publish_session_changes
+from .models import ClassSession, SessionEvent, TeacherAvailabilitySlot
+from .popularity import refresh_next_free_slots
+from .rollups import record_slot_changes
+from .rooms import track_room_revocations
+from .tasks import enqueue_many
+
+
+def _cancel_scheduled(scheduled_sessions, now, actor, source) -> int:
+    rows = list(
+        scheduled_sessions.values_list("pk", "teacher_id", "student_id", "start_time", "end_time").iterator(chunk_size=2000)
+    )
+    enqueue_many("notifications.session_cancelled", ({"session_id": row[0]} for row in rows))
+    publish_session_changes(
+        (session_id, teacher_id, student_id, ClassSession.Status.CANCELLED)
+        for session_id, teacher_id, student_id, _, _ in rows
+    )
+    track_room_revocations((row[0], ClassSession.Status.CANCELLED) for row in rows)
+    delete_on_commit(session_snapshot_key(row[0]) for row in rows)
+    record_bulk_status_change(
+        rows,
+        ClassSession.Status.SCHEDULED,
+        ClassSession.Status.CANCELLED,
+        actor=actor,
+        source=source,
+    )
+    return scheduled_sessions.update(status=ClassSession.Status.CANCELLED, updated_at=now)
+
+
+def _deactivate(slots, now) -> int:
+    active_slots = slots.filter(is_active=True)
+    rows = list(active_slots.values_list("teacher_id", "start_time", "is_active").iterator(chunk_size=2000))
+    record_slot_changes(previous_rows=rows)
+    return active_slots.update(is_active=False, updated_at=now)
+
+
+def deactivate_slots(
+    slots,
+    cancel_sessions: bool = False,
+    actor=None,
+    source=SessionEvent.Source.SYSTEM,
+) -> dict[str, int]:
+    now = timezone.now()
+    with transaction.atomic():
+        slots = TeacherAvailabilitySlot.objects.filter(pk__in=slots.values("pk"))
+        teacher_ids = set(slots.values_list("teacher_id", flat=True).distinct())
+        scheduled_sessions = ClassSession.objects.filter(
+            slot__in=slots.values("pk"),
+            status=ClassSession.Status.SCHEDULED,
+        )
+
+        cancelled = 0
+        skipped = 0
+        student_ids = set()
+        if cancel_sessions:
+            student_ids = set(scheduled_sessions.values_list("student_id", flat=True).distinct())
+            cancelled = _cancel_scheduled(scheduled_sessions, now, actor, source)
+        else:
+            booked = Exists(
+                ClassSession.objects.filter(slot=OuterRef("pk"), status=ClassSession.Status.SCHEDULED)
+            )
+            skipped = slots.filter(booked, is_active=True).count()
+            slots = slots.exclude(booked)
+
+        deactivated = _deactivate(slots, now)
+        invalidate_session_caches(teacher_ids, student_ids)
+        refresh_next_free_slots(teacher_ids)
+
+    return {"deactivated": deactivated, "skipped_booked": skipped, "cancelled": cancelled}
+
+
+def cancel_sessions(
+    sessions,
+    block_slots: bool = True,
+    actor=None,
+    source=SessionEvent.Source.SYSTEM,
+) -> dict[str, int]:
+    now = timezone.now()
+    with transaction.atomic():
+        scheduled_sessions = ClassSession.objects.filter(
+            pk__in=sessions.values("pk"),
+            status=ClassSession.Status.SCHEDULED,
+        )
+        teacher_ids = set(scheduled_sessions.values_list("teacher_id", flat=True).distinct())
+        student_ids = set(scheduled_sessions.values_list("student_id", flat=True).distinct())
+
+        blocked = 0
+        if block_slots:
+            blocked = _deactivate(
+                TeacherAvailabilitySlot.objects.filter(pk__in=scheduled_sessions.values("slot_id")),
+                now,
+            )
+        cancelled = _cancel_scheduled(scheduled_sessions, now, actor, source)
+        invalidate_session_caches(teacher_ids, student_ids)
+        refresh_next_free_slots(teacher_ids)
+
+    return {"cancelled": cancelled, "blocked_slots": blocked}
@@ -0,0 +1,156 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+NEXT_FREE_SLOTS_LIMIT = 10
+NEXT_FREE_SLOTS_TIMEOUT = 300
+CALENDAR_FEED_TIMEOUT = 60 * 60 * 24
+SESSION_SNAPSHOT_TIMEOUT = 60 * 15
+WEEK_GRID_TIMEOUT = 60 * 60 * 24
+RECOMMENDATIONS_TIMEOUT = 60 * 60 * 6
+SESSION_DASHBOARD_TIMEOUT = 60 * 60
+COALESCE_LOCK_TIMEOUT = 10
+COALESCE_POLL_INTERVAL = 0.02
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def next_free_slots_key(teacher_id) -> str:
+    return f"accounts:teacher:{teacher_id}:next-free-slots"
+
+
+def slots_version_key(teacher_id) -> str:
+    return f"accounts:teacher:{teacher_id}:slots-version"
+
+
+def week_grid_key(teacher_id, week_start, version) -> str:
+    return f"accounts:teacher:{teacher_id}:week:{week_start.isoformat()}:v{version}"
+
+
+def student_recommendations_key(user_id) -> str:
+    return f"accounts:user:{user_id}:recommended-teachers"
+
+
+def session_dashboard_key(role: str, profile_id) -> str:
+    return f"accounts:{role}:{profile_id}:session-dashboard"
+
+
+def session_snapshot_key(session_id) -> str:
+    return f"accounts:session:{session_id}:snapshot"
+
+
+def calendar_feed_key(role: str, profile_id, day) -> str:
+    return f"accounts:ical:{role}:{profile_id}:{day.isoformat()}"
+
+
+def delete_on_commit(keys):
+    keys = list(keys)
+    if not keys:
+        return
+    # Deleting again after commit drops values other requests cached from pre-commit data.
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@contextmanager
+def _local_lock(key):
+    with _local_locks_guard:
+        lock, waiters = _local_locks.get(key, (threading.Lock(), 0))
+        _local_locks[key] = (lock, waiters + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _local_locks_guard:
+            lock, waiters = _local_locks[key]
+            if waiters == 1:
+                del _local_locks[key]
+            else:
+                _local_locks[key] = (lock, waiters - 1)
+
+
+def _wait_for_value(key, lock_key):
+    deadline = time.monotonic() + COALESCE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is not None or cache.get(lock_key) is None:
+            return value
+        time.sleep(COALESCE_POLL_INTERVAL)
+    return None
+
+
+def get_or_compute(key, compute, timeout):
+    value = cache.get(key)
+    if value is not None:
+        return value
+    # Concurrent misses for the same key wait for a single computation: threads of this
+    # process on a local lock, other processes on a short-lived lock key in the cache.
+    with _local_lock(key):
+        value = cache.get(key)
+        if value is not None:
+            return value
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, COALESCE_LOCK_TIMEOUT):
+            value = _wait_for_value(key, lock_key)
+            if value is not None:
+                return value
+        try:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+    return value
+
+
+def slots_version(teacher_id) -> int:
+    key = slots_version_key(teacher_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeding from the clock keeps versions increasing even after the key was evicted.
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+async def aslots_version(teacher_id) -> int:
+    key = slots_version_key(teacher_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns() // 1000, None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_slots_versions(teacher_ids):
+    for teacher_id in teacher_ids:
+        try:
+            cache.incr(slots_version_key(teacher_id))
+        except ValueError:
+            slots_version(teacher_id)
+
+
+def invalidate_teacher_slots(teacher_ids):
+    teacher_ids = set(teacher_ids)
+    delete_on_commit(next_free_slots_key(teacher_id) for teacher_id in teacher_ids)
+    transaction.on_commit(partial(bump_slots_versions, teacher_ids))
+
+
+def invalidate_session_caches(teacher_ids=(), student_ids=(), session_ids=()):
+    teacher_ids = set(teacher_ids)
+    student_ids = set(student_ids)
+    today = timezone.localdate()
+    keys = [session_snapshot_key(session_id) for session_id in session_ids]
+    keys += [next_free_slots_key(teacher_id) for teacher_id in teacher_ids]
+    keys += [calendar_feed_key("teacher", teacher_id, today) for teacher_id in teacher_ids]
+    keys += [calendar_feed_key("student", student_id, today) for student_id in student_ids]
+    keys += [session_dashboard_key("teacher", teacher_id) for teacher_id in teacher_ids]
+    keys += [session_dashboard_key("student", student_id) for student_id in student_ids]
+    delete_on_commit(keys)
+    transaction.on_commit(partial(bump_slots_versions, teacher_ids))
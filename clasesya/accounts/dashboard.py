@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .caching import SESSION_DASHBOARD_TIMEOUT, session_dashboard_key
+from .models import ArchivedClassSession, ClassSession
+
+COUNTERPART_FIELDS = {"teacher": "student__display_name", "student": "teacher__display_name"}
+
+
+def build_session_dashboard(role: str, profile_id, now) -> dict:
+    participant = {f"{role}_id": profile_id}
+    upcoming = Q(status=ClassSession.Status.SCHEDULED, start_time__gte=now)
+    # Cancelled classes never happened, so they count neither as upcoming nor as past.
+    counts = ClassSession.objects.filter(**participant).exclude(status=ClassSession.Status.CANCELLED).aggregate(
+        upcoming=Count("pk", filter=upcoming),
+        past=Count("pk", filter=Q(start_time__lt=now)),
+    )
+    next_session = (
+        ClassSession.objects.filter(upcoming, **participant)
+        .order_by("start_time")
+        .values("id", "topic", "start_time", "end_time", counterpart=F(COUNTERPART_FIELDS[role]))
+        .first()
+    )
+    return {
+        "next_session": next_session,
+        "upcoming_count": counts["upcoming"],
+        "past_count": counts["past"]
+        + ArchivedClassSession.objects.filter(**participant).exclude(status=ClassSession.Status.CANCELLED).count(),
+    }
+
+
+def session_dashboard(role: str, profile_id) -> dict:
+    key = session_dashboard_key(role, profile_id)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        now = timezone.now()
+        dashboard = build_session_dashboard(role, profile_id, now)
+        timeout = SESSION_DASHBOARD_TIMEOUT
+        if dashboard["next_session"] is not None:
+            # Once the next class starts it counts as past, so the aggregate must not outlive it.
+            starts_in = (dashboard["next_session"]["start_time"] - now).total_seconds()
+            timeout = max(1, min(timeout, int(starts_in)))
+        cache.set(key, dashboard, timeout)
+    return dashboard
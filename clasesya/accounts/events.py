@@ -0,0 +1,94 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from .models import SessionEvent
+from .popularity import record_popularity_changes
+from .rollups import record_bulk_session_transition, record_session_transition
+
+EVENT_BATCH_SIZE = 1000
+
+_pending_events = ContextVar("pending_session_events", default=None)
+
+
+def _write(events):
+    if events:
+        SessionEvent.objects.bulk_create(events, batch_size=EVENT_BATCH_SIZE)
+
+
+def _buffer_committed(events):
+    buffer = _pending_events.get()
+    if buffer is None:
+        _write(events)
+    else:
+        buffer.extend(events)
+
+
+@contextmanager
+def buffered_session_events():
+    token = _pending_events.set([])
+    try:
+        yield
+    finally:
+        events = _pending_events.get()
+        _pending_events.reset(token)
+        _write(events)
+
+
+@asynccontextmanager
+async def abuffered_session_events():
+    token = _pending_events.set([])
+    try:
+        yield
+    finally:
+        events = _pending_events.get()
+        _pending_events.reset(token)
+        await sync_to_async(_write)(events)
+
+
+def record_session_event(session, kind, actor=None, from_status="", source=SessionEvent.Source.WEB):
+    event = SessionEvent(
+        session_id=session.pk,
+        teacher_id=session.teacher_id,
+        actor_id=getattr(actor, "pk", None),
+        kind=kind,
+        from_status=from_status,
+        to_status=session.status,
+        source=source,
+    )
+    record_session_transition(session, from_status)
+    record_popularity_changes([(session.pk, session.teacher_id, session.student_id, from_status, session.status)])
+    # Events only enter the buffer once their transaction commits, so rolled back changes leave no trace.
+    transaction.on_commit(partial(_buffer_committed, [event]))
+
+
+def record_status_change(session, previous_status, actor=None, source=SessionEvent.Source.WEB):
+    if session.status == previous_status:
+        return
+    kind = SessionEvent.STATUS_EVENT_KINDS[session.status]
+    record_session_event(session, kind, actor=actor, from_status=previous_status, source=source)
+
+
+def record_bulk_status_change(rows, from_status, to_status, actor=None, source=SessionEvent.Source.ADMIN):
+    kind = SessionEvent.STATUS_EVENT_KINDS[to_status]
+    events = [
+        SessionEvent(
+            session_id=session_id,
+            teacher_id=teacher_id,
+            actor_id=getattr(actor, "pk", None),
+            kind=kind,
+            from_status=from_status,
+            to_status=to_status,
+            source=source,
+        )
+        for session_id, teacher_id, _, _, _ in rows
+    ]
+    record_bulk_session_transition(rows, from_status, to_status)
+    record_popularity_changes(
+        (session_id, teacher_id, student_id, from_status, to_status)
+        for session_id, teacher_id, student_id, _, _ in rows
+    )
+    transaction.on_commit(partial(_buffer_committed, events))
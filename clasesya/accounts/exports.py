@@ -0,0 +1,146 @@
+import csv
+import heapq
+import json
+import zlib
+from datetime import datetime, time, timedelta
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Value
+from django.utils import timezone
+
+from .models import ArchivedAvailabilitySlot, ArchivedClassSession, ClassSession, TeacherAvailabilitySlot
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "ndjson")
+
+SESSION_EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("teacher_id", "teacher_id"),
+    ("teacher_username", "teacher__user__username"),
+    ("teacher_first_name", "teacher__user__first_name"),
+    ("teacher_last_name", "teacher__user__last_name"),
+    ("student_id", "student_id"),
+    ("student_username", "student__user__username"),
+    ("student_first_name", "student__user__first_name"),
+    ("student_last_name", "student__user__last_name"),
+    ("hourly_rate", "teacher__hourly_rate"),
+    ("start_time", "start_time"),
+    ("end_time", "end_time"),
+    ("status", "status"),
+    ("topic", "topic"),
+)
+
+SLOT_EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("teacher_id", "teacher_id"),
+    ("teacher_username", "teacher__user__username"),
+    ("teacher_first_name", "teacher__user__first_name"),
+    ("teacher_last_name", "teacher__user__last_name"),
+    ("hourly_rate", "teacher__hourly_rate"),
+    ("start_time", "start_time"),
+    ("is_active", "is_active"),
+    ("is_booked", "is_booked"),
+)
+
+
+class _EchoBuffer:
+    def write(self, value):
+        return value
+
+
+def _filtered(queryset, date_from=None, date_to=None, teacher_id=None):
+    if date_from:
+        queryset = queryset.filter(start_time__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+    if date_to:
+        end = datetime.combine(date_to + timedelta(days=1), time.min)
+        queryset = queryset.filter(start_time__lt=timezone.make_aware(end))
+    if teacher_id:
+        queryset = queryset.filter(teacher_id=teacher_id)
+    return queryset
+
+
+def _iter_rows(queryset, columns):
+    return (
+        queryset.order_by("start_time", "id")
+        .values_list(*(lookup for _, lookup in columns))
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def export_rows(kind: str, date_from=None, date_to=None, teacher_id=None):
+    if kind == "sessions":
+        queryset = ClassSession.objects.all()
+        archived = ArchivedClassSession.objects.all()
+        columns = SESSION_EXPORT_COLUMNS
+    elif kind == "slots":
+        booked_sessions = ClassSession.objects.filter(slot=OuterRef("pk")).exclude(
+            status=ClassSession.Status.CANCELLED
+        )
+        archived_bookings = ArchivedClassSession.objects.filter(slot_id=OuterRef("pk")).exclude(
+            status=ClassSession.Status.CANCELLED
+        )
+        queryset = TeacherAvailabilitySlot.objects.annotate(
+            is_booked=Exists(booked_sessions) | Exists(archived_bookings)
+        )
+        # Only slots that were never booked get archived.
+        archived = ArchivedAvailabilitySlot.objects.annotate(is_booked=Value(False))
+        columns = SLOT_EXPORT_COLUMNS
+    else:
+        raise ValueError(f"Unknown export kind: {kind}")
+
+    filters = {"date_from": date_from, "date_to": date_to, "teacher_id": teacher_id}
+    header = [name for name, _ in columns]
+    # Old scheduled sessions stay in the hot table, so both sources can overlap in time and are merged.
+    rows = heapq.merge(
+        _iter_rows(_filtered(queryset, **filters), columns),
+        _iter_rows(_filtered(archived, **filters), columns),
+        key=itemgetter(header.index("start_time"), header.index("id")),
+    )
+    return header, rows
+
+
+def _csv_lines(header, rows):
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        )
+
+
+def _ndjson_lines(header, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + "\n"
+
+
+def _batched_bytes(lines, batch_size: int = 64 * 1024):
+    buffer = []
+    buffered = 0
+    for line in lines:
+        encoded = line.encode("utf-8")
+        buffer.append(encoded)
+        buffered += len(encoded)
+        if buffered >= batch_size:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(kind: str, output_format: str = "csv", compress: bool = False, **filters):
+    header, rows = export_rows(kind, **filters)
+    lines = _csv_lines(header, rows) if output_format == "csv" else _ndjson_lines(header, rows)
+    chunks = _batched_bytes(lines)
+    return _gzipped(chunks) if compress else chunks
@@ -0,0 +1,79 @@
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ClassSession
+
+SESSION_FEED_LENGTH = 100
+SESSION_FEED_TIMEOUT = 60 * 60
+
+
+def session_feed_position_key(role: str, profile_id) -> str:
+    return f"accounts:session-feed:{role}:{profile_id}:position"
+
+
+def session_feed_entry_key(role: str, profile_id, position) -> str:
+    return f"accounts:session-feed:{role}:{profile_id}:{position}"
+
+
+def _seed_value() -> int:
+    # Like the slot versions, a clock seed keeps positions increasing after the counter was evicted.
+    return time.time_ns() // 1000
+
+
+def feed_position(role: str, profile_id) -> int:
+    key = session_feed_position_key(role, profile_id)
+    position = cache.get(key)
+    if position is None:
+        cache.add(key, _seed_value(), None)
+        position = cache.get(key)
+    return position
+
+
+async def afeed_position(role: str, profile_id) -> int:
+    key = session_feed_position_key(role, profile_id)
+    position = await cache.aget(key)
+    if position is None:
+        await cache.aadd(key, _seed_value(), None)
+        position = await cache.aget(key)
+    return position
+
+
+def _append(role: str, profile_id, change: dict):
+    try:
+        position = cache.incr(session_feed_position_key(role, profile_id))
+    except ValueError:
+        position = feed_position(role, profile_id)
+    cache.set(session_feed_entry_key(role, profile_id, position), {**change, "seq": position}, SESSION_FEED_TIMEOUT)
+
+
+def _publish(rows):
+    for session_id, teacher_id, student_id, status in rows:
+        change = {
+            "session_id": session_id,
+            "status": status,
+            "status_display": str(ClassSession.Status(status).label),
+        }
+        _append("teacher", teacher_id, change)
+        _append("student", student_id, change)
+
+
+def publish_session_changes(rows):
+    rows = list(rows)
+    if rows:
+        transaction.on_commit(partial(_publish, rows))
+
+
+async def aread_changes(role: str, profile_id, after: int):
+    position = await afeed_position(role, profile_id)
+    if position == after:
+        return position, []
+    if not 0 < position - after <= SESSION_FEED_LENGTH:
+        return position, None
+    keys = [session_feed_entry_key(role, profile_id, seq) for seq in range(after + 1, position + 1)]
+    entries = await cache.aget_many(keys)
+    if len(entries) != len(keys):
+        return position, None
+    return position, [entries[key] for key in keys]
@@ -1,8 +1,13 @@
+from datetime import datetime, timedelta
+
 from django import forms
+from django.contrib.auth import password_validation
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 
 from django.utils import timezone
 
+from .hashing import hashing_service
+from .holds import bookable_slots
 from .models import (
     ClassSession,
     StudentProfile,
@@ -31,6 +36,12 @@ class BaseSignUpForm(UserCreationForm):
         self.fields["last_name"].widget.attrs.setdefault("placeholder", "Apellido")
         self.fields["email"].widget.attrs.setdefault("placeholder", "correo@ejemplo.com")
 
+    def set_password_and_save(self, user, password_field_name="password1", commit=True):
+        user.password = hashing_service.hash(self.cleaned_data[password_field_name])
+        if commit:
+            user.save()
+        return user
+
     def save(self, commit: bool = True):
         user = super().save(commit=False)
         user.first_name = self.cleaned_data["first_name"]
@@ -233,11 +244,21 @@ class TeacherSearchForm(forms.Form):
         widget=forms.SelectMultiple(),
         help_text="Puedes seleccionar uno o varios horarios",
     )
+    ordering = forms.ChoiceField(
+        label="Ordenar por",
+        choices=(
+            ("name", "Nombre"),
+            ("popular", "Mas populares"),
+            ("soonest", "Horario libre mas proximo"),
+        ),
+        required=False,
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["subject"].widget.attrs["class"] = "form-control"
         self.fields["availability"].widget.attrs["class"] = "form-select"
+        self.fields["ordering"].widget.attrs["class"] = "form-select"
 
 
 class ClassSessionScheduleForm(forms.ModelForm):
@@ -245,7 +266,7 @@ class ClassSessionScheduleForm(forms.ModelForm):
         label="Horario disponible",
         queryset=TeacherAvailabilitySlot.objects.none(),
         widget=forms.Select(attrs={"class": "form-select"}),
-        empty_label=None,
+        empty_label="Selecciona un horario",
         error_messages={
             "invalid_choice": "El horario seleccionado ya no está disponible. Selecciona otro horario.",
         },
@@ -255,15 +276,9 @@ class ClassSessionScheduleForm(forms.ModelForm):
         self.teacher = teacher
         self.student = student
         super().__init__(*args, **kwargs)
-        available_slots = (
-            teacher.availability_slots.filter(is_active=True, start_time__gte=timezone.now())
-            .exclude(class_sessions__status=ClassSession.Status.SCHEDULED)
-            .order_by("start_time")
-            .distinct()
-        )
         slot_field = self.fields["slot"]
-        slot_field.queryset = available_slots
-        slot_field.label_from_instance = self._format_slot_label
+        slot_field.queryset = bookable_slots(teacher, student)
+        slot_field.label_from_instance = self.format_slot_label
         for name, field in self.fields.items():
             if name != "slot":
                 css_classes = field.widget.attrs.get("class", "")
@@ -296,7 +311,7 @@ class ClassSessionScheduleForm(forms.ModelForm):
         return session
 
     @staticmethod
-    def _format_slot_label(slot: TeacherAvailabilitySlot) -> str:
+    def format_slot_label(slot: TeacherAvailabilitySlot) -> str:
         start_local = timezone.localtime(slot.start_time)
         end_local = timezone.localtime(slot.end_time)
         start_str = start_local.strftime("%d/%m/%Y %H:%M")
@@ -312,3 +327,161 @@ class ClassSessionStatusForm(forms.ModelForm):
         widgets = {
             "status": forms.Select(attrs={"class": "form-select"}),
         }
+
+
+class ExportFilterForm(forms.Form):
+    date_from = forms.DateField(label="Desde", required=False)
+    date_to = forms.DateField(label="Hasta", required=False)
+    teacher = forms.IntegerField(label="Profesor", required=False, min_value=1)
+    format = forms.ChoiceField(
+        label="Formato",
+        choices=(("csv", "CSV"), ("ndjson", "NDJSON")),
+        required=False,
+    )
+    gzip = forms.BooleanField(label="Comprimir con gzip", required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("La fecha inicial debe ser anterior a la final.")
+        cleaned_data["format"] = cleaned_data.get("format") or "csv"
+        return cleaned_data
+
+
+class TeacherStatsFilterForm(forms.Form):
+    date_from = forms.DateField(
+        label="Desde",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+    )
+    date_to = forms.DateField(
+        label="Hasta",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("La fecha inicial debe ser anterior a la final.")
+        return cleaned_data
+
+
+class AvailableTeacherSearchForm(forms.Form):
+    FLEXIBILITY_CHOICES = (
+        ("0", "Solo a esa hora"),
+        ("1", "Hasta 1 hora antes o despues"),
+        ("2", "Hasta 2 horas antes o despues"),
+        ("4", "Hasta 4 horas antes o despues"),
+    )
+    ORDERING_CHOICES = (
+        ("price", "Menor tarifa"),
+        ("closest", "Horario mas cercano"),
+    )
+
+    subject = forms.CharField(
+        label="Materia",
+        widget=forms.TextInput(attrs={"placeholder": "Ej: Algebra", "class": "form-control"}),
+    )
+    date = forms.DateField(
+        label="Dia",
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+    )
+    time = forms.TimeField(
+        label="Hora",
+        widget=forms.TimeInput(attrs={"type": "time", "step": 3600, "class": "form-control"}),
+    )
+    flexibility = forms.TypedChoiceField(
+        label="Flexibilidad",
+        choices=FLEXIBILITY_CHOICES,
+        coerce=int,
+        initial="1",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    ordering = forms.ChoiceField(
+        label="Ordenar por",
+        choices=ORDERING_CHOICES,
+        initial="price",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date = cleaned_data.get("date")
+        time = cleaned_data.get("time")
+        flexibility = cleaned_data.get("flexibility")
+        if date is None or time is None or flexibility is None:
+            return cleaned_data
+        desired_start = timezone.make_aware(datetime.combine(date, time.replace(minute=0, second=0)))
+        cleaned_data["desired_start"] = desired_start
+        cleaned_data["flexibility_delta"] = timedelta(hours=flexibility)
+        if desired_start + timedelta(hours=flexibility) < timezone.now():
+            raise forms.ValidationError("Elige un dia y una hora futuros.")
+        return cleaned_data
+
+
+class TeacherImportRowForm(forms.Form):
+    LIST_SEPARATOR = ";"
+
+    username = forms.CharField(max_length=150, validators=[User.username_validator])
+    email = forms.EmailField(required=False)
+    first_name = forms.CharField(max_length=150, required=False)
+    last_name = forms.CharField(max_length=150, required=False)
+    password = forms.CharField(required=False, strip=False)
+    subjects = forms.CharField(max_length=150)
+    hourly_rate = forms.DecimalField(max_digits=6, decimal_places=2, min_value=0)
+    bio = forms.CharField(required=False)
+    availability = forms.CharField(required=False)
+    slots = forms.CharField(required=False)
+
+    def _split(self, value):
+        return [item.strip() for item in value.split(self.LIST_SEPARATOR) if item.strip()]
+
+    def clean_availability(self):
+        options = self._split(self.cleaned_data["availability"])
+        unknown = [option for option in options if option not in TeacherProfile.Availability.values]
+        if unknown:
+            raise forms.ValidationError(f"Disponibilidad desconocida: {', '.join(unknown)}.")
+        return list(dict.fromkeys(options))
+
+    def clean_slots(self):
+        start_times = set()
+        now = timezone.now()
+        for value in self._split(self.cleaned_data["slots"]):
+            try:
+                start_time = datetime.fromisoformat(value)
+            except ValueError:
+                raise forms.ValidationError(f"Horario invalido: {value}. Usa AAAA-MM-DD HH:MM.")
+            if timezone.is_naive(start_time):
+                start_time = timezone.make_aware(start_time)
+            if start_time.minute or start_time.second or start_time.microsecond:
+                raise forms.ValidationError(f"Los horarios deben comenzar en punto: {value}.")
+            if start_time < now:
+                raise forms.ValidationError(f"El horario {value} ya paso.")
+            start_times.add(start_time)
+        return sorted(start_times)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        password = cleaned_data.get("password")
+        if password and "username" in cleaned_data:
+            user = User(
+                username=cleaned_data["username"],
+                email=cleaned_data.get("email", ""),
+                first_name=cleaned_data.get("first_name", ""),
+                last_name=cleaned_data.get("last_name", ""),
+            )
+            try:
+                password_validation.validate_password(password, user)
+            except forms.ValidationError as error:
+                self.add_error("password", error)
+        return cleaned_data
+
+
+class TeacherImportUploadForm(forms.Form):
+    file = forms.FileField(label="Archivo CSV")
+    dry_run = forms.BooleanField(label="Solo validar, sin guardar", required=False)
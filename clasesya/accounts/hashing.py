@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+HASH_CHUNK_SIZE = 8
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _process_pool(workers):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(settings.SETTINGS_MODULE,),
+    )
+
+
+@contextmanager
+def password_hashing_pool(workers=None):
+    if workers == 1:
+        yield None
+        return
+    with _process_pool(workers) as pool:
+        yield pool
+
+
+def hash_passwords(passwords, pool=None) -> list[str]:
+    passwords = list(passwords)
+    if pool is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+def _hash(password):
+    return make_password(password)
+
+
+def _verify(password, encoded):
+    is_correct, must_update = verify_password(password, encoded)
+    # Rehashing in the same round trip keeps the upgrade off the request thread as well.
+    return is_correct, make_password(password) if is_correct and must_update else None
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingService:
+    def __init__(self):
+        self._pool = None
+        self._slots = None
+        self._lock = threading.RLock()
+        self._counters = Counter()
+        self.workers = self.max_pending = self.wait_seconds = None
+
+    def configure(self, workers=None, max_pending=None, wait_seconds=None):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self.workers = settings.AUTH_HASHING_WORKERS if workers is None else workers
+            self.max_pending = settings.AUTH_HASHING_MAX_PENDING if max_pending is None else max_pending
+            self.wait_seconds = settings.AUTH_HASHING_WAIT_SECONDS if wait_seconds is None else wait_seconds
+            self._pool = _process_pool(self.workers) if self.workers else None
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            self._counters = Counter()
+
+    def _run(self, func, *args):
+        with self._lock:
+            if self._slots is None:
+                self.configure()
+            slots, pool = self._slots, self._pool
+        queued = time.perf_counter()
+        if not slots.acquire(timeout=self.wait_seconds):
+            self._count(rejected=1)
+            raise HashingBusy
+        started = time.perf_counter()
+        self._count(in_flight=1)
+        try:
+            return pool.submit(func, *args).result() if pool else func(*args)
+        finally:
+            slots.release()
+            finished = time.perf_counter()
+            self._count(
+                in_flight=-1,
+                completed=1,
+                wait_ms=(started - queued) * 1000,
+                run_ms=(finished - started) * 1000,
+            )
+
+    def _count(self, **changes):
+        with self._lock:
+            self._counters.update(changes)
+            self._counters["peak_in_flight"] = max(self._counters["peak_in_flight"], self._counters["in_flight"])
+
+    def hash(self, password) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password, encoded) -> tuple[bool, str | None]:
+        return self._run(_verify, password, encoded)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        completed = counters.get("completed", 0)
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": counters.get("in_flight", 0),
+            "peak_in_flight": counters.get("peak_in_flight", 0),
+            "completed": completed,
+            "rejected": counters.get("rejected", 0),
+            "avg_wait_ms": round(counters.get("wait_ms", 0) / completed, 1) if completed else 0,
+            "avg_run_ms": round(counters.get("run_ms", 0) / completed, 1) if completed else 0,
+        }
+
+
+hashing_service = HashingService()
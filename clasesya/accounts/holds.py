@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .caching import invalidate_teacher_slots
+from .models import ClassSession, SlotHold
+
+SLOT_HOLD_TTL = timedelta(minutes=5)
+
+
+def bookable_slots(teacher, student):
+    now = timezone.now()
+    held_by_others = SlotHold.objects.filter(slot=OuterRef("pk"), expires_at__gt=now).exclude(student=student)
+    return (
+        teacher.availability_slots.filter(is_active=True, start_time__gte=now)
+        .exclude(class_sessions__status=ClassSession.Status.SCHEDULED)
+        .exclude(Exists(held_by_others))
+        .order_by("start_time")
+        .distinct()
+    )
+
+
+def hold_slot(slot, student):
+    now = timezone.now()
+    with transaction.atomic():
+        released_teacher_ids = set(
+            SlotHold.objects.filter(student=student).exclude(slot=slot).values_list("slot__teacher_id", flat=True)
+        )
+        SlotHold.objects.filter(student=student).exclude(slot=slot).delete()
+        SlotHold.objects.filter(slot=slot).filter(Q(student=student) | Q(expires_at__lte=now)).delete()
+        SlotHold.objects.bulk_create(
+            [SlotHold(slot=slot, student=student, expires_at=now + SLOT_HOLD_TTL)],
+            ignore_conflicts=True,
+        )
+        hold = SlotHold.objects.filter(slot=slot, student=student).first()
+        if hold is not None:
+            released_teacher_ids.add(slot.teacher_id)
+        invalidate_teacher_slots(released_teacher_ids)
+    return hold
+
+
+def release_holds(student):
+    teacher_ids = set(SlotHold.objects.filter(student=student).values_list("slot__teacher_id", flat=True))
+    SlotHold.objects.filter(student=student).delete()
+    invalidate_teacher_slots(teacher_ids)
+
+
+def purge_expired_holds(batch_size: int = 1000) -> int:
+    # Expired holds no longer block anyone, so dropping them needs no cache invalidation.
+    deleted = 0
+    while True:
+        hold_ids = list(
+            SlotHold.objects.filter(expires_at__lte=timezone.now()).order_by().values_list("pk", flat=True)[:batch_size]
+        )
+        if not hold_ids:
+            return deleted
+        deleted += SlotHold.objects.filter(pk__in=hold_ids).delete()[0]
@@ -0,0 +1,156 @@
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .caching import CALENDAR_FEED_TIMEOUT, calendar_feed_key
+from .models import VIRTUAL_ROOM_URL_TEMPLATE, ClassSession
+
+FEED_SALT = "accounts.calendar-feed"
+FEED_WINDOW_DAYS = 90
+FEED_CHUNK_SIZE = 500
+FEED_ROLES = ("teacher", "student")
+
+STATUS_MAP = {
+    ClassSession.Status.SCHEDULED: "CONFIRMED",
+    ClassSession.Status.COMPLETED: "CONFIRMED",
+    ClassSession.Status.CANCELLED: "CANCELLED",
+}
+
+FEED_FIELDS = (
+    "virtual_room_code",
+    "updated_at",
+    "start_time",
+    "end_time",
+    "topic",
+    "status",
+    "teacher__display_name",
+    "student__display_name",
+)
+
+
+def feed_token(role: str, profile_id: int) -> str:
+    return signing.Signer(salt=FEED_SALT).sign(f"{role}-{profile_id}")
+
+
+def read_feed_token(token: str):
+    try:
+        value = signing.Signer(salt=FEED_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    role, _, profile_id = value.partition("-")
+    if role not in FEED_ROLES or not profile_id.isdigit():
+        return None
+    return role, int(profile_id)
+
+
+def feed_window(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=FEED_WINDOW_DAYS)
+
+
+def feed_queryset(role: str, profile_id: int, day):
+    window_start, window_end = feed_window(day)
+    queryset = ClassSession.objects.filter(start_time__gte=window_start, start_time__lt=window_end)
+    if role == "teacher":
+        return queryset.filter(teacher_id=profile_id)
+    return queryset.filter(student_id=profile_id)
+
+
+def feed_etag(role: str, profile_id: int, day) -> str:
+    stats = feed_queryset(role, profile_id, day).aggregate(last_update=Max("updated_at"), total=Count("id"))
+    fingerprint = f"{role}:{profile_id}:{day.isoformat()}:{stats['last_update']}:{stats['total']}"
+    return hashlib.md5(fingerprint.encode()).hexdigest()
+
+
+def _format_datetime(value) -> str:
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    limit = 75
+    for char in line:
+        if len((current + char).encode("utf-8")) > limit:
+            parts.append(current)
+            current = char
+            limit = 74
+        else:
+            current += char
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _event(row) -> str:
+    (
+        room_code,
+        updated_at,
+        start_time,
+        end_time,
+        topic,
+        status,
+        teacher_name,
+        student_name,
+    ) = row
+    room_url = VIRTUAL_ROOM_URL_TEMPLATE.format(code=room_code)
+    description = f"Profesor: {teacher_name}\nAlumno: {student_name}\nSala virtual: {room_url}"
+    lines = (
+        "BEGIN:VEVENT",
+        f"UID:{room_code}@clasesya",
+        f"DTSTAMP:{_format_datetime(updated_at)}",
+        f"LAST-MODIFIED:{_format_datetime(updated_at)}",
+        f"DTSTART:{_format_datetime(start_time)}",
+        f"DTEND:{_format_datetime(end_time)}",
+        f"SUMMARY:{_escape(f'ClasesYa: {topic}')}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"LOCATION:{_escape(room_url)}",
+        f"URL:{room_url}",
+        f"STATUS:{STATUS_MAP.get(status, 'CONFIRMED')}",
+        "END:VEVENT",
+    )
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_feed(role: str, profile_id: int, day):
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//ClasesYa//Sesiones en linea//ES\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        "X-WR-CALNAME:ClasesYa\r\n"
+    )
+    rows = (
+        feed_queryset(role, profile_id, day)
+        .order_by("start_time")
+        .values_list(*FEED_FIELDS)
+        .iterator(chunk_size=FEED_CHUNK_SIZE)
+    )
+    for row in rows:
+        yield _event(row)
+    yield "END:VCALENDAR\r\n"
+
+
+def iter_and_cache_feed(role: str, profile_id: int, day, etag: str):
+    body = []
+    for chunk in iter_feed(role, profile_id, day):
+        body.append(chunk)
+        yield chunk
+    cache.set(calendar_feed_key(role, profile_id, day), (etag, "".join(body)), CALENDAR_FEED_TIMEOUT)
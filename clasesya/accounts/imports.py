@@ -0,0 +1,130 @@
+import csv
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from .forms import TeacherImportRowForm
+from .hashing import hash_passwords, password_hashing_pool
+from .models import TeacherAvailabilitySlot, TeacherProfile, TeacherSubject, User, split_subjects
+from .popularity import refresh_next_free_slots
+from .rollups import record_slot_changes
+from .tasks import enqueue_many
+
+IMPORT_BATCH_SIZE = 500
+REQUIRED_COLUMNS = ("username", "subjects", "hourly_rate")
+
+
+class TeacherImportError(Exception):
+    pass
+
+
+def _row_errors(form) -> str:
+    messages = []
+    for field, errors in form.errors.items():
+        prefix = "" if field == "__all__" else f"{field}: "
+        messages.append(prefix + " ".join(errors))
+    return "; ".join(messages)
+
+
+def _validate_batch(batch, seen_usernames, errors):
+    valid = []
+    for line, row in batch:
+        form = TeacherImportRowForm({name: value for name, value in row.items() if name})
+        if not form.is_valid():
+            errors.append((line, _row_errors(form)))
+            continue
+        username = form.cleaned_data["username"]
+        if username in seen_usernames:
+            errors.append((line, f"El usuario {username} esta repetido en el archivo."))
+            continue
+        seen_usernames.add(username)
+        valid.append((line, form.cleaned_data))
+
+    existing = set(
+        User.objects.filter(username__in=[data["username"] for _, data in valid]).values_list("username", flat=True)
+    )
+    for line, data in valid:
+        if data["username"] in existing:
+            errors.append((line, f"El usuario {data['username']} ya existe."))
+    return [(line, data) for line, data in valid if data["username"] not in existing]
+
+
+def _insert_batch(rows, passwords) -> int:
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=data["username"],
+                email=data["email"],
+                first_name=data["first_name"],
+                last_name=data["last_name"],
+                password=password,
+                user_type=User.UserType.TEACHER,
+            )
+            for data, password in zip(rows, passwords)
+        ]
+    )
+    # bulk_create skips save() and signals, so the profile and subject index are filled in here.
+    profiles = TeacherProfile.objects.bulk_create(
+        [
+            TeacherProfile(
+                user=user,
+                display_name=user.display_name(),
+                subjects=data["subjects"],
+                hourly_rate=data["hourly_rate"],
+                bio=data["bio"],
+                availability=data["availability"],
+            )
+            for user, data in zip(users, rows)
+        ]
+    )
+    TeacherSubject.objects.bulk_create(
+        [
+            TeacherSubject(teacher=profile, name=name)
+            for profile, data in zip(profiles, rows)
+            for name in split_subjects(data["subjects"])
+        ]
+    )
+    slots = TeacherAvailabilitySlot.objects.bulk_create(
+        [
+            TeacherAvailabilitySlot(teacher=profile, start_time=start_time)
+            for profile, data in zip(profiles, rows)
+            for start_time in data["slots"]
+        ]
+    )
+    record_slot_changes(current_rows=[(slot.teacher_id, slot.start_time, True) for slot in slots])
+    refresh_next_free_slots({slot.teacher_id for slot in slots})
+    enqueue_many("notifications.welcome", ({"user_id": user.pk} for user in users))
+    return len(slots)
+
+
+def import_teachers(lines, batch_size=IMPORT_BATCH_SIZE, workers=None, dry_run=False) -> dict:
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise TeacherImportError(f"Faltan columnas en el archivo: {', '.join(missing)}.")
+
+    result = {"created": 0, "slots": 0, "errors": []}
+    seen_usernames = set()
+    rows = ((reader.line_num, row) for row in reader)
+    with password_hashing_pool(1 if dry_run else workers) as pool:
+        while batch := list(islice(rows, batch_size)):
+            valid = _validate_batch(batch, seen_usernames, result["errors"])
+            if not valid:
+                continue
+            lines_in_batch = [line for line, _ in valid]
+            data = [data for _, data in valid]
+            if dry_run:
+                result["created"] += len(data)
+                result["slots"] += sum(len(row["slots"]) for row in data)
+                continue
+            passwords = hash_passwords((row["password"] or None for row in data), pool)
+            try:
+                with transaction.atomic():
+                    slots = _insert_batch(data, passwords)
+            except IntegrityError as error:
+                result["errors"].extend((line, f"No se pudo guardar el lote: {error}") for line in lines_in_batch)
+                continue
+            result["created"] += len(data)
+            result["slots"] += slots
+    result["errors"].sort()
+    return result
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import ArchivedSessionEvent, SessionEvent
+
+ARCHIVED_FIELDS = (
+    "id",
+    "session_id",
+    "teacher_id",
+    "actor_id",
+    "kind",
+    "from_status",
+    "to_status",
+    "source",
+    "created_at",
+)
+
+
+class Command(BaseCommand):
+    help = "Mueve los eventos de sesion antiguos a la tabla de archivo por lotes, manteniendo liviana la tabla activa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=365, help="Antiguedad minima en dias.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Eventos movidos por transaccion.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        archived = 0
+        while True:
+            event_ids = list(
+                SessionEvent.objects.filter(created_at__lt=cutoff)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: options["batch_size"]]
+            )
+            if not event_ids:
+                break
+            with transaction.atomic():
+                rows = SessionEvent.objects.filter(pk__in=event_ids).values(*ARCHIVED_FIELDS)
+                ArchivedSessionEvent.objects.bulk_create(
+                    [ArchivedSessionEvent(**row) for row in rows],
+                    ignore_conflicts=True,
+                )
+                SessionEvent.objects.filter(pk__in=event_ids).delete()
+            archived += len(event_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Eventos archivados: {archived}."))
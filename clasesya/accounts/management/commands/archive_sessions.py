@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.archive import archive_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las sesiones completadas o canceladas antiguas, y los horarios pasados que ya no usan, "
+        "a las tablas de archivo en transacciones por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=180, help="Antiguedad minima en dias.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Filas movidas por transaccion.")
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 1:
+            raise CommandError("--older-than debe ser de al menos 1 dia.")
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        result = archive_sessions(cutoff, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Sesiones archivadas: {result['sessions']}. Horarios archivados: {result['slots']}.")
+        )
@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.caching import session_snapshot_key
+from accounts.models import ClassSession, StudentProfile, TeacherAvailabilitySlot, TeacherProfile, User
+from accounts.prewarm import prewarm_upcoming_sessions
+from accounts.rooms import issue_room_token, room_shell_key, room_token_payload
+
+
+class Command(BaseCommand):
+    help = (
+        "Simula, sobre el manejador ASGI, el pico de accesos al detalle y a la sala virtual cuando comienzan "
+        "las clases de una hora y reporta la latencia de cola con cache fria y con precarga. "
+        "Los datos creados se eliminan al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=200, help="Sesiones que comienzan a la misma hora.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Peticiones simultaneas.")
+        parser.add_argument("--refreshes", type=int, default=3, help="Accesos de cada participante por fase.")
+
+    def handle(self, *args, **options):
+        if options["sessions"] < 1 or options["concurrency"] < 1 or options["refreshes"] < 1:
+            raise CommandError("--sessions, --concurrency y --refreshes deben ser mayores que cero.")
+
+        prefix = uuid.uuid4().hex[:8]
+        self.clients = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            try:
+                sessions = self._seed(prefix, options)
+                requests = self._requests(sessions, options["refreshes"])
+                self.stdout.write(
+                    f"{'fase':<12}{'operacion':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                    f"{'max ms':>10}{'peticiones':>12}"
+                )
+
+                self._clear_session_caches(sessions)
+                self._spike("fria", requests, options["concurrency"])
+
+                self._clear_session_caches(sessions)
+                started = time.perf_counter()
+                warmed = prewarm_upcoming_sessions(timedelta(hours=1))
+                self.stdout.write(f"Precarga de {warmed} sesiones en {time.perf_counter() - started:.2f}s.")
+                self._spike("precargada", requests, options["concurrency"])
+            finally:
+                self._cleanup(prefix)
+
+    def _seed(self, prefix, options):
+        start = (timezone.now() + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+        sessions = []
+        for index in range(options["sessions"]):
+            user = User.objects.create_user(username=f"burst-t-{prefix}-{index}", user_type=User.UserType.TEACHER)
+            teacher = TeacherProfile.objects.create(user=user, subjects="Benchmark", hourly_rate=Decimal("20"))
+            user = User.objects.create_user(username=f"burst-s-{prefix}-{index}", user_type=User.UserType.STUDENT)
+            student = StudentProfile.objects.create(user=user)
+            slot = TeacherAvailabilitySlot.objects.create(teacher=teacher, start_time=start)
+            sessions.append(
+                ClassSession.objects.create(
+                    teacher=teacher,
+                    student=student,
+                    topic="Benchmark",
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                    slot=slot,
+                )
+            )
+        return sessions
+
+    def _requests(self, sessions, refreshes):
+        clients = self.clients
+        requests = []
+        for session in sessions:
+            for role, profile in (("student", session.student), ("teacher", session.teacher)):
+                client = clients.get(profile.user_id)
+                if client is None:
+                    client = clients[profile.user_id] = Client()
+                    client.force_login(profile.user)
+                detail_url = reverse("accounts:session_detail", args=[session.pk])
+                room_url = reverse("accounts:room_join", args=[issue_room_token(session, role)])
+                for _ in range(refreshes):
+                    requests.append((client.cookies, "detalle", detail_url))
+                    requests.append((client.cookies, "sala", room_url))
+        random.shuffle(requests)
+        return requests
+
+    def _spike(self, phase, requests, concurrency):
+        queries = itertools.count()
+
+        def count_query(execute, sql, params, many, context):
+            next(queries)
+            return execute(sql, params, many, context)
+
+        def track_connection(sender, connection, **kwargs):
+            connection.execute_wrappers.append(count_query)
+
+        # Requests run on fresh threads, each with its own connection, so counting hooks every new one.
+        connection_created.connect(track_connection)
+        try:
+            started = time.perf_counter()
+            timings = asyncio.run(self._run_spike(requests, concurrency))
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(track_connection)
+
+        for operation in ("detalle", "sala"):
+            self._report(phase, operation, [timing for name, timing in timings if name == operation])
+        self.stdout.write(
+            f"{phase}: {len(requests)} peticiones en {elapsed:.2f}s ({len(requests) / elapsed:.0f}/s), "
+            f"{next(queries)} consultas."
+        )
+
+    async def _run_spike(self, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed_request(cookies, operation, url):
+            client = AsyncClient()
+            client.cookies.update(cookies)
+            # Like the ASGI handler, give each request its own thread for sync code.
+            async with semaphore, ThreadSensitiveContext():
+                started = time.perf_counter()
+                response = await client.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"{url} respondio {response.status_code}.")
+            return operation, elapsed
+
+        return await asyncio.gather(*(timed_request(*request) for request in requests))
+
+    def _report(self, phase, operation, timings):
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"{phase:<12}{operation:<10}{statistics.median(timings):>10.2f}{percentiles[94]:>10.2f}"
+            f"{percentiles[98]:>10.2f}{max(timings):>10.2f}{len(timings):>12}"
+        )
+
+    @staticmethod
+    def _clear_session_caches(sessions):
+        keys = [session_snapshot_key(session.pk) for session in sessions]
+        keys += [
+            room_shell_key(room_token_payload(session, role)) for session in sessions for role in ("teacher", "student")
+        ]
+        cache.delete_many(keys)
+
+    def _cleanup(self, prefix):
+        for client in self.clients.values():
+            client.logout()
+        users = User.objects.filter(
+            Q(username__startswith=f"burst-t-{prefix}-") | Q(username__startswith=f"burst-s-{prefix}-")
+        )
+        ClassSession.objects.filter(student__user__in=users).delete()
+        TeacherAvailabilitySlot.objects.filter(teacher__user__in=users).delete()
+        users.delete()
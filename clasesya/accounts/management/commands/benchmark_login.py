@@ -0,0 +1,114 @@
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.hashing import hashing_service
+from accounts.models import StudentProfile, User
+
+BENCHMARK_PASSWORD = "Benchmark-login-2024"
+
+
+def _worker_counts(value):
+    try:
+        counts = [int(count) for count in value.split(",") if count.strip()]
+    except ValueError:
+        raise CommandError("--workers debe ser una lista de enteros separados por comas, por ejemplo 0,1,2,4.")
+    if not counts or any(count < 0 for count in counts):
+        raise CommandError("--workers debe contener enteros mayores o iguales a cero.")
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el rendimiento de inicios de sesion concurrentes segun la cantidad de procesos del pool de "
+        "contrasenas (0 calcula en el mismo hilo), junto a la latencia de una pagina liviana durante la rafaga. "
+        "Los usuarios creados se eliminan al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=40, help="Usuarios que inician sesion en cada ronda.")
+        parser.add_argument("--workers", default="0,1,2,4", help="Procesos del pool a comparar, separados por comas.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Peticiones simultaneas.")
+        parser.add_argument("--max-pending", type=int, default=64, help="Limite de calculos en curso o en espera.")
+
+    def handle(self, *args, **options):
+        worker_counts = _worker_counts(options["workers"])
+        if options["users"] < 1 or options["concurrency"] < 1 or options["max_pending"] < 1:
+            raise CommandError("--users, --concurrency y --max-pending deben ser mayores que cero.")
+
+        prefix = uuid.uuid4().hex[:8]
+        self.stdout.write(
+            f"{'procesos':>8}{'ingresos/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'lectura p95':>13}"
+            f"{'rechazos':>10}{'espera ms':>11}"
+        )
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            try:
+                usernames = self._seed(prefix, options["users"])
+                for workers in worker_counts:
+                    hashing_service.configure(workers=workers, max_pending=options["max_pending"], wait_seconds=60)
+                    # The first call forks the pool, which should not count against the burst.
+                    hashing_service.hash(BENCHMARK_PASSWORD)
+                    hashing_service.configure(workers=workers, max_pending=options["max_pending"], wait_seconds=60)
+                    self._burst(workers, usernames, options["concurrency"])
+            finally:
+                hashing_service.configure()
+                User.objects.filter(username__startswith=f"bench-login-{prefix}-").delete()
+
+    def _seed(self, prefix, count):
+        encoded = make_password(BENCHMARK_PASSWORD)
+        users = User.objects.bulk_create(
+            User(username=f"bench-login-{prefix}-{index}", password=encoded) for index in range(count)
+        )
+        StudentProfile.objects.bulk_create(StudentProfile(user=user) for user in users)
+        return [user.username for user in users]
+
+    def _burst(self, workers, usernames, concurrency):
+        login_url = reverse("accounts:login")
+        read_url = reverse("accounts:landing")
+        requests = [("ingreso", username) for username in usernames] + [("lectura", None)] * len(usernames)
+        random.shuffle(requests)
+
+        def timed_request(request):
+            operation, username = request
+            client = Client()
+            started = time.perf_counter()
+            try:
+                if operation == "ingreso":
+                    response = client.post(login_url, {"username": username, "password": BENCHMARK_PASSWORD})
+                    expected = 302
+                else:
+                    response = client.get(read_url)
+                    expected = 200
+                elapsed = (time.perf_counter() - started) * 1000
+            finally:
+                connection.close()
+            if response.status_code != expected:
+                raise CommandError(f"{operation} respondio {response.status_code}.")
+            return operation, elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(timed_request, requests))
+        elapsed = time.perf_counter() - started
+
+        logins = [timing for operation, timing in timings if operation == "ingreso"]
+        reads = [timing for operation, timing in timings if operation == "lectura"]
+        metrics = hashing_service.metrics()
+        self.stdout.write(
+            f"{workers:>8}{len(logins) / elapsed:>12.1f}{statistics.median(logins):>10.1f}"
+            f"{self._p95(logins):>10.1f}{self._p95(reads):>13.1f}{metrics['rejected']:>10}{metrics['avg_wait_ms']:>11.1f}"
+        )
+
+    @staticmethod
+    def _p95(timings):
+        return statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
@@ -0,0 +1,125 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.archive import archive_sessions
+from accounts.models import ClassSession, StudentProfile, TeacherAvailabilitySlot, TeacherProfile, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia del camino critico de sesiones (validacion de solapes y listado) "
+        "antes y despues de archivar la mayoria de las sesiones antiguas. Los datos se descartan al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=20000, help="Sesiones pasadas generadas.")
+        parser.add_argument("--teachers", type=int, default=10, help="Profesores entre los que se reparten.")
+        parser.add_argument("--students", type=int, default=50, help="Alumnos entre los que se reparten.")
+        parser.add_argument("--archive-ratio", type=float, default=0.9, help="Fraccion de sesiones archivadas.")
+        parser.add_argument("--requests", type=int, default=200, help="Mediciones por operacion y fase.")
+
+    def handle(self, *args, **options):
+        if not 0 < options["archive_ratio"] < 1:
+            raise CommandError("--archive-ratio debe estar entre 0 y 1.")
+
+        self.stdout.write(f"{'fase':<10}{'operacion':<12}{'media ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'filas':>10}")
+        with transaction.atomic():
+            teachers, students = self._seed(options)
+            candidate_start = timezone.now() + timedelta(days=1)
+            candidate = ClassSession(
+                teacher=teachers[0],
+                student=students[0],
+                topic="Benchmark",
+                start_time=candidate_start,
+                end_time=candidate_start + timedelta(hours=1),
+            )
+            self._measure("antes", candidate, students[0].user, options)
+
+            end_times = list(ClassSession.objects.order_by("-end_time").values_list("end_time", flat=True))
+            cutoff = end_times[int(len(end_times) * (1 - options["archive_ratio"]))]
+            started = time.perf_counter()
+            result = archive_sessions(cutoff)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Archivadas {result['sessions']} sesiones y {result['slots']} horarios en {elapsed:.2f}s."
+            )
+
+            self._measure("despues", candidate, students[0].user, options)
+            transaction.set_rollback(True)
+
+    def _seed(self, options):
+        prefix = uuid.uuid4().hex[:8]
+        teachers = []
+        for index in range(options["teachers"]):
+            user = User.objects.create_user(username=f"bench-t-{prefix}-{index}", user_type=User.UserType.TEACHER)
+            teachers.append(TeacherProfile.objects.create(user=user, subjects="Benchmark", hourly_rate=Decimal("20")))
+        students = []
+        for index in range(options["students"]):
+            user = User.objects.create_user(username=f"bench-s-{prefix}-{index}", user_type=User.UserType.STUDENT)
+            students.append(StudentProfile.objects.create(user=user))
+
+        first_start = (timezone.now() - timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        slots = TeacherAvailabilitySlot.objects.bulk_create(
+            [
+                TeacherAvailabilitySlot(
+                    teacher=teachers[index % len(teachers)],
+                    start_time=first_start - timedelta(hours=index // len(teachers)),
+                )
+                for index in range(options["sessions"])
+            ],
+            batch_size=1000,
+        )
+        statuses = (ClassSession.Status.COMPLETED, ClassSession.Status.CANCELLED)
+        ClassSession.objects.bulk_create(
+            [
+                ClassSession(
+                    teacher_id=slot.teacher_id,
+                    student=students[index % len(students)],
+                    topic="Benchmark",
+                    start_time=slot.start_time,
+                    end_time=slot.end_time,
+                    status=statuses[index % 5 == 0],
+                    slot=slot,
+                )
+                for index, slot in enumerate(slots)
+            ],
+            batch_size=1000,
+        )
+        return teachers, students
+
+    def _measure(self, phase, candidate, student_user, options):
+        rows = ClassSession.objects.count()
+        self._report(phase, "solapes", self._time(candidate.full_clean, options["requests"]), rows)
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            client = Client()
+            client.force_login(student_user)
+            url = reverse("accounts:session_list")
+            client.get(url)
+            self._report(phase, "listado", self._time(lambda: client.get(url), options["requests"]), rows)
+
+    @staticmethod
+    def _time(operation, repetitions):
+        timings = []
+        for _ in range(repetitions):
+            started = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, phase, operation, timings, rows):
+        self.stdout.write(
+            f"{phase:<10}{operation:<12}{statistics.fmean(timings):>10.2f}{statistics.median(timings):>10.2f}"
+            f"{statistics.quantiles(timings, n=20)[-1]:>10.2f}{rows:>10}"
+        )
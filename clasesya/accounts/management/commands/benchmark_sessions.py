@@ -0,0 +1,75 @@
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.models import StudentProfile, User
+
+
+class Command(BaseCommand):
+    help = "Mide la latencia de peticiones autenticadas con cada motor de sesiones configurable."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "engines",
+            nargs="*",
+            help=f"Motores a comparar ({', '.join(settings.SESSION_ENGINES)}). Por defecto, todos.",
+        )
+        parser.add_argument("--requests", type=int, default=200, help="Peticiones medidas por motor.")
+        parser.add_argument("--warmup", type=int, default=10, help="Peticiones previas sin medir.")
+
+    def handle(self, *args, **options):
+        engine_names = options["engines"] or list(settings.SESSION_ENGINES)
+        unknown = [name for name in engine_names if name not in settings.SESSION_ENGINES]
+        if unknown:
+            raise CommandError(f"Motores desconocidos: {', '.join(unknown)}")
+
+        self.stdout.write(
+            f"{'motor':<16}{'media ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'consultas':>11}{'sesion':>8}"
+        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=f"bench-{uuid.uuid4().hex[:12]}",
+                user_type=User.UserType.STUDENT,
+            )
+            StudentProfile.objects.create(user=user)
+            for name in engine_names:
+                self._report(name, self._measure(settings.SESSION_ENGINES[name], user, options))
+            transaction.set_rollback(True)
+
+    def _measure(self, engine, user, options):
+        with override_settings(SESSION_ENGINE=engine, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            client = Client()
+            client.force_login(user)
+            url = reverse("accounts:home")
+            for _ in range(options["warmup"]):
+                client.get(url)
+
+            timings = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options["requests"]):
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+        session_queries = [query for query in queries.captured_queries if "django_session" in query["sql"]]
+        total = options["requests"]
+        return {
+            "mean": statistics.fmean(timings),
+            "p50": statistics.median(timings),
+            "p95": statistics.quantiles(timings, n=20)[-1],
+            "queries": len(queries.captured_queries) / total,
+            "session_queries": len(session_queries) / total,
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:<16}{result['mean']:>10.2f}{result['p50']:>10.2f}{result['p95']:>10.2f}"
+            f"{result['queries']:>11.1f}{result['session_queries']:>8.1f}"
+        )
@@ -0,0 +1,66 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.bulk import cancel_sessions, deactivate_slots
+from accounts.models import ClassSession, TeacherAvailabilitySlot, TeacherProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Desactiva horarios o cancela sesiones de un profesor en bloque, "
+        "con actualizaciones por conjunto dentro de una sola transaccion."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "operation",
+            choices=("deactivate-slots", "cancel-sessions"),
+            help="deactivate-slots: vacaciones. cancel-sessions: profesor ausente.",
+        )
+        parser.add_argument("--teacher", type=int, required=True, help="ID del perfil del profesor.")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="Fecha inicial (AAAA-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Fecha final inclusive (AAAA-MM-DD).")
+        parser.add_argument(
+            "--cancel-sessions",
+            action="store_true",
+            help="Con deactivate-slots, cancela tambien las sesiones ya reservadas en esos horarios.",
+        )
+        parser.add_argument(
+            "--release-slots",
+            action="store_true",
+            help="Con cancel-sessions, deja los horarios liberados disponibles para nuevas reservas.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Informa los cambios sin guardarlos.")
+
+    def handle(self, *args, **options):
+        if not TeacherProfile.objects.filter(pk=options["teacher"]).exists():
+            raise CommandError(f"No existe un profesor con ID {options['teacher']}.")
+
+        time_filter = self._time_filter(options["date_from"], options["date_to"])
+        with transaction.atomic():
+            if options["operation"] == "deactivate-slots":
+                slots = TeacherAvailabilitySlot.objects.filter(teacher_id=options["teacher"], **time_filter)
+                result = deactivate_slots(slots, cancel_sessions=options["cancel_sessions"])
+            else:
+                sessions = ClassSession.objects.filter(teacher_id=options["teacher"], **time_filter)
+                result = cancel_sessions(sessions, block_slots=not options["release_slots"])
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        summary = ", ".join(f"{key}={value}" for key, value in result.items())
+        prefix = "[simulacion] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{summary}"))
+
+    @staticmethod
+    def _time_filter(date_from, date_to):
+        if date_from and date_to and date_from > date_to:
+            raise CommandError("--from debe ser anterior o igual a --to.")
+        time_filter = {}
+        if date_from:
+            time_filter["start_time__gte"] = timezone.make_aware(datetime.combine(date_from, time.min))
+        if date_to:
+            time_filter["start_time__lt"] = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+        return time_filter
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.exports import EXPORT_FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Exporta sesiones u horarios en CSV o NDJSON leyendo las filas por bloques, con memoria constante."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=("sessions", "slots"))
+        parser.add_argument("--format", dest="output_format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="Fecha inicial (AAAA-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Fecha final inclusive (AAAA-MM-DD).")
+        parser.add_argument("--teacher", type=int, help="ID del perfil del profesor.")
+        parser.add_argument("--gzip", action="store_true", help="Comprime la salida con gzip.")
+        parser.add_argument("--output", default="-", help="Archivo de destino. '-' escribe en la salida estandar.")
+
+    def handle(self, *args, **options):
+        if options["date_from"] and options["date_to"] and options["date_from"] > options["date_to"]:
+            raise CommandError("--from debe ser anterior o igual a --to.")
+        if options["gzip"] and options["output"] == "-":
+            raise CommandError("La salida comprimida requiere --output.")
+
+        chunks = stream_export(
+            options["kind"],
+            options["output_format"],
+            options["gzip"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            teacher_id=options["teacher"],
+        )
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk.decode("utf-8"), ending="")
+            return
+
+        with open(options["output"], "wb") as output_file:
+            for chunk in chunks:
+                output_file.write(chunk)
+        self.stderr.write(f"Exportacion guardada en {options['output']}.")
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.imports import IMPORT_BATCH_SIZE, TeacherImportError, import_teachers
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa profesores, su perfil y sus horarios iniciales desde un CSV. Valida y guarda por lotes, "
+        "calcula las contrasenas en paralelo e informa las filas con errores sin detener la importacion."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Ruta del archivo CSV (UTF-8).")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Filas por lote y transaccion.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Procesos para calcular contrasenas. Por defecto, uno por CPU.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Valida el archivo sin guardar nada.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or (options["workers"] is not None and options["workers"] < 1):
+            raise CommandError("--batch-size y --workers deben ser mayores que cero.")
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as lines:
+                result = import_teachers(
+                    lines,
+                    batch_size=options["batch_size"],
+                    workers=options["workers"],
+                    dry_run=options["dry_run"],
+                )
+        except (OSError, UnicodeDecodeError, TeacherImportError) as error:
+            raise CommandError(str(error))
+
+        for line, message in result["errors"]:
+            self.stderr.write(f"Linea {line}: {message}")
+        prefix = "[simulacion] " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}created={result['created']}, slots={result['slots']}, errors={len(result['errors'])}"
+            )
+        )
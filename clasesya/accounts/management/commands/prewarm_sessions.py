@@ -0,0 +1,28 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from accounts.prewarm import prewarm_upcoming_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Precarga en cache el detalle y la sala virtual de las sesiones que comienzan pronto, "
+        "para absorber el pico de accesos al inicio de cada hora."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--minutes", type=int, default=15, help="Ventana de sesiones proximas a precargar.")
+        parser.add_argument("--loop", action="store_true", help="Repite la precarga indefinidamente.")
+        parser.add_argument("--interval", type=float, default=300.0, help="Segundos entre rondas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            warmed = prewarm_upcoming_sessions(timedelta(minutes=options["minutes"]))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Sesiones precargadas: {warmed} en {elapsed:.2f}s.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
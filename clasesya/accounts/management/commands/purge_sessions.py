@@ -0,0 +1,59 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Elimina las sesiones expiradas por lotes para que la tabla de sesiones no crezca sin limite."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Cantidad de sesiones eliminadas por transaccion.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Segundos de pausa entre lotes para no bloquear la base de datos.",
+        )
+
+    def handle(self, *args, **options):
+        store_class = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store_class, DatabaseSessionStore):
+            self.stdout.write(
+                f"El motor de sesiones '{settings.SESSION_ENGINE}' no guarda sesiones en la base de datos."
+            )
+            return
+
+        session_model = store_class.get_model_class()
+        batch_size = options["batch_size"]
+        now = timezone.now()
+        total_deleted = 0
+        batches = 0
+
+        while True:
+            expired_keys = list(
+                session_model.objects.filter(expire_date__lt=now)
+                .order_by("expire_date")
+                .values_list("session_key", flat=True)[:batch_size]
+            )
+            if not expired_keys:
+                break
+            with transaction.atomic():
+                deleted, _ = session_model.objects.filter(session_key__in=expired_keys).delete()
+            total_deleted += deleted
+            batches += 1
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Sesiones expiradas eliminadas: {total_deleted} en {batches} lotes.")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.holds import purge_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Elimina por lotes los apartados de horarios que ya vencieron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Apartados eliminados por lote.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que cero.")
+        deleted = purge_expired_holds(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Apartados vencidos eliminados: {deleted}."))
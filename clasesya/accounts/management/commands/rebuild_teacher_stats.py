@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from accounts.models import (
+    ArchivedAvailabilitySlot,
+    ArchivedClassSession,
+    ClassSession,
+    TeacherAvailabilitySlot,
+)
+from accounts.rollups import rebuild_day
+
+
+def _rebuild_in_worker_thread(day):
+    try:
+        return rebuild_day(day)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las estadisticas diarias de los profesores a partir de horarios y sesiones, "
+        "procesando cada dia como una particion independiente en paralelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="Fecha inicial (AAAA-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Fecha final inclusive (AAAA-MM-DD).")
+        parser.add_argument("--workers", type=int, default=4, help="Dias recalculados en paralelo.")
+
+    def handle(self, *args, **options):
+        date_from, date_to = self._date_range(options["date_from"], options["date_to"])
+        if date_from is None:
+            self.stdout.write("No hay horarios ni sesiones para recalcular.")
+            return
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+
+        workers = max(1, options["workers"])
+        if workers == 1:
+            teacher_days = sum(rebuild_day(day) for day in days)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                teacher_days = sum(executor.map(_rebuild_in_worker_thread, days))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dias recalculados: {len(days)} ({date_from:%Y-%m-%d} a {date_to:%Y-%m-%d}). "
+                f"Filas profesor-dia: {teacher_days}."
+            )
+        )
+
+    @staticmethod
+    def _date_range(date_from, date_to):
+        if date_from and date_to and date_from > date_to:
+            raise CommandError("--from debe ser anterior o igual a --to.")
+        if date_from and date_to:
+            return date_from, date_to
+
+        bounds = [
+            model.objects.aggregate(first=Min("start_time"), last=Max("start_time"))
+            for model in (TeacherAvailabilitySlot, ArchivedAvailabilitySlot, ClassSession, ArchivedClassSession)
+        ]
+        starts = [timezone.localdate(bound["first"]) for bound in bounds if bound["first"]]
+        ends = [timezone.localdate(bound["last"]) for bound in bounds if bound["last"]]
+        if not starts:
+            return date_from, date_to
+        return date_from or min(starts), date_to or max(ends)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.popularity import RECONCILE_BATCH_SIZE, reconcile_teacher_counters, refresh_stale_next_free_slots
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula por lotes los contadores de popularidad de los profesores (clases completadas, alumnos "
+        "distintos y proximo horario libre) y corrige los que se desviaron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE, help="Profesores por lote.")
+        parser.add_argument("--loop", action="store_true", help="Repite la reconciliacion indefinidamente.")
+        parser.add_argument("--interval", type=float, default=3600.0, help="Segundos entre rondas con --loop.")
+        parser.add_argument(
+            "--stale-slots",
+            action="store_true",
+            help="Solo recalcula el proximo horario libre de los profesores cuyo valor ya paso.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que cero.")
+        while True:
+            started = time.perf_counter()
+            if options["stale_slots"]:
+                corrected = refresh_stale_next_free_slots()
+            else:
+                corrected = reconcile_teacher_counters(batch_size=options["batch_size"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Profesores corregidos: {corrected} en {elapsed:.2f}s.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.tasks import claim_tasks, run_task
+
+
+def _run_in_worker_thread(outbox_task):
+    try:
+        return run_task(outbox_task)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de tareas en segundo plano (notificaciones) con un pool de hilos y reintentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Hilos que ejecutan tareas en paralelo.")
+        parser.add_argument("--batch-size", type=int, default=20, help="Tareas reclamadas por ronda.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Segundos de espera si no hay tareas.")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=300,
+            help="Segundos tras los cuales una tarea en ejecucion se considera abandonada.",
+        )
+        parser.add_argument("--once", action="store_true", help="Procesa las tareas pendientes y termina.")
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        stale_after = timedelta(seconds=options["stale_after"])
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        succeeded = failed = 0
+        try:
+            while True:
+                tasks = claim_tasks(options["batch_size"], stale_after)
+                if not tasks:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                if executor is None:
+                    results = [run_task(outbox_task) for outbox_task in tasks]
+                else:
+                    results = list(executor.map(_run_in_worker_thread, tasks))
+                succeeded += results.count(True)
+                failed += results.count(False)
+                self.stdout.write(f"Ronda: {results.count(True)} completadas, {results.count(False)} con error.")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f"Tareas completadas: {succeeded}. Con error: {failed}."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import SessionReminder
+from accounts.reminders import dispatch_due_reminders
+
+
+class Command(BaseCommand):
+    help = "Envia los recordatorios de 24 horas y 15 minutos antes de cada sesion programada."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Sesiones reclamadas por lote.")
+        parser.add_argument("--loop", action="store_true", help="Repite el envio indefinidamente.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Segundos entre rondas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            for kind in SessionReminder.Kind:
+                started = time.perf_counter()
+                result = dispatch_due_reminders(kind, options["batch_size"])
+                elapsed = time.perf_counter() - started
+                self._report(kind, result, elapsed)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def _report(self, kind, result, elapsed):
+        lags = result["lags"]
+        throughput = result["sent"] / elapsed if elapsed else 0.0
+        average_lag = sum(lags) / len(lags) if lags else 0.0
+        max_lag = max(lags, default=0.0)
+        self.stdout.write(
+            f"[{kind.value}] recordatorios={result['reminders']} correos={result['sent']} "
+            f"tiempo={elapsed:.2f}s ritmo={throughput:.1f} correos/s "
+            f"retraso_medio={average_lag:.1f}s retraso_max={max_lag:.1f}s"
+        )
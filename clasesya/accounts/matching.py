@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.db.models import Case, DateTimeField, DurationField, Exists, F, OuterRef, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import ClassSession, SlotHold, TeacherAvailabilitySlot, TeacherSubject, normalize_subject
+
+MATCH_LIMIT = 10
+MATCH_ORDERINGS = {
+    "price": ("teacher__hourly_rate", "distance", "start_time", "pk"),
+    "closest": ("distance", "teacher__hourly_rate", "start_time", "pk"),
+}
+
+
+def subject_range(subject: str) -> dict:
+    # A range instead of startswith keeps the lookup on the (name, teacher) index on every backend.
+    name = normalize_subject(subject)
+    return {"name__gte": name, "name__lt": name + "\uffff"}
+
+
+def match_free_slots(subject: str, desired_start, flexibility: timedelta, student, ordering="price", limit=MATCH_LIMIT):
+    now = timezone.now()
+    desired = Value(desired_start, output_field=DateTimeField())
+    teaches_subject = TeacherSubject.objects.filter(teacher=OuterRef("teacher_id"), **subject_range(subject))
+    booked = ClassSession.objects.filter(slot=OuterRef("pk"), status=ClassSession.Status.SCHEDULED)
+    held_by_others = SlotHold.objects.filter(slot=OuterRef("pk"), expires_at__gt=now).exclude(student=student)
+    distance = Case(
+        When(start_time__gte=desired_start, then=F("start_time") - desired),
+        default=desired - F("start_time"),
+        output_field=DurationField(),
+    )
+    slots = (
+        TeacherAvailabilitySlot.objects.filter(
+            Exists(teaches_subject),
+            is_active=True,
+            start_time__gte=max(now, desired_start - flexibility),
+            start_time__lte=desired_start + flexibility,
+        )
+        .exclude(Exists(booked))
+        .exclude(Exists(held_by_others))
+        .annotate(
+            distance=distance,
+            teacher_rank=Window(
+                RowNumber(),
+                partition_by=F("teacher_id"),
+                order_by=[distance.asc(), F("start_time").asc()],
+            ),
+        )
+        .filter(teacher_rank=1)
+        .select_related("teacher")
+        .order_by(*MATCH_ORDERINGS[ordering])
+    )
+    return list(slots[:limit])
@@ -0,0 +1,50 @@
+import math
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .events import abuffered_session_events, buffered_session_events
+from .ratelimit import rate_limit_key, request_identity, take_token
+from .urls import RATE_LIMITS, app_name
+
+RATE_LIMITED_MESSAGE = "Demasiados intentos seguidos. Espera un momento antes de volver a intentarlo."
+
+
+class SessionEventBufferMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with buffered_session_events():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with abuffered_session_events():
+            return await self.get_response(request)
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.namespace != app_name:
+            return None
+        retry_after = 0
+        for rate in RATE_LIMITS.get(match.url_name, ()):
+            if request.method not in rate.methods:
+                continue
+            identity = request_identity(request, rate.scope)
+            if identity is not None:
+                retry_after = max(retry_after, take_token(rate_limit_key(match.url_name, rate.scope, identity), rate))
+        if not retry_after:
+            return None
+        response = HttpResponse(RATE_LIMITED_MESSAGE, status=429, content_type="text/plain; charset=utf-8")
+        response["Retry-After"] = str(math.ceil(retry_after))
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_teacheravailabilityslot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['start_time'], name='session_start_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacheravailabilityslot',
+            index=models.Index(fields=['start_time'], name='slot_start_time_idx'),
+        ),
+    ]
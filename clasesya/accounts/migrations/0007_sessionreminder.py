@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_outboxtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('24h', '24 horas antes'), ('15m', '15 minutos antes')], max_length=8)),
+                ('claimed_by', models.CharField(max_length=32)),
+                ('claimed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Recordatorio de sesion',
+                'verbose_name_plural': 'Recordatorios de sesion',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['status', 'start_time'], name='session_status_start_idx'),
+        ),
+        migrations.AddField(
+            model_name='sessionreminder',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='accounts.classsession'),
+        ),
+        migrations.AddConstraint(
+            model_name='sessionreminder',
+            constraint=models.UniqueConstraint(fields=('session', 'kind'), name='unique_session_reminder_kind'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_sessionreminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSessionEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('session_id', models.BigIntegerField()),
+                ('teacher_id', models.BigIntegerField()),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('booked', 'Reservada'), ('completed', 'Completada'), ('cancelled', 'Cancelada'), ('reopened', 'Reprogramada')], max_length=20)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('source', models.CharField(choices=[('web', 'Sitio web'), ('admin', 'Administracion'), ('system', 'Sistema')], max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de sesion archivado',
+                'verbose_name_plural': 'Eventos de sesion archivados',
+                'ordering': ('created_at', 'id'),
+                'indexes': [models.Index(fields=['session_id', 'created_at'], name='archived_event_session_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SessionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('booked', 'Reservada'), ('completed', 'Completada'), ('cancelled', 'Cancelada'), ('reopened', 'Reprogramada')], max_length=20)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('source', models.CharField(choices=[('web', 'Sitio web'), ('admin', 'Administracion'), ('system', 'Sistema')], default='web', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='accounts.classsession')),
+                ('teacher', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='session_events', to='accounts.teacherprofile')),
+            ],
+            options={
+                'verbose_name': 'Evento de sesion',
+                'verbose_name_plural': 'Eventos de sesion',
+                'ordering': ('created_at', 'id'),
+                'indexes': [models.Index(fields=['session', 'created_at'], name='event_session_timeline_idx'), models.Index(fields=['teacher', 'created_at'], name='event_teacher_timeline_idx'), models.Index(fields=['created_at'], name='event_created_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_sessionevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('slots_offered', models.IntegerField(default=0)),
+                ('slots_booked', models.IntegerField(default=0)),
+                ('sessions_completed', models.IntegerField(default=0)),
+                ('sessions_cancelled', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='accounts.teacherprofile')),
+            ],
+            options={
+                'verbose_name': 'Estadistica diaria de profesor',
+                'verbose_name_plural': 'Estadisticas diarias de profesores',
+                'ordering': ('-day',),
+                'indexes': [models.Index(fields=['day'], name='teacher_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('teacher', 'day'), name='unique_teacher_daily_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_teacherdailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAvailabilitySlot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_time', models.DateTimeField()),
+                ('is_active', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_availability_slots', to='accounts.teacherprofile')),
+            ],
+            options={
+                'verbose_name': 'Horario archivado',
+                'verbose_name_plural': 'Horarios archivados',
+                'ordering': ('start_time',),
+                'indexes': [models.Index(fields=['start_time'], name='archived_slot_start_time_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedClassSession',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('topic', models.CharField(max_length=150)),
+                ('description', models.TextField(blank=True)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('status', models.CharField(choices=[('scheduled', 'Programada'), ('completed', 'Completada'), ('cancelled', 'Cancelada')], max_length=20)),
+                ('virtual_room_code', models.UUIDField()),
+                ('slot_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_class_sessions', to='accounts.studentprofile')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_class_sessions', to='accounts.teacherprofile')),
+            ],
+            options={
+                'verbose_name': 'Sesion archivada',
+                'verbose_name_plural': 'Sesiones archivadas',
+                'ordering': ('-start_time',),
+                'indexes': [models.Index(fields=['teacher', '-start_time'], name='archived_session_teacher_idx'), models.Index(fields=['student', '-start_time'], name='archived_session_student_idx'), models.Index(fields=['start_time'], name='archived_session_start_idx')],
+            },
+        ),
+    ]
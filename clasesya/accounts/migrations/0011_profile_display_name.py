@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+def fill_display_names(apps, schema_editor):
+    for model_name in ("StudentProfile", "TeacherProfile"):
+        profile_model = apps.get_model("accounts", model_name)
+        profiles = list(profile_model.objects.select_related("user"))
+        for profile in profiles:
+            user = profile.user
+            profile.display_name = f"{user.first_name} {user.last_name}".strip() or user.username
+        profile_model.objects.bulk_update(profiles, ["display_name"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_archived_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=301),
+        ),
+        migrations.RunPython(fill_display_names, migrations.RunPython.noop),
+    ]
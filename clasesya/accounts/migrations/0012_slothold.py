@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_profile_display_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expires_at', models.DateTimeField()),
+                ('slot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='accounts.teacheravailabilityslot')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='accounts.studentprofile')),
+            ],
+            options={
+                'verbose_name': 'Horario apartado',
+                'verbose_name_plural': 'Horarios apartados',
+                'indexes': [models.Index(fields=['expires_at'], name='slot_hold_expires_at_idx')],
+            },
+        ),
+    ]
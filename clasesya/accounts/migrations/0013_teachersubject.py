@@ -0,0 +1,56 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:52
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SUBJECT_SEPARATORS = re.compile(r"[,;/]")
+
+
+def normalize_subject(name):
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.lower().split())
+
+
+def split_subjects(subjects):
+    return {normalize_subject(name) for name in SUBJECT_SEPARATORS.split(subjects or "")} - {""}
+
+
+def fill_subject_index(apps, schema_editor):
+    TeacherProfile = apps.get_model("accounts", "TeacherProfile")
+    TeacherSubject = apps.get_model("accounts", "TeacherSubject")
+    TeacherSubject.objects.bulk_create(
+        [
+            TeacherSubject(teacher_id=teacher_id, name=name)
+            for teacher_id, subjects in TeacherProfile.objects.values_list("pk", "subjects").iterator()
+            for name in split_subjects(subjects)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_slothold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_index', to='accounts.teacherprofile')),
+            ],
+            options={
+                'verbose_name': 'Materia de profesor',
+                'verbose_name_plural': 'Materias de profesores',
+                'constraints': [models.UniqueConstraint(fields=('name', 'teacher'), name='unique_teacher_subject_name')],
+            },
+        ),
+        migrations.RunPython(fill_subject_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.1 on 2026-10-19 02:05
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.utils import timezone
+
+
+def fill_teacher_counters(apps, schema_editor):
+    TeacherProfile = apps.get_model("accounts", "TeacherProfile")
+    ClassSession = apps.get_model("accounts", "ClassSession")
+    ArchivedClassSession = apps.get_model("accounts", "ArchivedClassSession")
+    TeacherAvailabilitySlot = apps.get_model("accounts", "TeacherAvailabilitySlot")
+
+    completed = Counter()
+    students = defaultdict(set)
+    for model in (ClassSession, ArchivedClassSession):
+        rows = (
+            model.objects.filter(status="completed")
+            .values_list("teacher_id", "student_id")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for teacher_id, student_id, total in rows.iterator():
+            completed[teacher_id] += total
+            students[teacher_id].add(student_id)
+    for teacher_id, total in completed.items():
+        TeacherProfile.objects.filter(pk=teacher_id).update(
+            completed_count=total,
+            distinct_students=len(students[teacher_id]),
+        )
+
+    booked = ClassSession.objects.filter(slot=OuterRef("pk"), status="scheduled")
+    next_free_slot = (
+        TeacherAvailabilitySlot.objects.filter(teacher=OuterRef("pk"), is_active=True, start_time__gte=timezone.now())
+        .exclude(Exists(booked))
+        .order_by("start_time")
+        .values("start_time")[:1]
+    )
+    TeacherProfile.objects.update(next_free_slot_at=Subquery(next_free_slot))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_teachersubject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='distinct_students',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='next_free_slot_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=models.Index(fields=['-completed_count', '-distinct_students', 'display_name', 'id'], name='teacher_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=models.Index(fields=['next_free_slot_at', 'id'], name='teacher_next_free_slot_idx'),
+        ),
+        migrations.RunPython(fill_teacher_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-19 02:33
+
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_teacher_popularity_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='teacherprofile',
+            name='teacher_next_free_slot_idx',
+        ),
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=models.Index(django.db.models.lookups.IsNull(models.F('next_free_slot_at'), True), models.F('next_free_slot_at'), models.F('id'), name='teacher_next_free_slot_idx'),
+        ),
+    ]
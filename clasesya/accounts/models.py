@@ -1,12 +1,34 @@
+import re
+import unicodedata
 import uuid
 from datetime import timedelta
 
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.lookups import IsNull
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .caching import NEXT_FREE_SLOTS_LIMIT, NEXT_FREE_SLOTS_TIMEOUT, next_free_slots_key
+
+VIRTUAL_ROOM_URL_TEMPLATE = "https://meet.jit.si/ClasesYa-{code}"
+SUBJECT_SEPARATORS = re.compile(r"[,;/]")
+TEACHER_POPULARITY_ORDERING = ("-completed_count", "-distinct_students", "display_name", "id")
+# Teachers without a free slot sort last; "IS NULL" first instead of NULLS LAST keeps the order indexable on SQLite.
+TEACHER_SOONEST_ORDERING = (IsNull(models.F("next_free_slot_at"), True), "next_free_slot_at", "id")
+
+
+def normalize_subject(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.lower().split())
+
+
+def split_subjects(subjects: str) -> set[str]:
+    return {normalize_subject(name) for name in SUBJECT_SEPARATORS.split(subjects or "")} - {""}
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -33,8 +55,22 @@ class User(AbstractUser):
     def is_teacher(self) -> bool:
         return self.user_type == self.UserType.TEACHER
 
+    def display_name(self) -> str:
+        return self.get_full_name() or self.username
+
+
+class ProfileModel(TimeStampedModel):
+    display_name = models.CharField(max_length=301, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.display_name = self.user.display_name()
+        return super().save(*args, **kwargs)
+
 
-class StudentProfile(TimeStampedModel):
+class StudentProfile(ProfileModel):
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -44,16 +80,18 @@ class StudentProfile(TimeStampedModel):
     learning_goals = models.TextField(blank=True)
 
     def __str__(self) -> str:
-        return f"Perfil estudiante: {self.user.get_full_name() or self.user.username}"
+        return f"Perfil estudiante: {self.display_name}"
 
 
-class TeacherProfile(TimeStampedModel):
+class TeacherProfile(ProfileModel):
     class Availability(models.TextChoices):
         MORNING = "morning", _("Manana")
         AFTERNOON = "afternoon", _("Tarde")
         EVENING = "evening", _("Noche")
         WEEKEND = "weekend", _("Fin de semana")
 
+    AVAILABILITY_LABELS = dict(Availability.choices)
+
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -63,15 +101,23 @@ class TeacherProfile(TimeStampedModel):
     hourly_rate = models.DecimalField(max_digits=6, decimal_places=2)
     bio = models.TextField(blank=True)
     availability = models.JSONField(default=list, blank=True)
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+    distinct_students = models.PositiveIntegerField(default=0, editable=False)
+    next_free_slot_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=TEACHER_POPULARITY_ORDERING, name="teacher_popularity_idx"),
+            models.Index(*TEACHER_SOONEST_ORDERING, name="teacher_next_free_slot_idx"),
+        ]
 
     def __str__(self) -> str:
-        return f"Profesor: {self.user.get_full_name() or self.user.username}"
+        return f"Profesor: {self.display_name}"
 
     def availability_labels(self) -> list[str]:
         if not self.availability:
             return []
-        display_map = dict(self.Availability.choices)
-        return [display_map.get(option, option) for option in self.availability]
+        return [self.AVAILABILITY_LABELS.get(option, option) for option in self.availability]
 
     def upcoming_available_slots(self):
         now = timezone.now()
@@ -82,6 +128,46 @@ class TeacherProfile(TimeStampedModel):
             .distinct()
         )
 
+    def next_free_slots(self) -> tuple[list["TeacherAvailabilitySlot"], bool]:
+        now = timezone.now()
+        cache_key = next_free_slots_key(self.pk)
+        slot_rows = cache.get(cache_key)
+        if slot_rows is None:
+            slot_rows = list(
+                self.upcoming_available_slots().values_list("pk", "start_time")[: NEXT_FREE_SLOTS_LIMIT + 1]
+            )
+            timeout = NEXT_FREE_SLOTS_TIMEOUT
+            if slot_rows:
+                seconds_to_first_slot = int((slot_rows[0][1] - now).total_seconds())
+                timeout = max(1, min(timeout, seconds_to_first_slot))
+            cache.set(cache_key, slot_rows, timeout)
+
+        slots = [
+            TeacherAvailabilitySlot(pk=pk, teacher_id=self.pk, start_time=start_time)
+            for pk, start_time in slot_rows
+            if start_time >= now
+        ]
+        return slots[:NEXT_FREE_SLOTS_LIMIT], len(slots) > NEXT_FREE_SLOTS_LIMIT
+
+
+class TeacherSubject(models.Model):
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name="subject_index",
+    )
+    name = models.CharField(max_length=150)
+
+    class Meta:
+        verbose_name = _("Materia de profesor")
+        verbose_name_plural = _("Materias de profesores")
+        constraints = [
+            models.UniqueConstraint(fields=("name", "teacher"), name="unique_teacher_subject_name"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} - {self.teacher}"
+
 
 class TeacherAvailabilitySlot(TimeStampedModel):
     teacher = models.ForeignKey(
@@ -96,6 +182,9 @@ class TeacherAvailabilitySlot(TimeStampedModel):
         ordering = ("start_time",)
         verbose_name = _("Horario disponible")
         verbose_name_plural = _("Horarios disponibles")
+        indexes = [
+            models.Index(fields=("start_time",), name="slot_start_time_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=("teacher", "start_time"),
@@ -159,6 +248,10 @@ class ClassSession(TimeStampedModel):
         ordering = ("-start_time",)
         verbose_name = _("Sesion en linea")
         verbose_name_plural = _("Sesiones en linea")
+        indexes = [
+            models.Index(fields=("start_time",), name="session_start_time_idx"),
+            models.Index(fields=("status", "start_time"), name="session_status_start_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=("teacher", "student", "start_time", "end_time"),
@@ -172,11 +265,7 @@ class ClassSession(TimeStampedModel):
         ]
 
     def __str__(self) -> str:
-        return (
-            f"Sesion {self.topic} - "
-            f"{self.teacher.user.get_full_name() or self.teacher.user.username} / "
-            f"{self.student.user.get_full_name() or self.student.user.username}"
-        )
+        return f"Sesion {self.topic} - {self.teacher.display_name} / {self.student.display_name}"
 
     def clean(self):
         super().clean()
@@ -208,6 +297,13 @@ class ClassSession(TimeStampedModel):
                     }
                 )
 
+            if not self.pk and (
+                SlotHold.objects.filter(slot_id=self.slot_id, expires_at__gt=timezone.now())
+                .exclude(student_id=self.student_id)
+                .exists()
+            ):
+                raise ValidationError({"slot": _("El horario seleccionado esta apartado por otro alumno.")})
+
             slot_conflict_qs = ClassSession.objects.filter(
                 slot=self.slot,
                 status=self.Status.SCHEDULED,
@@ -251,12 +347,286 @@ class ClassSession(TimeStampedModel):
         self.full_clean()
         return super().save(*args, **kwargs)
 
+    is_archived = False
+
     @property
     def virtual_room_url(self) -> str:
-        return f"https://meet.jit.si/ClasesYa-{self.virtual_room_code}"
+        return VIRTUAL_ROOM_URL_TEMPLATE.format(code=self.virtual_room_code)
 
     def is_scheduled(self) -> bool:
         return self.status == self.Status.SCHEDULED
 
     def has_finished(self) -> bool:
         return timezone.now() >= self.end_time
+
+
+class SlotHold(models.Model):
+    slot = models.OneToOneField(
+        TeacherAvailabilitySlot,
+        on_delete=models.CASCADE,
+        related_name="hold",
+    )
+    student = models.ForeignKey(
+        StudentProfile,
+        on_delete=models.CASCADE,
+        related_name="slot_holds",
+    )
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Horario apartado")
+        verbose_name_plural = _("Horarios apartados")
+        indexes = [
+            models.Index(fields=("expires_at",), name="slot_hold_expires_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.slot} - {self.student}"
+
+
+class SessionEvent(models.Model):
+    class Kind(models.TextChoices):
+        BOOKED = "booked", _("Reservada")
+        COMPLETED = "completed", _("Completada")
+        CANCELLED = "cancelled", _("Cancelada")
+        REOPENED = "reopened", _("Reprogramada")
+
+    class Source(models.TextChoices):
+        WEB = "web", _("Sitio web")
+        ADMIN = "admin", _("Administracion")
+        SYSTEM = "system", _("Sistema")
+
+    STATUS_EVENT_KINDS = {
+        "scheduled": Kind.REOPENED,
+        "completed": Kind.COMPLETED,
+        "cancelled": Kind.CANCELLED,
+    }
+
+    session = models.ForeignKey(
+        ClassSession,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="events",
+    )
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="session_events",
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+    source = models.CharField(max_length=10, choices=Source.choices, default=Source.WEB)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("created_at", "id")
+        verbose_name = _("Evento de sesion")
+        verbose_name_plural = _("Eventos de sesion")
+        indexes = [
+            models.Index(fields=("session", "created_at"), name="event_session_timeline_idx"),
+            models.Index(fields=("teacher", "created_at"), name="event_teacher_timeline_idx"),
+            models.Index(fields=("created_at",), name="event_created_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} - sesion {self.session_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Session events are append-only.")
+        return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Session events are append-only.")
+
+
+class ArchivedSessionEvent(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    session_id = models.BigIntegerField()
+    teacher_id = models.BigIntegerField()
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=SessionEvent.Kind.choices)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+    source = models.CharField(max_length=10, choices=SessionEvent.Source.choices)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("created_at", "id")
+        verbose_name = _("Evento de sesion archivado")
+        verbose_name_plural = _("Eventos de sesion archivados")
+        indexes = [
+            models.Index(fields=("session_id", "created_at"), name="archived_event_session_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} - sesion {self.session_id}"
+
+
+class SessionReminder(models.Model):
+    class Kind(models.TextChoices):
+        DAY_BEFORE = "24h", _("24 horas antes")
+        SHORTLY_BEFORE = "15m", _("15 minutos antes")
+
+    session = models.ForeignKey(
+        ClassSession,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+    kind = models.CharField(max_length=8, choices=Kind.choices)
+    claimed_by = models.CharField(max_length=32)
+    claimed_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Recordatorio de sesion")
+        verbose_name_plural = _("Recordatorios de sesion")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("session", "kind"),
+                name="unique_session_reminder_kind",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} - sesion {self.session_id}"
+
+
+class OutboxTask(TimeStampedModel):
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pendiente")
+        RUNNING = "running", _("En ejecucion")
+        DONE = "done", _("Completada")
+        FAILED = "failed", _("Fallida")
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=36, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("run_after",)
+        verbose_name = _("Tarea en segundo plano")
+        verbose_name_plural = _("Tareas en segundo plano")
+        indexes = [
+            models.Index(fields=("status", "run_after"), name="outbox_status_run_after_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class TeacherDailyStats(models.Model):
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+    day = models.DateField()
+    slots_offered = models.IntegerField(default=0)
+    slots_booked = models.IntegerField(default=0)
+    sessions_completed = models.IntegerField(default=0)
+    sessions_cancelled = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-day",)
+        verbose_name = _("Estadistica diaria de profesor")
+        verbose_name_plural = _("Estadisticas diarias de profesores")
+        indexes = [
+            models.Index(fields=("day",), name="teacher_stats_day_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("teacher", "day"),
+                name="unique_teacher_daily_stats",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.teacher} - {self.day:%d/%m/%Y}"
+
+
+class ArchivedAvailabilitySlot(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name="archived_availability_slots",
+    )
+    start_time = models.DateTimeField()
+    is_active = models.BooleanField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("start_time",)
+        verbose_name = _("Horario archivado")
+        verbose_name_plural = _("Horarios archivados")
+        indexes = [
+            models.Index(fields=("start_time",), name="archived_slot_start_time_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.teacher} - {timezone.localtime(self.start_time):%d/%m/%Y %H:%M}"
+
+
+class ArchivedClassSession(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name="archived_class_sessions",
+    )
+    student = models.ForeignKey(
+        StudentProfile,
+        on_delete=models.CASCADE,
+        related_name="archived_class_sessions",
+    )
+    topic = models.CharField(max_length=150)
+    description = models.TextField(blank=True)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=ClassSession.Status.choices)
+    virtual_room_code = models.UUIDField()
+    slot_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ("-start_time",)
+        verbose_name = _("Sesion archivada")
+        verbose_name_plural = _("Sesiones archivadas")
+        indexes = [
+            models.Index(fields=("teacher", "-start_time"), name="archived_session_teacher_idx"),
+            models.Index(fields=("student", "-start_time"), name="archived_session_student_idx"),
+            models.Index(fields=("start_time",), name="archived_session_start_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Sesion archivada {self.topic}"
@@ -0,0 +1,83 @@
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.utils import timezone
+
+from .models import ClassSession, TeacherProfile, User
+from .tasks import task
+
+
+def session_summary(session) -> str:
+    start_local = timezone.localtime(session.start_time)
+    end_local = timezone.localtime(session.end_time)
+    return (
+        f"Tema: {session.topic}\n"
+        f"Horario: {start_local:%d/%m/%Y %H:%M} - {end_local:%H:%M}\n"
+        f"Profesor: {session.teacher.display_name}\n"
+        f"Alumno: {session.student.display_name}\n"
+        f"Sala virtual: {session.virtual_room_url}\n"
+    )
+
+
+def participant_messages(session, subject: str, intro: str) -> list[EmailMessage]:
+    participants = (session.student, session.teacher)
+    return [
+        EmailMessage(
+            subject=subject,
+            body=f"Hola {profile.display_name},\n\n{intro}\n\n{session_summary(session)}",
+            to=[profile.user.email],
+        )
+        for profile in participants
+        if profile.user.email
+    ]
+
+
+def _send_to_participants(session, subject: str, intro: str):
+    messages = participant_messages(session, subject, intro)
+    if messages:
+        with get_connection() as connection:
+            connection.send_messages(messages)
+
+
+def _load_session(session_id):
+    return ClassSession.objects.select_related("teacher__user", "student__user").filter(pk=session_id).first()
+
+
+@task("notifications.welcome")
+def send_welcome_email(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    if user.is_teacher():
+        intro = "Ya formas parte del equipo docente de ClasesYa. Publica tus horarios para recibir alumnos."
+    else:
+        intro = "Ya puedes buscar profesores y agendar tu primera clase gratis en ClasesYa."
+    send_mail("Bienvenido a ClasesYa", f"Hola {user.display_name()},\n\n{intro}", None, [user.email])
+
+
+@task("notifications.teacher_selected")
+def send_teacher_selected_email(student_user_id, teacher_id):
+    student = User.objects.filter(pk=student_user_id).first()
+    teacher = TeacherProfile.objects.filter(pk=teacher_id).first()
+    if student is None or teacher is None or not student.email:
+        return
+    body = (
+        f"Hola {student.display_name()},\n\n"
+        f"Seleccionaste a {teacher.display_name} ({teacher.subjects}, ${teacher.hourly_rate} por hora).\n"
+        "El siguiente paso es elegir un horario disponible desde su perfil para programar la clase en linea."
+    )
+    send_mail("Siguientes pasos con tu profesor", body, None, [student.email])
+
+
+@task("notifications.session_booked")
+def send_session_booked_email(session_id):
+    session = _load_session(session_id)
+    if session is None:
+        return
+    _send_to_participants(session, "Clase programada en ClasesYa", "Se programo una nueva clase en linea.")
+
+
+@task("notifications.session_cancelled")
+def send_session_cancelled_email(session_id):
+    session = _load_session(session_id)
+    if session is None:
+        return
+    _send_to_participants(session, "Clase cancelada en ClasesYa", "La siguiente clase fue cancelada.")
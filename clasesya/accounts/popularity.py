@@ -0,0 +1,118 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import ArchivedClassSession, ClassSession, TeacherAvailabilitySlot, TeacherProfile
+
+RECONCILE_BATCH_SIZE = 500
+COMPLETED = ClassSession.Status.COMPLETED
+
+
+def _other_completed_exists(teacher_id, student_id, session_ids) -> bool:
+    completed = Q(teacher_id=teacher_id, student_id=student_id, status=COMPLETED)
+    return (
+        ClassSession.objects.filter(completed).exclude(pk__in=session_ids).exists()
+        or ArchivedClassSession.objects.filter(completed).exists()
+    )
+
+
+def record_popularity_changes(changes):
+    completed = Counter()
+    pairs = defaultdict(list)
+    for session_id, teacher_id, student_id, from_status, to_status in changes:
+        delta = (to_status == COMPLETED) - (from_status == COMPLETED)
+        if delta:
+            completed[teacher_id] += delta
+            pairs[(teacher_id, student_id)].append((session_id, from_status, to_status))
+
+    students = Counter()
+    for (teacher_id, student_id), transitions in pairs.items():
+        # Only pairs whose completed history changed need the existence check.
+        others = _other_completed_exists(teacher_id, student_id, [session_id for session_id, _, _ in transitions])
+        before = others or any(from_status == COMPLETED for _, from_status, _ in transitions)
+        after = others or any(to_status == COMPLETED for _, _, to_status in transitions)
+        students[teacher_id] += after - before
+
+    for teacher_id in completed.keys() | students.keys():
+        updates = {}
+        if completed[teacher_id]:
+            updates["completed_count"] = F("completed_count") + completed[teacher_id]
+        if students[teacher_id]:
+            updates["distinct_students"] = F("distinct_students") + students[teacher_id]
+        if updates:
+            TeacherProfile.objects.filter(pk=teacher_id).update(**updates)
+
+
+def next_free_slot_subquery(now=None):
+    booked = ClassSession.objects.filter(slot=OuterRef("pk"), status=ClassSession.Status.SCHEDULED)
+    return Subquery(
+        TeacherAvailabilitySlot.objects.filter(
+            teacher=OuterRef("pk"),
+            is_active=True,
+            start_time__gte=now or timezone.now(),
+        )
+        .exclude(Exists(booked))
+        .order_by("start_time")
+        .values("start_time")[:1]
+    )
+
+
+def refresh_next_free_slots(teacher_ids=None) -> int:
+    teachers = TeacherProfile.objects.all()
+    if teacher_ids is not None:
+        teacher_ids = set(teacher_ids)
+        if not teacher_ids:
+            return 0
+        teachers = teachers.filter(pk__in=teacher_ids)
+    return teachers.update(next_free_slot_at=next_free_slot_subquery())
+
+
+def refresh_stale_next_free_slots(now=None) -> int:
+    now = now or timezone.now()
+    # Only rows whose stored slot has already started, found through the next_free_slot_at index.
+    return TeacherProfile.objects.filter(next_free_slot_at__lt=now).update(
+        next_free_slot_at=next_free_slot_subquery(now)
+    )
+
+
+def _completed_counts(teacher_ids):
+    completed = Counter()
+    pairs = defaultdict(set)
+    for model in (ClassSession, ArchivedClassSession):
+        rows = (
+            model.objects.filter(teacher_id__in=teacher_ids, status=COMPLETED)
+            .values_list("teacher_id", "student_id")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for teacher_id, student_id, total in rows:
+            completed[teacher_id] += total
+            pairs[teacher_id].add(student_id)
+    return completed, pairs
+
+
+def reconcile_teacher_counters(batch_size=RECONCILE_BATCH_SIZE) -> int:
+    corrected = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            teachers = list(
+                TeacherProfile.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .annotate(expected_next_free_slot_at=next_free_slot_subquery())
+                .only("pk", "completed_count", "distinct_students", "next_free_slot_at")[:batch_size]
+            )
+            if not teachers:
+                return corrected
+            last_pk = teachers[-1].pk
+            completed, pairs = _completed_counts([teacher.pk for teacher in teachers])
+            stale = []
+            for teacher in teachers:
+                expected = (completed[teacher.pk], len(pairs[teacher.pk]), teacher.expected_next_free_slot_at)
+                if (teacher.completed_count, teacher.distinct_students, teacher.next_free_slot_at) != expected:
+                    teacher.completed_count, teacher.distinct_students, teacher.next_free_slot_at = expected
+                    stale.append(teacher)
+            TeacherProfile.objects.bulk_update(stale, ["completed_count", "distinct_students", "next_free_slot_at"])
+            corrected += len(stale)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import SESSION_SNAPSHOT_TIMEOUT, get_or_compute, session_snapshot_key
+from .models import ClassSession
+from .rooms import ROOM_SHELL_TIMEOUT, render_room_shell, room_shell_key, room_token_payload
+
+PREWARM_BATCH_SIZE = 500
+
+
+def _load_session(session_id):
+    return ClassSession.objects.select_related("teacher", "student").filter(pk=session_id).first()
+
+
+def session_snapshot(session_id):
+    return get_or_compute(
+        session_snapshot_key(session_id),
+        lambda: _load_session(session_id),
+        SESSION_SNAPSHOT_TIMEOUT,
+    )
+
+
+def prewarm_upcoming_sessions(window: timedelta, now=None) -> int:
+    now = now or timezone.now()
+    upcoming = (
+        ClassSession.objects.select_related("teacher", "student")
+        .filter(status=ClassSession.Status.SCHEDULED, start_time__gte=now, start_time__lte=now + window)
+        .order_by("start_time")
+    )
+    warmed = 0
+    snapshots, shells = {}, {}
+    for session in upcoming.iterator(chunk_size=PREWARM_BATCH_SIZE):
+        snapshots[session_snapshot_key(session.pk)] = session
+        for role in ("teacher", "student"):
+            payload = room_token_payload(session, role)
+            shells[room_shell_key(payload)] = render_room_shell(payload)
+        warmed += 1
+        if len(snapshots) >= PREWARM_BATCH_SIZE:
+            cache.set_many(snapshots, SESSION_SNAPSHOT_TIMEOUT)
+            cache.set_many(shells, ROOM_SHELL_TIMEOUT)
+            snapshots, shells = {}, {}
+    cache.set_many(snapshots, SESSION_SNAPSHOT_TIMEOUT)
+    cache.set_many(shells, ROOM_SHELL_TIMEOUT)
+    return warmed
@@ -0,0 +1,42 @@
+import hashlib
+import time
+
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+
+
+class Rate:
+    def __init__(self, scope: str, capacity: int, per: int, methods=("POST",)):
+        self.scope = scope
+        self.capacity = capacity
+        self.per = per
+        self.refill_per_second = capacity / per
+        self.methods = frozenset(methods)
+
+
+def rate_limit_key(url_name: str, scope: str, identity: str) -> str:
+    digest = hashlib.md5(identity.encode(), usedforsecurity=False).hexdigest()
+    return f"accounts:ratelimit:{url_name}:{scope}:{digest}"
+
+
+def request_identity(request, scope: str):
+    if scope == "ip":
+        return request.META.get("REMOTE_ADDR")
+    if scope == "user":
+        # The account id stored in the session survives new logins and, with cached sessions, costs no query.
+        return request.session.get(SESSION_KEY)
+    if scope == "username":
+        return (request.POST.get("username") or "").strip().lower() or None
+    raise ValueError(f"Unknown rate limit scope: {scope}")
+
+
+def take_token(key: str, rate: Rate, now=None) -> float:
+    now = time.time() if now is None else now
+    tokens, updated = cache.get(key) or (rate.capacity, now)
+    tokens = min(rate.capacity, tokens + (now - updated) * rate.refill_per_second)
+    if tokens < 1:
+        return (1 - tokens) / rate.refill_per_second
+    # Two workers may both spend the last token; a small overshoot is cheaper than a lock round trip.
+    cache.set(key, (tokens - 1, now), rate.per)
+    return 0
+
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .caching import RECOMMENDATIONS_TIMEOUT, student_recommendations_key
+from .matching import subject_range
+from .models import (
+    TEACHER_POPULARITY_ORDERING,
+    StudentProfile,
+    TeacherProfile,
+    TeacherSubject,
+    normalize_subject,
+    split_subjects,
+)
+from .tasks import enqueue, task
+
+RECOMMENDATION_LIMIT = 6
+GOAL_TERM_MIN_LENGTH = 5
+GOAL_TERM_LIMIT = 10
+REFRESH_PENDING_TIMEOUT = 60 * 5
+
+
+def refresh_pending_key(user_id) -> str:
+    return f"{student_recommendations_key(user_id)}:pending"
+
+
+def interest_terms(student) -> tuple[list[str], list[str]]:
+    preferred = sorted(split_subjects(student.preferred_subject))
+    words = dict.fromkeys(
+        word for word in normalize_subject(student.learning_goals).split() if len(word) >= GOAL_TERM_MIN_LENGTH
+    )
+    goals = [word for word in words if word not in preferred][:GOAL_TERM_LIMIT]
+    return preferred, goals
+
+
+def _teaches_any(terms):
+    condition = Q()
+    for term in terms:
+        condition |= Q(**subject_range(term))
+    return Exists(TeacherSubject.objects.filter(condition, teacher=OuterRef("pk")))
+
+
+def compute_recommendations(student, limit=RECOMMENDATION_LIMIT) -> list[int]:
+    preferred, goals = interest_terms(student)
+    if not preferred and not goals:
+        return []
+    now = timezone.now()
+    return list(
+        TeacherProfile.objects.filter(_teaches_any(preferred + goals))
+        .annotate(
+            preferred_match=_teaches_any(preferred) if preferred else Value(False),
+            has_free_slot=Case(When(next_free_slot_at__gte=now, then=1), default=0, output_field=IntegerField()),
+        )
+        .order_by("-preferred_match", "-has_free_slot", *TEACHER_POPULARITY_ORDERING)
+        .values_list("pk", flat=True)[:limit]
+    )
+
+
+@task("recommendations.refresh")
+def refresh_student_recommendations(user_id):
+    cache.delete(refresh_pending_key(user_id))
+    student = StudentProfile.objects.filter(user_id=user_id).first()
+    if student is not None:
+        cache.set(student_recommendations_key(user_id), compute_recommendations(student), RECOMMENDATIONS_TIMEOUT)
+
+
+def request_refresh(user_id):
+    # Many home views can miss at once after expiry; only the first one queues the job.
+    if cache.add(refresh_pending_key(user_id), True, REFRESH_PENDING_TIMEOUT):
+        enqueue("recommendations.refresh", user_id=user_id)
+
+
+def recommended_teachers(user_id):
+    teacher_ids = cache.get(student_recommendations_key(user_id))
+    if teacher_ids is None:
+        request_refresh(user_id)
+        return None
+    if not teacher_ids:
+        return []
+    teachers = TeacherProfile.objects.in_bulk(teacher_ids)
+    return [teachers[teacher_id] for teacher_id in teacher_ids if teacher_id in teachers]
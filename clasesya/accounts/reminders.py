@@ -0,0 +1,89 @@
+import uuid
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from .models import ClassSession, SessionReminder
+from .notifications import participant_messages
+
+REMINDER_LEADS = {
+    SessionReminder.Kind.DAY_BEFORE: timedelta(hours=24),
+    SessionReminder.Kind.SHORTLY_BEFORE: timedelta(minutes=15),
+}
+REMINDER_INTROS = {
+    SessionReminder.Kind.DAY_BEFORE: "Te recordamos que manana tienes una clase en linea.",
+    SessionReminder.Kind.SHORTLY_BEFORE: "Tu clase en linea comienza en 15 minutos.",
+}
+STALE_CLAIM_AFTER = timedelta(minutes=10)
+
+
+def due_session_ids(kind: str, now, batch_size: int) -> list[int]:
+    lead = REMINDER_LEADS[kind]
+    handled = SessionReminder.objects.filter(session=OuterRef("pk"), kind=kind)
+    queryset = ClassSession.objects.filter(
+        status=ClassSession.Status.SCHEDULED,
+        start_time__gt=now,
+        start_time__lte=now + lead,
+        created_at__lte=F("start_time") - lead,
+    ).exclude(Exists(handled))
+    shorter_leads = [other for other in REMINDER_LEADS.values() if other < lead]
+    if shorter_leads:
+        queryset = queryset.filter(start_time__gt=now + max(shorter_leads))
+    return list(queryset.order_by("start_time").values_list("pk", flat=True)[:batch_size])
+
+
+def claim_reminders(kind: str, session_ids) -> list[SessionReminder]:
+    claim_id = uuid.uuid4().hex
+    SessionReminder.objects.bulk_create(
+        [SessionReminder(session_id=session_id, kind=kind, claimed_by=claim_id) for session_id in session_ids],
+        ignore_conflicts=True,
+    )
+    return list(
+        SessionReminder.objects.filter(kind=kind, session_id__in=session_ids, claimed_by=claim_id).select_related(
+            "session__teacher__user",
+            "session__student__user",
+        )
+    )
+
+
+def release_stale_claims(now):
+    return SessionReminder.objects.filter(
+        Q(sent_at__isnull=True) & Q(claimed_at__lt=now - STALE_CLAIM_AFTER)
+    ).delete()[0]
+
+
+def dispatch_due_reminders(kind: str, batch_size: int = 200) -> dict:
+    release_stale_claims(timezone.now())
+    lead = REMINDER_LEADS[kind]
+    sent = 0
+    lags = []
+    with get_connection() as connection:
+        while True:
+            now = timezone.now()
+            session_ids = due_session_ids(kind, now, batch_size)
+            if not session_ids:
+                break
+            reminders = claim_reminders(kind, session_ids)
+            if not reminders:
+                continue
+            messages = []
+            for reminder in reminders:
+                messages += participant_messages(
+                    reminder.session,
+                    "Recordatorio de clase en ClasesYa",
+                    REMINDER_INTROS[kind],
+                )
+            try:
+                sent += connection.send_messages(messages) or 0
+            except Exception:
+                SessionReminder.objects.filter(pk__in=[reminder.pk for reminder in reminders]).delete()
+                raise
+            sent_at = timezone.now()
+            SessionReminder.objects.filter(pk__in=[reminder.pk for reminder in reminders]).update(sent_at=sent_at)
+            lags += [
+                max((sent_at - (reminder.session.start_time - lead)).total_seconds(), 0.0)
+                for reminder in reminders
+            ]
+    return {"sent": sent, "reminders": len(lags), "lags": lags}
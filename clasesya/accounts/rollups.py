@@ -0,0 +1,157 @@
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedAvailabilitySlot,
+    ArchivedClassSession,
+    ClassSession,
+    TeacherAvailabilitySlot,
+    TeacherDailyStats,
+    TeacherProfile,
+)
+
+BOOKED_STATUSES = (ClassSession.Status.SCHEDULED, ClassSession.Status.COMPLETED)
+
+
+def session_revenue(hourly_rate, start_time, end_time) -> Decimal:
+    hours = Decimal((end_time - start_time).total_seconds()) / Decimal(3600)
+    return (hourly_rate * hours).quantize(Decimal("0.01"))
+
+
+def _status_counters(status, revenue) -> dict:
+    if status == ClassSession.Status.SCHEDULED:
+        return {"slots_booked": 1}
+    if status == ClassSession.Status.COMPLETED:
+        return {"slots_booked": 1, "sessions_completed": 1, "revenue": revenue}
+    if status == ClassSession.Status.CANCELLED:
+        return {"sessions_cancelled": 1}
+    return {}
+
+
+def _add_status_change(deltas, teacher_id, start_time, from_status, to_status, revenue):
+    counters = deltas[(teacher_id, timezone.localdate(start_time))]
+    counters.update(_status_counters(to_status, revenue))
+    counters.subtract(_status_counters(from_status, revenue))
+
+
+def apply_rollup_deltas(deltas):
+    pending = {}
+    for key, counters in deltas.items():
+        changes = {field: value for field, value in counters.items() if value}
+        if changes:
+            pending[key] = changes
+    if not pending:
+        return
+    # Decrements never create rows, so cascading deletes cannot resurrect stats for a removed teacher.
+    TeacherDailyStats.objects.bulk_create(
+        [
+            TeacherDailyStats(teacher_id=teacher_id, day=day)
+            for (teacher_id, day), changes in pending.items()
+            if any(value > 0 for value in changes.values())
+        ],
+        ignore_conflicts=True,
+    )
+    now = timezone.now()
+    for (teacher_id, day), changes in pending.items():
+        TeacherDailyStats.objects.filter(teacher_id=teacher_id, day=day).update(
+            updated_at=now,
+            **{field: F(field) + value for field, value in changes.items()},
+        )
+
+
+def record_session_transition(session, from_status):
+    revenue = Decimal("0")
+    if ClassSession.Status.COMPLETED in (from_status, session.status):
+        revenue = session_revenue(session.teacher.hourly_rate, session.start_time, session.end_time)
+    deltas = defaultdict(Counter)
+    _add_status_change(deltas, session.teacher_id, session.start_time, from_status, session.status, revenue)
+    apply_rollup_deltas(deltas)
+
+
+def record_bulk_session_transition(rows, from_status, to_status):
+    rates = {}
+    if ClassSession.Status.COMPLETED in (from_status, to_status):
+        rates = dict(
+            TeacherProfile.objects.filter(pk__in={row[1] for row in rows}).values_list("pk", "hourly_rate")
+        )
+    deltas = defaultdict(Counter)
+    for _, teacher_id, _, start_time, end_time in rows:
+        revenue = Decimal("0")
+        if teacher_id in rates:
+            revenue = session_revenue(rates[teacher_id], start_time, end_time)
+        _add_status_change(deltas, teacher_id, start_time, from_status, to_status, revenue)
+    apply_rollup_deltas(deltas)
+
+
+def record_slot_changes(previous_rows=(), current_rows=()):
+    deltas = defaultdict(Counter)
+    for teacher_id, start_time, is_active in previous_rows:
+        if is_active:
+            deltas[(teacher_id, timezone.localdate(start_time))]["slots_offered"] -= 1
+    for teacher_id, start_time, is_active in current_rows:
+        if is_active:
+            deltas[(teacher_id, timezone.localdate(start_time))]["slots_offered"] += 1
+    apply_rollup_deltas(deltas)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def rebuild_day(day) -> int:
+    start, end = day_bounds(day)
+    counters = defaultdict(Counter)
+    with transaction.atomic():
+        for slot_model in (TeacherAvailabilitySlot, ArchivedAvailabilitySlot):
+            offered = (
+                slot_model.objects.filter(start_time__gte=start, start_time__lt=end, is_active=True)
+                .values_list("teacher_id")
+                .annotate(total=Count("pk"))
+                .order_by()
+            )
+            for teacher_id, total in offered:
+                counters[teacher_id]["slots_offered"] += total
+
+        for session_model in (ClassSession, ArchivedClassSession):
+            sessions = session_model.objects.filter(start_time__gte=start, start_time__lt=end)
+            session_counts = (
+                sessions.values_list("teacher_id")
+                .annotate(
+                    booked=Count("pk", filter=Q(status__in=BOOKED_STATUSES)),
+                    completed=Count("pk", filter=Q(status=ClassSession.Status.COMPLETED)),
+                    cancelled=Count("pk", filter=Q(status=ClassSession.Status.CANCELLED)),
+                )
+                .order_by()
+            )
+            for teacher_id, booked, completed, cancelled in session_counts:
+                counters[teacher_id].update(
+                    slots_booked=booked,
+                    sessions_completed=completed,
+                    sessions_cancelled=cancelled,
+                )
+
+            completed_rows = sessions.filter(status=ClassSession.Status.COMPLETED).values_list(
+                "teacher_id",
+                "teacher__hourly_rate",
+                "start_time",
+                "end_time",
+            )
+            for teacher_id, hourly_rate, start_time, end_time in completed_rows:
+                counters[teacher_id]["revenue"] += session_revenue(hourly_rate, start_time, end_time)
+
+        TeacherDailyStats.objects.filter(day=day).delete()
+        TeacherDailyStats.objects.bulk_create(
+            [
+                TeacherDailyStats(teacher_id=teacher_id, day=day, **teacher_counters)
+                for teacher_id, teacher_counters in counters.items()
+                if any(teacher_counters.values())
+            ]
+        )
+    return len(counters)
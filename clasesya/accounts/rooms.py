@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import partial
+from urllib.parse import urlparse
+
+from django.core import signing
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import VIRTUAL_ROOM_URL_TEMPLATE, ClassSession
+
+ROOM_TOKEN_SALT = "accounts.room-token"
+ROOM_TOKEN_GRACE = timedelta(minutes=15)
+ROOM_SHELL_TIMEOUT = 60 * 60
+REVOCATION_REFRESH_SECONDS = 30
+
+ROOM_DOMAIN = urlparse(VIRTUAL_ROOM_URL_TEMPLATE).netloc
+
+
+def room_token_payload(session, role: str) -> dict:
+    participant = session.student if role == "student" else session.teacher
+    return {
+        "session": session.pk,
+        "role": role,
+        "user": participant.user_id,
+        "name": participant.display_name,
+        "room": str(session.virtual_room_code),
+        "topic": session.topic,
+        "start": int(session.start_time.timestamp()),
+        "end": int(session.end_time.timestamp()),
+        "exp": int((session.end_time + ROOM_TOKEN_GRACE).timestamp()),
+    }
+
+
+def issue_room_token(session, role: str) -> str:
+    return signing.dumps(room_token_payload(session, role), salt=ROOM_TOKEN_SALT, compress=True)
+
+
+def read_room_token(token: str):
+    try:
+        return signing.loads(token, salt=ROOM_TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def room_token_expired(payload) -> bool:
+    return payload["exp"] <= time.time()
+
+
+def room_shell_key(payload) -> str:
+    fields = {name: value for name, value in payload.items() if name != "exp"}
+    digest = hashlib.md5(json.dumps(fields, sort_keys=True).encode(), usedforsecurity=False).hexdigest()
+    return f"accounts:room-shell:{payload['session']}:{digest}"
+
+
+def render_room_shell(payload) -> str:
+    room_url = VIRTUAL_ROOM_URL_TEMPLATE.format(code=payload["room"])
+    start_time = datetime.fromtimestamp(payload["start"], tz=dt_timezone.utc)
+    end_time = datetime.fromtimestamp(payload["end"], tz=dt_timezone.utc)
+    return render_to_string(
+        "accounts/class_session_room.html",
+        {
+            "topic": payload["topic"],
+            "display_name": payload["name"],
+            "room_url": room_url,
+            "room_domain": ROOM_DOMAIN,
+            "room_name": urlparse(room_url).path.strip("/"),
+            "start_time_local": timezone.localtime(start_time),
+            "end_time_local": timezone.localtime(end_time),
+            "start_timestamp": payload["start"],
+            "detail_url": reverse("accounts:session_detail", args=[payload["session"]]),
+        },
+    )
+
+
+class RevokedSessions:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._session_ids = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._session_ids
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def refresh(self):
+        # Claiming the refresh first keeps concurrent requests from all querying at once.
+        self._loaded_at = time.monotonic()
+        session_ids = ClassSession.objects.filter(
+            status=ClassSession.Status.CANCELLED,
+            end_time__gt=timezone.now() - ROOM_TOKEN_GRACE,
+        ).order_by().values_list("pk", flat=True)
+        with self._lock:
+            self._session_ids = frozenset(session_ids)
+
+    def update(self, rows):
+        with self._lock:
+            cancelled = {session_id for session_id, status in rows if status == ClassSession.Status.CANCELLED}
+            reopened = {session_id for session_id, status in rows if status != ClassSession.Status.CANCELLED}
+            self._session_ids = (self._session_ids - reopened) | cancelled
+
+
+revoked_sessions = RevokedSessions(REVOCATION_REFRESH_SECONDS)
+
+
+def track_room_revocations(rows):
+    rows = list(rows)
+    if rows:
+        transaction.on_commit(partial(revoked_sessions.update, rows))
@@ -0,0 +1,100 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import invalidate_session_caches, invalidate_teacher_slots
+from .feed import publish_session_changes
+from .models import (
+    ClassSession,
+    StudentProfile,
+    TeacherAvailabilitySlot,
+    TeacherProfile,
+    TeacherSubject,
+    User,
+    split_subjects,
+)
+from .popularity import refresh_next_free_slots
+from .recommendations import request_refresh
+from .rollups import record_slot_changes
+from .rooms import track_room_revocations
+
+DISPLAY_NAME_FIELDS = {"first_name", "last_name", "username"}
+INTEREST_FIELDS = {"preferred_subject", "learning_goals"}
+
+
+@receiver(post_save, sender=TeacherAvailabilitySlot)
+@receiver(post_delete, sender=TeacherAvailabilitySlot)
+def invalidate_slot_caches(sender, instance, **kwargs):
+    invalidate_teacher_slots([instance.teacher_id])
+    refresh_next_free_slots([instance.teacher_id])
+
+
+@receiver(pre_save, sender=TeacherAvailabilitySlot)
+def remember_stored_slot(sender, instance, **kwargs):
+    instance._stored_rollup_row = None
+    if not instance._state.adding:
+        instance._stored_rollup_row = (
+            sender.objects.filter(pk=instance.pk).values_list("teacher_id", "start_time", "is_active").first()
+        )
+
+
+@receiver(post_save, sender=TeacherAvailabilitySlot)
+def update_slot_rollups(sender, instance, **kwargs):
+    stored_row = getattr(instance, "_stored_rollup_row", None)
+    record_slot_changes(
+        previous_rows=[stored_row] if stored_row else [],
+        current_rows=[(instance.teacher_id, instance.start_time, instance.is_active)],
+    )
+
+
+@receiver(post_delete, sender=TeacherAvailabilitySlot)
+def remove_slot_from_rollups(sender, instance, **kwargs):
+    record_slot_changes(previous_rows=[(instance.teacher_id, instance.start_time, instance.is_active)])
+
+
+@receiver(post_save, sender=ClassSession)
+@receiver(post_delete, sender=ClassSession)
+def invalidate_class_session_caches(sender, instance, **kwargs):
+    invalidate_session_caches([instance.teacher_id], [instance.student_id], [instance.pk])
+
+
+@receiver(post_save, sender=ClassSession)
+@receiver(post_delete, sender=ClassSession)
+def refresh_teacher_next_free_slot(sender, instance, **kwargs):
+    if instance.slot_id is not None:
+        refresh_next_free_slots([instance.teacher_id])
+
+
+@receiver(post_save, sender=ClassSession)
+def publish_class_session_change(sender, instance, **kwargs):
+    publish_session_changes([(instance.pk, instance.teacher_id, instance.student_id, instance.status)])
+    track_room_revocations([(instance.pk, instance.status)])
+
+
+@receiver(post_save, sender=User)
+def sync_profile_display_names(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not DISPLAY_NAME_FIELDS.intersection(update_fields)):
+        return
+    display_name = instance.display_name()
+    for profile_model in (StudentProfile, TeacherProfile):
+        profile_model.objects.filter(user=instance).exclude(display_name=display_name).update(
+            display_name=display_name
+        )
+
+
+@receiver(post_save, sender=TeacherProfile)
+def sync_teacher_subject_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "subjects" not in update_fields:
+        return
+    names = split_subjects(instance.subjects)
+    TeacherSubject.objects.filter(teacher=instance).exclude(name__in=names).delete()
+    TeacherSubject.objects.bulk_create(
+        [TeacherSubject(teacher=instance, name=name) for name in names],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=StudentProfile)
+def queue_student_recommendations(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not INTEREST_FIELDS.intersection(update_fields):
+        return
+    request_refresh(instance.user_id)
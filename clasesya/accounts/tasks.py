@@ -0,0 +1,99 @@
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxTask
+
+logger = logging.getLogger(__name__)
+
+TASK_HANDLERS = {}
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+ENQUEUE_BATCH_SIZE = 1000
+
+
+def task(name: str):
+    def decorator(func):
+        TASK_HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name: str, **payload) -> OutboxTask:
+    # The row joins the caller's transaction, so workers only see it once the change commits.
+    return OutboxTask.objects.create(name=name, payload=payload)
+
+
+def enqueue_many(name: str, payloads) -> int:
+    created = 0
+    batch = []
+    for payload in payloads:
+        batch.append(OutboxTask(name=name, payload=payload))
+        if len(batch) >= ENQUEUE_BATCH_SIZE:
+            created += len(OutboxTask.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        created += len(OutboxTask.objects.bulk_create(batch))
+    return created
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    seconds = min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def claim_tasks(batch_size: int, stale_after: timedelta) -> list[OutboxTask]:
+    now = timezone.now()
+    claimable = Q(status=OutboxTask.Status.PENDING, run_after__lte=now) | Q(
+        status=OutboxTask.Status.RUNNING,
+        locked_at__lt=now - stale_after,
+    )
+    candidate_ids = list(
+        OutboxTask.objects.filter(claimable).order_by("run_after").values_list("pk", flat=True)[:batch_size]
+    )
+    if not candidate_ids:
+        return []
+
+    claim_id = uuid.uuid4().hex
+    OutboxTask.objects.filter(claimable, pk__in=candidate_ids).update(
+        status=OutboxTask.Status.RUNNING,
+        locked_by=claim_id,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+    return list(OutboxTask.objects.filter(pk__in=candidate_ids, locked_by=claim_id))
+
+
+def run_task(outbox_task: OutboxTask) -> bool:
+    owned = OutboxTask.objects.filter(pk=outbox_task.pk, locked_by=outbox_task.locked_by)
+    try:
+        handler = TASK_HANDLERS.get(outbox_task.name)
+        if handler is None:
+            raise LookupError(f"No handler registered for task '{outbox_task.name}'.")
+        handler(**outbox_task.payload)
+    except Exception:
+        now = timezone.now()
+        error = traceback.format_exc()
+        logger.warning("Task %s (%s) failed on attempt %s", outbox_task.pk, outbox_task.name, outbox_task.attempts)
+        if outbox_task.attempts >= outbox_task.max_attempts:
+            owned.update(status=OutboxTask.Status.FAILED, locked_by="", last_error=error, updated_at=now)
+        else:
+            owned.update(
+                status=OutboxTask.Status.PENDING,
+                locked_by="",
+                last_error=error,
+                run_after=now + backoff_delay(outbox_task.attempts),
+                updated_at=now,
+            )
+        return False
+    else:
+        owned.update(status=OutboxTask.Status.DONE, locked_by="", updated_at=timezone.now())
+        return True
@@ -1,12 +1,60 @@
-from datetime import timedelta
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, identify_hasher
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import ClassSession, StudentProfile, TeacherAvailabilitySlot, TeacherProfile
+from .archive import archive_sessions
+from .bulk import cancel_sessions
+from .caching import get_or_compute
+from .dashboard import session_dashboard
+from .events import record_status_change
+from .hashing import hashing_service
+from .ical import feed_token
+from .models import (
+    TEACHER_POPULARITY_ORDERING,
+    TEACHER_SOONEST_ORDERING,
+    ArchivedAvailabilitySlot,
+    ArchivedClassSession,
+    ArchivedSessionEvent,
+    ClassSession,
+    OutboxTask,
+    SessionEvent,
+    SessionReminder,
+    SlotHold,
+    StudentProfile,
+    TeacherAvailabilitySlot,
+    TeacherDailyStats,
+    TeacherProfile,
+)
+from .ratelimit import Rate, rate_limit_key, take_token
+from .recommendations import compute_recommendations
+from .reminders import claim_reminders, dispatch_due_reminders
+from .rooms import issue_room_token, revoked_sessions
+from .tasks import enqueue
+from .views import SessionStatusStreamView, SlotAvailabilityView
+from .weekgrid import week_grid, week_start
 
 
 class LogoutFlowTests(TestCase):
@@ -398,3 +446,1821 @@ class ClassSessionSchedulingTests(TestCase):
         )
 
         self.assertRedirects(response, reverse("accounts:session_detail", args=[session.pk]))
+
+
+class SessionStorageTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="sesiones", password="pass1234")
+
+    def test_authenticated_requests_do_not_query_session_table(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("accounts:home"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("accounts:home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("django_session" in query["sql"] for query in queries.captured_queries))
+
+    def test_purge_sessions_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(
+                session_key=f"expired{index}",
+                session_data="",
+                expire_date=now - timedelta(days=1),
+            )
+        Session.objects.create(session_key="active", session_data="", expire_date=now + timedelta(days=1))
+
+        output = StringIO()
+        call_command("purge_sessions", batch_size=2, stdout=output)
+
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["active"])
+        self.assertIn("5 en 3 lotes", output.getvalue())
+
+
+class TeacherDetailSlotsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(username="alumno", password="pass1234")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        teacher_user = user_model.objects.create_user(
+            username="profesora",
+            password="pass1234",
+            first_name="Rosa",
+            last_name="Mena",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Quimica",
+            hourly_rate=Decimal("20.00"),
+        )
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.slots = [
+            TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start + timedelta(hours=hour))
+            for hour in range(11)
+        ]
+        self.detail_url = reverse("accounts:teacher_detail", args=[self.teacher_profile.pk])
+        self.client.force_login(self.student)
+
+    def test_detail_shows_first_ten_slots_and_reuses_cached_slots(self):
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(len(response.context["available_slots"]), 10)
+        self.assertTrue(response.context["has_more_slots"])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.detail_url)
+        self.assertFalse(
+            any("accounts_teacheravailabilityslot" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_booking_a_slot_invalidates_cached_slots(self):
+        self.client.get(self.detail_url)
+        booked_slot = self.slots[0]
+        ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Estequiometria",
+            start_time=booked_slot.start_time,
+            end_time=booked_slot.end_time,
+            slot=booked_slot,
+        )
+
+        response = self.client.get(self.detail_url)
+
+        self.assertNotIn(booked_slot.pk, [slot.pk for slot in response.context["available_slots"]])
+        self.assertFalse(response.context["has_more_slots"])
+
+
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.admin_user = user_model.objects.create_superuser(username="admin", password="pass1234")
+        teacher_user = user_model.objects.create_user(username="docente", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Biologia",
+            hourly_rate=Decimal("18.00"),
+        )
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.created = 0
+        self.client.force_login(self.admin_user)
+
+    def _add_sessions(self, count):
+        for _ in range(count):
+            student_user = get_user_model().objects.create_user(username=f"alumno{self.created}")
+            student_profile = StudentProfile.objects.create(user=student_user)
+            start_time = self.start + timedelta(hours=self.created)
+            slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start_time)
+            ClassSession.objects.create(
+                teacher=self.teacher_profile,
+                student=student_profile,
+                topic="Celulas",
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                slot=slot,
+            )
+            self.created += 1
+
+    def _count_changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        for model_name in ("classsession", "teacheravailabilityslot"):
+            with self.subTest(model=model_name):
+                url = reverse(f"admin:accounts_{model_name}_changelist")
+                self._add_sessions(2)
+                small_page_queries = self._count_changelist_queries(url)
+                self._add_sessions(8)
+                large_page_queries = self._count_changelist_queries(url)
+                self.assertEqual(small_page_queries, large_page_queries)
+
+
+class BulkScheduleOperationTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        teacher_user = user_model.objects.create_user(username="ausente", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Geografia",
+            hourly_rate=Decimal("22.00"),
+        )
+        self.student_profile = StudentProfile.objects.create(
+            user=user_model.objects.create_user(username="viajero"),
+        )
+        self.start = (timezone.now() + timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+        self.slots = [
+            TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=self.start + timedelta(hours=hour))
+            for hour in range(3)
+        ]
+        booked_slot = self.slots[0]
+        self.session = ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Mapas",
+            start_time=booked_slot.start_time,
+            end_time=booked_slot.end_time,
+            slot=booked_slot,
+        )
+
+    def _run(self, *args):
+        output = StringIO()
+        call_command("bulk_teacher_schedule", *args, "--teacher", str(self.teacher_profile.pk), stdout=output)
+        return output.getvalue()
+
+    def test_deactivate_slots_keeps_booked_slots_unless_asked_to_cancel(self):
+        day = self.start.date().isoformat()
+
+        output = self._run("deactivate-slots", "--from", day, "--to", day)
+
+        self.assertIn("deactivated=2, skipped_booked=1", output)
+        self.assertEqual(TeacherAvailabilitySlot.objects.filter(is_active=True).count(), 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, ClassSession.Status.SCHEDULED)
+
+        output = self._run("deactivate-slots", "--cancel-sessions")
+
+        self.assertIn("deactivated=1", output)
+        self.assertIn("cancelled=1", output)
+        self.assertFalse(TeacherAvailabilitySlot.objects.filter(is_active=True).exists())
+
+    def test_cancel_sessions_blocks_slots_by_default(self):
+        output = self._run("cancel-sessions")
+
+        self.assertIn("cancelled=1, blocked_slots=1", output)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, ClassSession.Status.CANCELLED)
+        self.slots[0].refresh_from_db()
+        self.assertFalse(self.slots[0].is_active)
+
+    def test_dry_run_does_not_change_rows(self):
+        output = self._run("cancel-sessions", "--release-slots", "--dry-run")
+
+        self.assertIn("[simulacion] cancelled=1, blocked_slots=0", output)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, ClassSession.Status.SCHEDULED)
+
+    def test_admin_action_cancels_selected_sessions(self):
+        admin_user = get_user_model().objects.create_superuser(username="operaciones", password="pass1234")
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            reverse("admin:accounts_classsession_changelist"),
+            {"action": "cancel_and_release_slots", "_selected_action": [self.session.pk]},
+            follow=True,
+        )
+
+        self.assertContains(response, "Sesiones canceladas: 1")
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, ClassSession.Status.CANCELLED)
+        self.assertTrue(self.slots[0].is_available())
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.staff_user = user_model.objects.create_user(username="finanzas", is_staff=True)
+        teacher_user = user_model.objects.create_user(
+            username="tesorera",
+            first_name="Eva",
+            last_name="Soto",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Economia",
+            hourly_rate=Decimal("45.00"),
+        )
+        student_profile = StudentProfile.objects.create(user=user_model.objects.create_user(username="contador"))
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=self.start)
+        ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=student_profile,
+            topic="Balances",
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            slot=slot,
+        )
+
+    def test_staff_can_stream_sessions_as_csv(self):
+        self.client.force_login(self.staff_user)
+
+        response = self.client.get(reverse("accounts:export_sessions"), {"teacher": self.teacher_profile.pk})
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "teacher_id", "teacher_username"])
+        self.assertIn("tesorera", lines[1])
+        self.assertIn("45.00", lines[1])
+        self.assertEqual(len(lines), 2)
+
+    def test_slot_export_supports_gzip_ndjson_and_date_filters(self):
+        self.client.force_login(self.staff_user)
+        day = self.start.date()
+
+        response = self.client.get(
+            reverse("accounts:export_slots"),
+            {"format": "ndjson", "gzip": "1", "date_from": day.isoformat(), "date_to": day.isoformat()},
+        )
+        rows = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(len(rows), 1)
+        self.assertTrue(json.loads(rows[0])["is_booked"])
+
+        later = (day + timedelta(days=1)).isoformat()
+        response = self.client.get(reverse("accounts:export_slots"), {"date_from": later})
+        self.assertEqual(len(b"".join(response.streaming_content).decode().splitlines()), 1)
+
+    def test_export_is_restricted_to_staff(self):
+        self.client.force_login(self.teacher_profile.user)
+
+        response = self.client.get(reverse("accounts:export_sessions"))
+
+        self.assertRedirects(response, reverse("accounts:home"))
+
+    def test_export_command_writes_ndjson(self):
+        output = StringIO()
+
+        call_command("export_data", "sessions", "--format", "ndjson", stdout=output)
+
+        row = json.loads(output.getvalue().splitlines()[0])
+        self.assertEqual(row["topic"], "Balances")
+        self.assertEqual(row["status"], ClassSession.Status.SCHEDULED)
+
+    def test_exports_include_archived_rows(self):
+        session = ClassSession.objects.get()
+        old_start = self.start - timedelta(days=400)
+        ClassSession.objects.filter(pk=session.pk).update(
+            start_time=old_start, end_time=old_start + timedelta(hours=1), status=ClassSession.Status.COMPLETED
+        )
+        TeacherAvailabilitySlot.objects.bulk_create(
+            [TeacherAvailabilitySlot(teacher=self.teacher_profile, start_time=old_start - timedelta(days=1))]
+        )
+        archive_sessions(timezone.now() - timedelta(days=180))
+        self.assertTrue(ArchivedClassSession.objects.filter(pk=session.pk).exists())
+        self.client.force_login(self.staff_user)
+        day = old_start.date()
+
+        response = self.client.get(reverse("accounts:export_sessions"), {"date_to": day.isoformat()})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Balances", lines[1])
+
+        response = self.client.get(reverse("accounts:export_slots"), {"format": "ndjson"})
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["is_booked"] for row in rows], [False, True])
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        teacher_user = user_model.objects.create_user(
+            username="agenda",
+            first_name="Irene",
+            last_name="Vidal",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Literatura",
+            hourly_rate=Decimal("28.00"),
+        )
+        self.student_user = user_model.objects.create_user(username="lector")
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.session = ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Poesia, metrica; rima",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        self.feed_url = reverse(
+            "accounts:calendar_feed",
+            kwargs={"token": feed_token("student", self.student_profile.pk)},
+        )
+
+    def test_feed_streams_events_and_supports_conditional_requests(self):
+        response = self.client.get(self.feed_url)
+
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn(r"SUMMARY:ClasesYa: Poesia\, metrica\; rima", body)
+        self.assertIn(f"UID:{self.session.virtual_room_code}@clasesya", body)
+        self.assertIn("STATUS:CONFIRMED", body)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.feed_url)
+        self.assertEqual(cached_response.content.decode(), body)
+
+        not_modified = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_session_change_invalidates_cached_feed(self):
+        first = self.client.get(self.feed_url)
+        b"".join(first.streaming_content)
+
+        self.session.status = ClassSession.Status.CANCELLED
+        self.session.save()
+
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("STATUS:CANCELLED", b"".join(response.streaming_content).decode())
+
+    def test_invalid_token_returns_404(self):
+        response = self.client.get(reverse("accounts:calendar_feed", kwargs={"token": "student-1:invalida"}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_session_list_links_to_feed(self):
+        self.client.force_login(self.student_user)
+
+        response = self.client.get(reverse("accounts:session_list"))
+
+        self.assertContains(response, self.feed_url)
+
+
+class BackgroundTaskTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(
+            username="notificada",
+            password="pass1234",
+            email="notificada@example.com",
+        )
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        teacher_user = user_model.objects.create_user(
+            username="avisos",
+            email="avisos@example.com",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Musica",
+            hourly_rate=Decimal("15.00"),
+        )
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start)
+
+    def _run_worker(self):
+        output = StringIO()
+        call_command("run_tasks", "--once", "--workers", "1", stdout=output)
+        return output.getvalue()
+
+    def test_booking_enqueues_notification_sent_by_worker(self):
+        self.client.force_login(self.student)
+
+        self.client.post(
+            reverse("accounts:session_create", kwargs={"teacher_pk": self.teacher_profile.pk}),
+            {"topic": "Armonia", "description": "", "slot": str(self.slot.pk)},
+        )
+
+        self.assertEqual(len(mail.outbox), 0)
+        outbox_task = OutboxTask.objects.get()
+        self.assertEqual(outbox_task.name, "notifications.session_booked")
+
+        output = self._run_worker()
+
+        self.assertIn("Tareas completadas: 1", output)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["avisos@example.com", "notificada@example.com"],
+        )
+        outbox_task.refresh_from_db()
+        self.assertEqual(outbox_task.status, OutboxTask.Status.DONE)
+
+    def test_failed_task_is_retried_with_backoff_until_max_attempts(self):
+        outbox_task = enqueue("notifications.unknown")
+        outbox_task.max_attempts = 2
+        outbox_task.save()
+
+        self._run_worker()
+        outbox_task.refresh_from_db()
+        self.assertEqual(outbox_task.status, OutboxTask.Status.PENDING)
+        self.assertEqual(outbox_task.attempts, 1)
+        self.assertGreater(outbox_task.run_after, timezone.now())
+        self.assertIn("LookupError", outbox_task.last_error)
+
+        OutboxTask.objects.filter(pk=outbox_task.pk).update(run_after=timezone.now())
+        self._run_worker()
+        outbox_task.refresh_from_db()
+        self.assertEqual(outbox_task.status, OutboxTask.Status.FAILED)
+
+    def test_signup_enqueues_welcome_email(self):
+        self.client.post(
+            reverse("accounts:student_signup"),
+            {
+                "username": "nueva",
+                "first_name": "Nora",
+                "last_name": "Paz",
+                "email": "nora@example.com",
+                "password1": "ClaveSegura123",
+                "password2": "ClaveSegura123",
+            },
+        )
+
+        self._run_worker()
+
+        self.assertEqual(mail.outbox[0].to, ["nora@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "Bienvenido a ClasesYa")
+
+
+class SessionReminderTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        teacher_user = user_model.objects.create_user(
+            username="puntual",
+            email="puntual@example.com",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Ingles",
+            hourly_rate=Decimal("19.00"),
+        )
+        self.student_profile = StudentProfile.objects.create(
+            user=user_model.objects.create_user(username="olvidadizo", email="olvidadizo@example.com"),
+        )
+
+    def _create_session(self, starts_in, topic):
+        start = timezone.now() + starts_in
+        session = ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic=topic,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        ClassSession.objects.filter(pk=session.pk).update(created_at=start - timedelta(days=3))
+        return session
+
+    def test_reminders_are_sent_once_per_session_and_kind(self):
+        tomorrow = self._create_session(timedelta(hours=20), "Phrasal verbs")
+        soon = self._create_session(timedelta(minutes=10), "Listening")
+        self._create_session(timedelta(days=3), "Lejana")
+
+        output = StringIO()
+        call_command("send_reminders", stdout=output)
+        call_command("send_reminders", stdout=StringIO())
+
+        self.assertIn("[24h] recordatorios=1 correos=2", output.getvalue())
+        self.assertIn("[15m] recordatorios=1 correos=2", output.getvalue())
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            set(SessionReminder.objects.values_list("session_id", "kind")),
+            {(tomorrow.pk, SessionReminder.Kind.DAY_BEFORE), (soon.pk, SessionReminder.Kind.SHORTLY_BEFORE)},
+        )
+        self.assertFalse(SessionReminder.objects.filter(sent_at__isnull=True).exists())
+
+    def test_reminder_claimed_by_another_worker_is_not_sent_again(self):
+        session = self._create_session(timedelta(hours=5), "Gramatica")
+        claim_reminders(SessionReminder.Kind.DAY_BEFORE, [session.pk])
+
+        result = dispatch_due_reminders(SessionReminder.Kind.DAY_BEFORE)
+
+        self.assertEqual(result["sent"], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class SessionEventLogTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(username="historial")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        self.teacher_user = user_model.objects.create_user(username="bitacora", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user,
+            subjects="Filosofia",
+            hourly_rate=Decimal("27.00"),
+        )
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start)
+
+    def test_booking_and_status_change_are_logged_once_committed(self):
+        self.client.force_login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("accounts:session_create", kwargs={"teacher_pk": self.teacher_profile.pk}),
+                {"topic": "Etica", "description": "", "slot": str(self.slot.pk)},
+            )
+        session = ClassSession.objects.get()
+
+        self.client.force_login(self.teacher_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("accounts:session_detail", args=[session.pk]),
+                {"status": ClassSession.Status.COMPLETED},
+            )
+
+        timeline = list(session.events.values_list("kind", "from_status", "to_status", "actor_id"))
+        self.assertEqual(
+            timeline,
+            [
+                (SessionEvent.Kind.BOOKED, "", "scheduled", self.student.pk),
+                (SessionEvent.Kind.COMPLETED, "scheduled", "completed", self.teacher_user.pk),
+            ],
+        )
+        with self.assertRaises(ValueError):
+            session.events.first().save()
+
+    def test_rejected_booking_leaves_no_event(self):
+        self.client.force_login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("accounts:session_create", kwargs={"teacher_pk": self.teacher_profile.pk}),
+                {"topic": "", "description": "", "slot": str(self.slot.pk)},
+            )
+
+        self.assertFalse(SessionEvent.objects.exists())
+
+    def test_bulk_cancellation_logs_one_event_per_session(self):
+        session = ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Logica",
+            start_time=self.slot.start_time,
+            end_time=self.slot.end_time,
+            slot=self.slot,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_sessions(ClassSession.objects.all())
+
+        event = SessionEvent.objects.get()
+        self.assertEqual((event.session_id, event.kind, event.source), (session.pk, "cancelled", "system"))
+
+    def test_archive_command_moves_old_events(self):
+        old_event = SessionEvent.objects.create(
+            session_id=1,
+            teacher_id=self.teacher_profile.pk,
+            kind=SessionEvent.Kind.BOOKED,
+            to_status=ClassSession.Status.SCHEDULED,
+            created_at=timezone.now() - timedelta(days=400),
+        )
+        SessionEvent.objects.create(
+            session_id=2,
+            teacher_id=self.teacher_profile.pk,
+            kind=SessionEvent.Kind.BOOKED,
+            to_status=ClassSession.Status.SCHEDULED,
+        )
+
+        call_command("archive_session_events", "--older-than", "365", "--batch-size", "1", stdout=StringIO())
+
+        self.assertEqual(list(ArchivedSessionEvent.objects.values_list("pk", flat=True)), [old_event.pk])
+        self.assertEqual(list(SessionEvent.objects.values_list("session_id", flat=True)), [2])
+
+
+class TeacherDailyStatsTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(username="estadistica")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        self.teacher_user = user_model.objects.create_user(
+            username="rollup",
+            first_name="Rosa",
+            last_name="Ruiz",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user,
+            subjects="Economia",
+            hourly_rate=Decimal("40.00"),
+        )
+        start = (timezone.now() + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        self.slots = [
+            TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start + timedelta(hours=offset))
+            for offset in range(3)
+        ]
+        self.day = timezone.localdate(start)
+
+    def _stats(self):
+        return TeacherDailyStats.objects.filter(teacher=self.teacher_profile).values(
+            "day",
+            "slots_offered",
+            "slots_booked",
+            "sessions_completed",
+            "sessions_cancelled",
+            "revenue",
+        )
+
+    def _book(self, slot):
+        self.client.force_login(self.student)
+        self.client.post(
+            reverse("accounts:session_create", kwargs={"teacher_pk": self.teacher_profile.pk}),
+            {"topic": "Mercados", "description": "", "slot": str(slot.pk)},
+        )
+        return ClassSession.objects.get(slot=slot)
+
+    def test_rollups_follow_bookings_and_status_changes(self):
+        first = self._book(self.slots[0])
+        self._book(self.slots[1])
+        self.client.force_login(self.teacher_user)
+        self.client.post(reverse("accounts:session_detail", args=[first.pk]), {"status": ClassSession.Status.COMPLETED})
+        self.slots[2].is_active = False
+        self.slots[2].save()
+
+        incremental = list(self._stats())
+        self.assertEqual(
+            incremental,
+            [
+                {
+                    "day": self.day,
+                    "slots_offered": 2,
+                    "slots_booked": 2,
+                    "sessions_completed": 1,
+                    "sessions_cancelled": 0,
+                    "revenue": Decimal("40.00"),
+                }
+            ],
+        )
+
+        TeacherDailyStats.objects.all().delete()
+        call_command("rebuild_teacher_stats", "--workers", "1", stdout=StringIO())
+        self.assertEqual(list(self._stats()), incremental)
+
+    def test_bulk_cancellation_updates_rollups(self):
+        self._book(self.slots[0])
+
+        cancel_sessions(ClassSession.objects.all(), block_slots=True)
+
+        stats = self._stats().get()
+        self.assertEqual(
+            (stats["slots_offered"], stats["slots_booked"], stats["sessions_cancelled"]),
+            (2, 0, 1),
+        )
+
+    def test_dashboard_reads_rollups_for_staff_only(self):
+        TeacherDailyStats.objects.filter(teacher=self.teacher_profile).update(
+            slots_booked=3,
+            sessions_completed=2,
+            revenue=Decimal("80.00"),
+        )
+        url = reverse("accounts:teacher_stats")
+        query = {"date_from": self.day.isoformat(), "date_to": self.day.isoformat()}
+
+        self.client.force_login(self.student)
+        self.assertRedirects(self.client.get(url, query), reverse("accounts:home"))
+
+        staff = get_user_model().objects.create_user(username="operaciones", is_staff=True)
+        self.client.force_login(staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, query)
+
+        self.assertContains(response, "Rosa Ruiz")
+        self.assertContains(response, "$80,00")
+        self.assertContains(response, "100%")
+        self.assertFalse(
+            any("accounts_classsession" in query["sql"] or "accounts_teacheravailabilityslot" in query["sql"]
+                for query in queries.captured_queries)
+        )
+
+
+class SessionArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(username="archivo")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        teacher_user = user_model.objects.create_user(username="historiador", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Historia",
+            hourly_rate=Decimal("22.00"),
+        )
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.sessions = {}
+        for label, days_ago, status in (
+            ("old_completed", 400, ClassSession.Status.COMPLETED),
+            ("old_cancelled", 300, ClassSession.Status.CANCELLED),
+            ("old_scheduled", 250, ClassSession.Status.SCHEDULED),
+            ("recent_completed", 10, ClassSession.Status.COMPLETED),
+        ):
+            slot = TeacherAvailabilitySlot.objects.bulk_create(
+                [TeacherAvailabilitySlot(teacher=self.teacher_profile, start_time=now - timedelta(days=days_ago))]
+            )[0]
+            self.sessions[label] = ClassSession.objects.bulk_create(
+                [
+                    ClassSession(
+                        teacher=self.teacher_profile,
+                        student=self.student_profile,
+                        topic=label,
+                        start_time=slot.start_time,
+                        end_time=slot.end_time,
+                        status=status,
+                        slot=slot,
+                    )
+                ]
+            )[0]
+        self.unused_slot = TeacherAvailabilitySlot.objects.bulk_create(
+            [TeacherAvailabilitySlot(teacher=self.teacher_profile, start_time=now - timedelta(days=200))]
+        )[0]
+
+    def test_archive_moves_finished_sessions_and_unused_slots(self):
+        old = self.sessions["old_completed"]
+        SessionReminder.objects.create(session=old, kind=SessionReminder.Kind.DAY_BEFORE, claimed_by="x")
+
+        out = StringIO()
+        call_command("archive_sessions", "--older-than", "180", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Sesiones archivadas: 2. Horarios archivados: 3.", out.getvalue())
+        self.assertEqual(
+            set(ClassSession.objects.values_list("topic", flat=True)),
+            {"old_scheduled", "recent_completed"},
+        )
+        archived = ArchivedClassSession.objects.get(pk=old.pk)
+        self.assertEqual(
+            (archived.slot_id, archived.virtual_room_code, archived.status),
+            (old.slot_id, old.virtual_room_code, ClassSession.Status.COMPLETED),
+        )
+        self.assertIn(self.unused_slot.pk, ArchivedAvailabilitySlot.objects.values_list("pk", flat=True))
+        self.assertTrue(TeacherAvailabilitySlot.objects.filter(pk=self.sessions["old_scheduled"].slot_id).exists())
+        self.assertFalse(SessionReminder.objects.exists())
+
+    def test_archive_drops_holds_of_archived_slots(self):
+        SlotHold.objects.create(slot=self.unused_slot, student=self.student_profile, expires_at=timezone.now())
+
+        archive_sessions(timezone.now() - timedelta(days=180))
+
+        self.assertIn(self.unused_slot.pk, ArchivedAvailabilitySlot.objects.values_list("pk", flat=True))
+        self.assertFalse(SlotHold.objects.exists())
+        connection.check_constraints()
+
+    def test_past_sessions_merge_hot_and_archived_rows(self):
+        archive_sessions(timezone.now() - timedelta(days=180))
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse("accounts:session_list"))
+
+        self.assertEqual(
+            [session.topic for session in response.context["past_sessions"]],
+            ["recent_completed", "old_scheduled", "old_cancelled", "old_completed"],
+        )
+        self.assertNotContains(response, reverse("accounts:session_detail", args=[self.sessions["old_completed"].pk]))
+        self.assertContains(response, reverse("accounts:session_detail", args=[self.sessions["recent_completed"].pk]))
+
+    def test_rollup_rebuild_includes_archived_history(self):
+        day = timezone.localdate(self.sessions["old_completed"].start_time)
+        archive_sessions(timezone.now() - timedelta(days=180))
+
+        call_command(
+            "rebuild_teacher_stats",
+            "--from",
+            day.isoformat(),
+            "--to",
+            day.isoformat(),
+            "--workers",
+            "1",
+            stdout=StringIO(),
+        )
+
+        stats = TeacherDailyStats.objects.get(teacher=self.teacher_profile, day=day)
+        self.assertEqual((stats.sessions_completed, stats.revenue), (1, Decimal("22.00")))
+
+
+class ProfileDisplayNameTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.teacher_user = user_model.objects.create_user(
+            username="nombre",
+            password="pass1234",
+            user_type=user_model.UserType.TEACHER,
+        )
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user,
+            subjects="Latin",
+            hourly_rate=Decimal("18.00"),
+        )
+        self.student = user_model.objects.create_user(username="lector", first_name="Luis", last_name="Vega")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+
+    def test_display_name_follows_account_updates(self):
+        self.assertEqual(self.teacher_profile.display_name, "nombre")
+        self.assertEqual(self.student_profile.display_name, "Luis Vega")
+
+        self.client.force_login(self.teacher_user)
+        self.client.post(
+            reverse("accounts:profile_update"),
+            {
+                "first_name": "Marta",
+                "last_name": "Sanz",
+                "email": "marta@example.com",
+                "subjects": "Latin",
+                "hourly_rate": "18.00",
+                "bio": "",
+            },
+        )
+
+        self.teacher_profile.refresh_from_db()
+        self.assertEqual(self.teacher_profile.display_name, "Marta Sanz")
+        self.assertEqual(str(self.teacher_profile), "Profesor: Marta Sanz")
+
+    def test_session_list_does_not_join_users(self):
+        start = timezone.now() + timedelta(days=1)
+        ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Ciceron",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        self.client.force_login(self.teacher_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("accounts:session_list"))
+
+        self.assertContains(response, "Luis Vega")
+        self.assertFalse(any('JOIN "accounts_user"' in query["sql"] for query in queries.captured_queries))
+
+
+class JsonApiTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.student = user_model.objects.create_user(username="movil")
+        self.student_profile = StudentProfile.objects.create(user=self.student)
+        self.teachers = []
+        for index, (name, availability) in enumerate(
+            (("Ana", ["morning"]), ("Bruno", ["morning", "evening"]), ("Carla", ["evening"]))
+        ):
+            user = user_model.objects.create_user(
+                username=f"api-{index}",
+                first_name=name,
+                user_type=user_model.UserType.TEACHER,
+            )
+            self.teachers.append(
+                TeacherProfile.objects.create(
+                    user=user,
+                    subjects="Quimica organica",
+                    hourly_rate=Decimal("30.00"),
+                    availability=availability,
+                )
+            )
+        self.client.force_login(self.student)
+
+    def test_teacher_search_filters_and_paginates_with_cursor(self):
+        url = reverse("accounts:api_teacher_search")
+
+        first_page = self.client.get(url, {"subject": "quimica", "limit": 2, "fields": "id,display_name"}).json()
+        second_page = self.client.get(
+            url,
+            {"subject": "quimica", "limit": 2, "fields": "id,display_name", "cursor": first_page["next_cursor"]},
+        ).json()
+
+        self.assertEqual(
+            first_page["results"],
+            [
+                {"id": self.teachers[0].pk, "display_name": "Ana"},
+                {"id": self.teachers[1].pk, "display_name": "Bruno"},
+            ],
+        )
+        self.assertEqual(second_page["results"], [{"id": self.teachers[2].pk, "display_name": "Carla"}])
+        self.assertIsNone(second_page["next_cursor"])
+
+        evening = self.client.get(url, {"availability": "evening", "fields": "display_name"}).json()
+        self.assertEqual([row["display_name"] for row in evening["results"]], ["Bruno", "Carla"])
+
+    def test_api_rejects_bad_parameters_and_anonymous_users(self):
+        url = reverse("accounts:api_teacher_search")
+        self.assertEqual(self.client.get(url, {"fields": "password"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"cursor": "manipulado"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"limit": "\u00b2"}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_slots_and_sessions_support_conditional_get(self):
+        teacher = self.teachers[0]
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        booked, free = [
+            TeacherAvailabilitySlot.objects.create(teacher=teacher, start_time=start + timedelta(hours=offset))
+            for offset in range(2)
+        ]
+        ClassSession.objects.create(
+            teacher=teacher,
+            student=self.student_profile,
+            topic="Alcanos",
+            start_time=booked.start_time,
+            end_time=booked.end_time,
+            slot=booked,
+        )
+
+        slots_url = reverse("accounts:api_teacher_slots", args=[teacher.pk])
+        response = self.client.get(slots_url)
+        self.assertEqual([row["id"] for row in response.json()["results"]], [free.pk])
+        revalidated = self.client.get(slots_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+        sessions = self.client.get(reverse("accounts:api_sessions"), {"fields": "topic,teacher_name,status"}).json()
+        self.assertEqual(sessions["results"], [{"topic": "Alcanos", "teacher_name": "Ana", "status": "scheduled"}])
+
+
+class SlotHoldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.first_student = user_model.objects.create_user(username="primera")
+        self.first_profile = StudentProfile.objects.create(user=self.first_student)
+        self.second_student = user_model.objects.create_user(username="segunda")
+        StudentProfile.objects.create(user=self.second_student)
+        teacher_user = user_model.objects.create_user(username="apartado", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Biologia",
+            hourly_rate=Decimal("26.00"),
+        )
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=start)
+        self.other_slot = TeacherAvailabilitySlot.objects.create(
+            teacher=self.teacher_profile,
+            start_time=start + timedelta(hours=1),
+        )
+        self.hold_url = reverse("accounts:slot_hold", args=[self.teacher_profile.pk, self.slot.pk])
+        self.create_url = reverse("accounts:session_create", kwargs={"teacher_pk": self.teacher_profile.pk})
+
+    def test_held_slot_cannot_be_taken_by_another_student(self):
+        self.client.force_login(self.first_student)
+        self.assertTrue(self.client.post(self.hold_url).json()["held"])
+
+        self.client.force_login(self.second_student)
+        self.assertEqual(self.client.post(self.hold_url).status_code, 409)
+        response = self.client.get(self.create_url)
+        self.assertEqual(list(response.context["form"].fields["slot"].queryset), [self.other_slot])
+        self.client.post(self.create_url, {"topic": "Celulas", "description": "", "slot": str(self.slot.pk)})
+        self.assertFalse(ClassSession.objects.exists())
+
+        self.client.force_login(self.first_student)
+        self.client.post(self.create_url, {"topic": "Celulas", "description": "", "slot": str(self.slot.pk)})
+        self.assertEqual(ClassSession.objects.get().student, self.first_profile)
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_expired_hold_is_taken_over(self):
+        SlotHold.objects.create(slot=self.slot, student=self.first_profile, expires_at=timezone.now())
+        self.client.force_login(self.second_student)
+
+        self.assertTrue(self.client.post(self.hold_url).json()["held"])
+        self.assertEqual(SlotHold.objects.get().student.user, self.second_student)
+
+    def test_booking_form_starts_without_a_selected_slot(self):
+        self.client.force_login(self.first_student)
+
+        response = self.client.get(self.create_url)
+
+        self.assertContains(response, '<option value="" selected>Selecciona un horario</option>', html=True)
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_availability_poll_needs_a_student_profile_and_long_polls_only_under_asgi(self):
+        profileless = get_user_model().objects.create_user(username="sin-perfil")
+        self.client.force_login(profileless)
+        url = reverse("accounts:slot_availability", args=[self.teacher_profile.pk])
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertFalse(StudentProfile.objects.filter(user=profileless).exists())
+
+        self.client.force_login(self.first_student)
+        self.assertContains(self.client.get(self.create_url), "const pollDelay = 5000;")
+        with override_settings(SESSION_STATUS_STREAM=True):
+            self.assertContains(self.client.get(self.create_url), "const pollDelay = 0;")
+
+    def test_purge_removes_only_expired_holds(self):
+        SlotHold.objects.create(slot=self.slot, student=self.first_profile, expires_at=timezone.now())
+        SlotHold.objects.create(
+            slot=self.other_slot, student=self.first_profile, expires_at=timezone.now() + timedelta(minutes=5)
+        )
+        output = StringIO()
+
+        call_command("purge_slot_holds", "--batch-size", "1", stdout=output)
+
+        self.assertIn("Apartados vencidos eliminados: 1.", output.getvalue())
+        self.assertEqual(list(SlotHold.objects.values_list("slot_id", flat=True)), [self.other_slot.pk])
+
+    def test_availability_poll_reports_version_changes(self):
+        url = reverse("accounts:slot_availability", args=[self.teacher_profile.pk])
+        self.client.force_login(self.second_student)
+        version = self.client.get(url).json()["version"]
+
+        with mock.patch.object(SlotAvailabilityView, "poll_timeout", 60):
+            started = time.monotonic()
+            unchanged = self.client.get(url, {"version": version}).json()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(unchanged, {"version": version, "changed": False})
+
+        self.client.force_login(self.first_student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.hold_url)
+
+        self.client.force_login(self.second_student)
+        data = self.client.get(url, {"version": version}).json()
+        self.assertTrue(data["changed"])
+        self.assertGreater(data["version"], version)
+        self.assertEqual([slot["id"] for slot in data["slots"]], [self.other_slot.pk])
+
+
+class SessionStatusStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.student_user = user_model.objects.create_user(username="escucha")
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        teacher_user = user_model.objects.create_user(username="emisor", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=teacher_user,
+            subjects="Quimica",
+            hourly_rate=Decimal("24.00"),
+        )
+        start = (timezone.now() + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        self.sessions = [
+            ClassSession.objects.create(
+                teacher=self.teacher_profile,
+                student=self.student_profile,
+                topic=f"Enlaces {index}",
+                start_time=start + timedelta(hours=index),
+                end_time=start + timedelta(hours=index + 1),
+                slot=TeacherAvailabilitySlot.objects.create(
+                    teacher=self.teacher_profile,
+                    start_time=start + timedelta(hours=index),
+                ),
+            )
+            for index in range(2)
+        ]
+        self.url = reverse("accounts:session_stream")
+
+    def _cancel_sessions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_sessions(ClassSession.objects.filter(pk=self.sessions[0].pk))
+            session = self.sessions[1]
+            session.status = ClassSession.Status.COMPLETED
+            session.save()
+
+    async def _read_stream(self, **params):
+        with mock.patch.object(SessionStatusStreamView, "stream_timeout", 0):
+            response = await self.async_client.get(self.url, params)
+            return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    async def test_stream_pushes_committed_status_changes(self):
+        await self.async_client.aforce_login(self.student_user)
+        since = (await self.async_client.get(reverse("accounts:session_list"))).context["session_feed_position"]
+        await sync_to_async(self._cancel_sessions)()
+
+        body = await self._read_stream(since=since)
+
+        changes = [json.loads(line[6:]) for line in body.splitlines() if line.startswith("data: ")]
+        self.assertEqual(
+            [(change["session_id"], change["status"]) for change in changes],
+            [(self.sessions[0].pk, "cancelled"), (self.sessions[1].pk, "completed")],
+        )
+        self.assertTrue(body.endswith(f"id: {since + 2}\n\n"))
+
+    def test_session_list_opens_the_stream_only_when_enabled(self):
+        self.client.force_login(self.student_user)
+        stream_url = reverse("accounts:session_stream")
+
+        response = self.client.get(reverse("accounts:session_list"))
+        self.assertNotContains(response, stream_url)
+        self.assertContains(response, "window.location.reload()")
+
+        with override_settings(SESSION_STATUS_STREAM=True):
+            response = self.client.get(reverse("accounts:session_list"))
+        self.assertContains(response, stream_url)
+        self.assertNotContains(response, "window.location.reload()")
+
+    async def test_stream_asks_for_reload_when_feed_cannot_cover_the_gap(self):
+        await self.async_client.aforce_login(self.student_user)
+
+        body = await self._read_stream(since=1)
+
+        self.assertIn("event: reset", body)
+
+    async def test_stream_requires_participant(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+        staff = await sync_to_async(get_user_model().objects.create_user)(username="staff-stream", is_staff=True)
+        await self.async_client.aforce_login(staff)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
+class RoomTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.student_user = user_model.objects.create_user(username="asistente", first_name="Ana")
+        student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.teacher_user = user_model.objects.create_user(username="anfitrion", user_type=user_model.UserType.TEACHER)
+        teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user,
+            subjects="Historia",
+            hourly_rate=Decimal("22.00"),
+        )
+        start = (timezone.now() + timedelta(hours=2)).replace(minute=0, second=0, microsecond=0)
+        self.session = ClassSession.objects.create(
+            teacher=teacher_profile,
+            student=student_profile,
+            topic="Revolucion",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        revoked_sessions.refresh()
+
+    def _room_join_url(self):
+        self.client.force_login(self.student_user)
+        response = self.client.get(reverse("accounts:session_detail", args=[self.session.pk]))
+        return response.context["room_join_url"]
+
+    def test_room_is_served_from_token_without_queries(self):
+        url = self._room_join_url()
+
+        with self.assertNumQueries(0):
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        self.assertContains(first, "Revolucion")
+        self.assertContains(first, str(self.session.virtual_room_code))
+        self.assertEqual(first.content, second.content)
+        self.assertRedirects(
+            self.client.get(reverse("accounts:session_room", args=[self.session.pk])),
+            url,
+            fetch_redirect_response=False,
+        )
+
+    def test_cancelled_session_revokes_issued_tokens(self):
+        url = self._room_join_url()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session.status = ClassSession.Status.CANCELLED
+            self.session.save()
+
+        response = self.client.get(url)
+
+        self.assertRedirects(response, reverse("accounts:session_detail", args=[self.session.pk]))
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        url = self._room_join_url()
+        self.assertEqual(self.client.get(url[:-3] + "abc/").status_code, 404)
+
+        self.session.end_time = timezone.now() - timedelta(hours=1)
+        expired_url = reverse("accounts:room_join", args=[issue_room_token(self.session, "student")])
+        response = self.client.get(expired_url)
+        self.assertRedirects(response, reverse("accounts:session_detail", args=[self.session.pk]))
+
+
+class ClassStartBurstTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.student_user = user_model.objects.create_user(username="puntual")
+        student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.teacher_user = user_model.objects.create_user(username="docente", user_type=user_model.UserType.TEACHER)
+        teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user,
+            subjects="Fisica",
+            hourly_rate=Decimal("27.00"),
+        )
+        start = timezone.now() + timedelta(minutes=10)
+        self.session = ClassSession.objects.create(
+            teacher=teacher_profile,
+            student=student_profile,
+            topic="Cinematica",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        self.detail_url = reverse("accounts:session_detail", args=[self.session.pk])
+        revoked_sessions.refresh()
+
+    def test_concurrent_misses_share_one_computation(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "resultado"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: get_or_compute("tests:coalesce", compute, 60), range(8)))
+
+        self.assertEqual(results, ["resultado"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_prewarmed_session_is_served_without_loading_it(self):
+        call_command("prewarm_sessions", "--minutes", "15", stdout=StringIO())
+        self.client.force_login(self.student_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.detail_url)
+            room = self.client.get(response.context["room_join_url"])
+
+        self.assertContains(response, "Cinematica")
+        self.assertContains(room, "Cinematica")
+        self.assertFalse([query for query in queries.captured_queries if "accounts_classsession" in query["sql"]])
+
+    def test_status_change_replaces_the_snapshot(self):
+        self.client.force_login(self.teacher_user)
+        self.client.get(self.detail_url)
+
+        self.client.post(self.detail_url, {"status": ClassSession.Status.CANCELLED})
+
+        self.assertEqual(self.client.get(self.detail_url).context["session"].status, ClassSession.Status.CANCELLED)
+        self.client.force_login(get_user_model().objects.create_user(username="ajeno"))
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+
+class AvailableTeacherSearchTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.student_user = user_model.objects.create_user(username="flexible")
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        other_student = StudentProfile.objects.create(user=user_model.objects.create_user(username="madrugador"))
+        self.desired = (timezone.localtime() + timedelta(days=2)).replace(hour=18, minute=0, second=0, microsecond=0)
+
+        def teacher(username, subjects, rate):
+            user = user_model.objects.create_user(username=username, user_type=user_model.UserType.TEACHER)
+            return TeacherProfile.objects.create(user=user, subjects=subjects, hourly_rate=Decimal(rate))
+
+        def slot(profile, hours):
+            return TeacherAvailabilitySlot.objects.create(
+                teacher=profile,
+                start_time=self.desired + timedelta(hours=hours),
+            )
+
+        self.algebra_teacher = teacher("algebrista", "Algebra, Geometría", "30.00")
+        self.linear_teacher = teacher("lineal", "Álgebra lineal", "20.00")
+        self.history_teacher = teacher("historiador", "Historia", "10.00")
+        self.algebra_slot = slot(self.algebra_teacher, 0)
+        slot(self.algebra_teacher, 1)
+        self.linear_slot = slot(self.linear_teacher, -1)
+        slot(self.linear_teacher, 2)
+        booked = slot(self.linear_teacher, 0)
+        ClassSession.objects.create(
+            teacher=self.linear_teacher,
+            student=other_student,
+            topic="Matrices",
+            start_time=booked.start_time,
+            end_time=booked.start_time + timedelta(hours=1),
+            slot=booked,
+        )
+        self.history_slot = slot(self.history_teacher, 0)
+        self.client.force_login(self.student_user)
+
+    def _search(self, subject="algebra", ordering="price"):
+        local = timezone.localtime(self.desired)
+        response = self.client.get(
+            reverse("accounts:available_teachers"),
+            {
+                "subject": subject,
+                "date": local.date().isoformat(),
+                "time": local.strftime("%H:%M"),
+                "flexibility": "1",
+                "ordering": ordering,
+            },
+        )
+        return [slot.pk for slot in response.context["matches"]]
+
+    def test_returns_best_free_slot_per_teacher_ranked(self):
+        self.assertEqual(self._search(), [self.linear_slot.pk, self.algebra_slot.pk])
+        self.assertEqual(self._search(ordering="closest"), [self.algebra_slot.pk, self.linear_slot.pk])
+
+    def test_subject_index_follows_profile_changes(self):
+        self.history_teacher.subjects = "Historia; ALGEBRA"
+        self.history_teacher.save()
+
+        self.assertEqual(self._search()[0], self.history_slot.pk)
+        self.assertEqual(
+            set(self.history_teacher.subject_index.values_list("name", flat=True)),
+            {"historia", "algebra"},
+        )
+
+    def test_one_click_booking_takes_the_slot_once(self):
+        url = reverse("accounts:quick_book", args=[self.algebra_slot.pk])
+
+        response = self.client.post(url, {"topic": "Algebra"})
+
+        session = ClassSession.objects.get(slot=self.algebra_slot)
+        self.assertRedirects(response, reverse("accounts:session_detail", args=[session.pk]))
+        self.assertEqual((session.student, session.topic), (self.student_profile, "Algebra"))
+
+        self.client.force_login(get_user_model().objects.create_user(username="tardio"))
+        response = self.client.post(url, {"topic": "Algebra", "search_query": "subject=algebra"})
+        self.assertRedirects(response, reverse("accounts:available_teachers") + "?subject=algebra")
+        self.assertEqual(ClassSession.objects.filter(slot=self.algebra_slot).count(), 1)
+
+
+class TeacherWeekGridTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.teacher_user = user_model.objects.create_user(username="semanal", user_type=user_model.UserType.TEACHER)
+        self.teacher_profile = TeacherProfile.objects.create(
+            user=self.teacher_user, subjects="Fisica", hourly_rate=Decimal("25.00")
+        )
+        self.student_user = user_model.objects.create_user(username="curioso")
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.monday = week_start(timezone.localdate()) + timedelta(days=7)
+        self.tuesday_ten = timezone.make_aware(
+            datetime.combine(self.monday + timedelta(days=1), datetime.min.time().replace(hour=10))
+        )
+        self.free_slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher_profile, start_time=self.tuesday_ten)
+        self.booked_slot = TeacherAvailabilitySlot.objects.create(
+            teacher=self.teacher_profile,
+            start_time=self.tuesday_ten + timedelta(hours=2),
+        )
+        self.session = ClassSession.objects.create(
+            teacher=self.teacher_profile,
+            student=self.student_profile,
+            topic="Optica",
+            start_time=self.booked_slot.start_time,
+            end_time=self.booked_slot.start_time + timedelta(hours=1),
+            slot=self.booked_slot,
+        )
+        TeacherAvailabilitySlot.objects.create(
+            teacher=self.teacher_profile,
+            start_time=self.tuesday_ten + timedelta(days=7),
+        )
+        cache.clear()
+
+    def _api(self):
+        return self.client.get(
+            reverse("accounts:api_teacher_week", args=[self.teacher_profile.pk]),
+            {"semana": (self.monday + timedelta(days=3)).isoformat()},
+        )
+
+    def test_grid_merges_one_query_per_table_and_is_cached(self):
+        self.client.force_login(self.teacher_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            grid = week_grid(self.teacher_profile.pk, self.monday)
+        self.assertEqual(len(queries), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(week_grid(self.teacher_profile.pk, self.monday), grid)
+
+        response = self._api()
+        payload = response.json()
+        tuesday = payload["days"][1]["hours"]
+        self.assertEqual(payload["week_start"], self.monday.isoformat())
+        self.assertEqual((tuesday[10]["state"], tuesday[10]["slot_id"]), ("free", self.free_slot.pk))
+        self.assertEqual((tuesday[12]["state"], tuesday[12]["session_id"]), ("booked", self.session.pk))
+        self.assertEqual(sum(cell["state"] != "empty" for day in payload["days"] for cell in day["hours"]), 2)
+
+        not_modified = self.client.get(
+            reverse("accounts:api_teacher_week", args=[self.teacher_profile.pk]),
+            {"semana": self.monday.isoformat()},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_slot_and_session_writes_invalidate_the_week(self):
+        self.client.force_login(self.student_user)
+        self.assertEqual(self._api().json()["days"][1]["hours"][12]["session_id"], None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.free_slot.is_active = False
+            self.free_slot.save()
+        self.assertEqual(self._api().json()["days"][1]["hours"][10]["state"], "inactive")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session.status = ClassSession.Status.CANCELLED
+            self.session.save()
+        self.assertEqual(self._api().json()["days"][1]["hours"][12]["state"], "free")
+
+    def test_teachers_only_see_their_own_week(self):
+        other = get_user_model().objects.create_user(username="ajeno", user_type=get_user_model().UserType.TEACHER)
+        TeacherProfile.objects.create(user=other, subjects="Quimica", hourly_rate=Decimal("25.00"))
+        self.client.force_login(other)
+
+        self.assertEqual(self._api().status_code, 403)
+        response = self.client.get(reverse("accounts:teacher_week", args=[self.teacher_profile.pk]))
+        self.assertRedirects(response, reverse("accounts:home"))
+
+        self.client.force_login(self.teacher_user)
+        response = self.client.get(
+            reverse("accounts:teacher_week", args=[self.teacher_profile.pk]),
+            {"semana": self.monday.isoformat()},
+        )
+        self.assertContains(response, reverse("accounts:session_detail", args=[self.session.pk]))
+        self.assertContains(response, f"?semana={(self.monday + timedelta(days=7)).isoformat()}")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TeacherCsvImportTests(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username="existente")
+        self.slot_start = (timezone.localtime() + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+        slot = self.slot_start.strftime("%Y-%m-%d %H:%M")
+        next_slot = (self.slot_start + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M")
+        self.csv = (
+            "username,email,first_name,last_name,password,subjects,hourly_rate,availability,slots\n"
+            f'ana,ana@colegio.cl,Ana,Rojas,Fotosintesis-2024,"Biologia, Quimica",25,morning;weekend,{slot};{next_slot}\n'
+            "beto,,,,,Historia,gratis,,\n"
+            "ana,,,,,Fisica,10,,\n"
+            "existente,,,,,Fisica,10,,\n"
+            "carla,,Carla,Diaz,,Musica,18.50,,\n"
+        )
+
+    def _write_csv(self, content):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8")
+        with handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_command_imports_valid_rows_and_reports_the_rest(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_teachers",
+            self._write_csv(self.csv),
+            batch_size=2,
+            workers=2,
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        self.assertIn("created=2, slots=2, errors=3", stdout.getvalue())
+        self.assertEqual(
+            [line.split(":")[0] for line in stderr.getvalue().splitlines()],
+            ["Linea 3", "Linea 4", "Linea 5"],
+        )
+        ana = TeacherProfile.objects.get(user__username="ana")
+        self.assertEqual((ana.display_name, ana.availability), ("Ana Rojas", ["morning", "weekend"]))
+        self.assertTrue(ana.user.is_teacher() and ana.user.check_password("Fotosintesis-2024"))
+        self.assertFalse(TeacherProfile.objects.get(user__username="carla").user.has_usable_password())
+        self.assertEqual(set(ana.subject_index.values_list("name", flat=True)), {"biologia", "quimica"})
+        self.assertEqual(list(ana.availability_slots.values_list("start_time", flat=True))[0], self.slot_start)
+        stats = TeacherDailyStats.objects.get(teacher=ana)
+        self.assertEqual(stats.slots_offered, 2)
+        self.assertEqual(OutboxTask.objects.filter(name="notifications.welcome").count(), 2)
+
+    def test_missing_columns_abort_before_reading_rows(self):
+        with self.assertRaisesMessage(CommandError, "Faltan columnas en el archivo: hourly_rate."):
+            call_command("import_teachers", self._write_csv("username,subjects\nana,Fisica\n"), workers=1)
+
+    def test_admin_upload_dry_run_validates_without_saving(self):
+        self.client.force_login(get_user_model().objects.create_superuser(username="colegio", password="pass1234"))
+        upload = SimpleUploadedFile("profesores.csv", self.csv.encode("utf-8-sig"), content_type="text/csv")
+
+        response = self.client.post(
+            reverse("admin:accounts_teacherprofile_import"),
+            {"file": upload, "dry_run": "on"},
+            follow=True,
+        )
+
+        self.assertContains(response, "[simulacion] Profesores importados: 2. Horarios creados: 2.")
+        self.assertContains(response, "El usuario existente ya existe.")
+        self.assertFalse(TeacherProfile.objects.exists())
+
+
+class PooledPasswordHashingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(hashing_service.configure)
+        self.user = get_user_model().objects.create_user(username="campana")
+        self.user.password = PBKDF2PasswordHasher().encode("Matricula-2024", "salinfija", iterations=1000)
+        self.user.save(update_fields=["password"])
+
+    def _login(self):
+        return self.client.post(reverse("accounts:login"), {"username": "campana", "password": "Matricula-2024"})
+
+    def test_login_verifies_on_the_pool_and_rehashes_outdated_passwords(self):
+        hashing_service.configure(workers=1, max_pending=4, wait_seconds=5)
+
+        self.assertRedirects(self._login(), reverse("accounts:home"), fetch_redirect_response=False)
+
+        self.user.refresh_from_db()
+        self.assertNotIn("$1000$", self.user.password)
+        self.assertFalse(identify_hasher(self.user.password).must_update(self.user.password))
+        self.assertTrue(self.user.check_password("Matricula-2024"))
+        self.assertEqual(hashing_service.metrics()["completed"], 1)
+
+    def test_full_queue_rejects_with_retry_after(self):
+        hashing_service.configure(workers=0, max_pending=1, wait_seconds=0)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash(password):
+            started.set()
+            release.wait(5)
+            return "!"
+
+        with mock.patch("accounts.hashing.make_password", side_effect=slow_hash):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pending = executor.submit(hashing_service.hash, "ocupado")
+                started.wait(5)
+                response = self._login()
+                release.set()
+                pending.result()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        metrics = hashing_service.metrics()
+        self.assertEqual((metrics["rejected"], metrics["completed"], metrics["in_flight"]), (1, 1, 0))
+
+    def test_signup_hashes_through_the_service_and_metrics_are_staff_only(self):
+        hashing_service.configure(workers=0)
+        self.client.post(
+            reverse("accounts:student_signup"),
+            {
+                "username": "inscrita",
+                "first_name": "Ines",
+                "last_name": "Soto",
+                "email": "ines@example.com",
+                "password1": "ClaveSegura123",
+                "password2": "ClaveSegura123",
+            },
+        )
+
+        self.assertTrue(get_user_model().objects.get(username="inscrita").check_password("ClaveSegura123"))
+        self.assertEqual(self.client.get(reverse("accounts:hashing_metrics")).status_code, 302)
+        self.client.force_login(get_user_model().objects.create_superuser(username="soporte", password="x"))
+        self.assertEqual(self.client.get(reverse("accounts:hashing_metrics")).json()["completed"], 1)
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_token_bucket_refills_over_time(self):
+        rate = Rate("ip", 2, per=10)
+        key = rate_limit_key("login", "ip", "10.0.0.1")
+
+        self.assertEqual([take_token(key, rate, now=100) for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(take_token(key, rate, now=100), 5)
+        self.assertEqual(take_token(key, rate, now=105), 0)
+        self.assertGreater(take_token(key, rate, now=105), 0)
+
+    def test_login_attempts_per_username_are_rejected_before_db_and_hashing(self):
+        url = reverse("accounts:login")
+        for _ in range(5):
+            self.client.post(url, {"username": "Victima", "password": "adivinanza"})
+
+        with mock.patch.object(hashing_service, "verify") as verify, self.assertNumQueries(0):
+            response = self.client.post(url, {"username": "victima ", "password": "otra"})
+        verify.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.post(url, {"username": "otra", "password": "x"}).status_code, 200)
+
+    def test_booking_is_limited_per_user_across_logins(self):
+        user = get_user_model().objects.create_user(username="insistente")
+        StudentProfile.objects.create(user=user)
+        self.client.force_login(user)
+        url = reverse("accounts:quick_book", args=[1])
+
+        statuses = [self.client.post(url, {"topic": "Spam"}).status_code for _ in range(11)]
+
+        self.assertEqual(statuses[:10], [404] * 10)
+        self.assertEqual(statuses[10], 429)
+        self.client.logout()
+        self.client.force_login(user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post(url, {"topic": "Spam"}).status_code, 429)
+
+        other = get_user_model().objects.create_user(username="paciente")
+        StudentProfile.objects.create(user=other)
+        self.client.force_login(other)
+        self.assertEqual(self.client.post(url, {"topic": "Spam"}).status_code, 404)
+
+
+class TeacherPopularityTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        teacher_user = user_model.objects.create_user(username="popular", user_type=user_model.UserType.TEACHER)
+        self.teacher = TeacherProfile.objects.create(user=teacher_user, subjects="Quimica", hourly_rate=Decimal("20"))
+        self.students = [
+            StudentProfile.objects.create(user=user_model.objects.create_user(username=f"asiduo-{index}"))
+            for index in range(2)
+        ]
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+    def _session(self, student, hours):
+        slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher, start_time=self.start + timedelta(hours=hours))
+        return ClassSession.objects.create(
+            teacher=self.teacher,
+            student=student,
+            topic="Enlaces",
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            slot=slot,
+        )
+
+    def _move(self, session, status):
+        previous_status = session.status
+        session.status = status
+        session.save()
+        record_status_change(session, previous_status)
+        self.teacher.refresh_from_db()
+        return self.teacher.completed_count, self.teacher.distinct_students
+
+    def test_counters_follow_status_transitions(self):
+        first, second = self._session(self.students[0], 0), self._session(self.students[0], 1)
+        other = self._session(self.students[1], 2)
+        completed = ClassSession.Status.COMPLETED
+
+        self.assertEqual(self._move(first, completed), (1, 1))
+        self.assertEqual(self._move(second, completed), (2, 1))
+        self.assertEqual(self._move(other, completed), (3, 2))
+        self.assertEqual(self._move(first, ClassSession.Status.SCHEDULED), (2, 2))
+        self.assertEqual(self._move(second, ClassSession.Status.CANCELLED), (1, 1))
+
+    def test_next_free_slot_follows_slots_and_bookings(self):
+        free_slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher, start_time=self.start + timedelta(hours=5))
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.next_free_slot_at, free_slot.start_time)
+
+        session = self._session(self.students[0], 0)
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.next_free_slot_at, free_slot.start_time)
+
+        cancel_sessions(ClassSession.objects.filter(pk=session.pk), block_slots=False)
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.next_free_slot_at, session.start_time)
+
+    def test_soonest_search_keeps_every_teacher_and_stale_values_refresh_on_schedule(self):
+        idle_user = get_user_model().objects.create_user(username="sin-horarios", user_type="TEACHER")
+        idle = TeacherProfile.objects.create(user=idle_user, subjects="Quimica", hourly_rate=Decimal("20"))
+        free_slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher, start_time=self.start + timedelta(days=2))
+        TeacherProfile.objects.filter(pk=self.teacher.pk).update(next_free_slot_at=timezone.now() - timedelta(minutes=1))
+        self.client.force_login(self.students[0].user)
+        url = reverse("accounts:teacher_search")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"ordering": "soonest"})
+        self.assertEqual([teacher.pk for teacher in response.context["teachers"]], [self.teacher.pk, idle.pk])
+        self.assertFalse(any(query["sql"].startswith("UPDATE") for query in queries))
+
+        stdout = StringIO()
+        call_command("reconcile_teacher_counters", "--stale-slots", stdout=stdout)
+        self.assertIn("Profesores corregidos: 1", stdout.getvalue())
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.next_free_slot_at, free_slot.start_time)
+
+    def test_reconcile_fixes_drift_and_sorts_use_the_indexes(self):
+        self._move(self._session(self.students[0], 0), ClassSession.Status.COMPLETED)
+        TeacherProfile.objects.filter(pk=self.teacher.pk).update(completed_count=99, next_free_slot_at=None)
+
+        stdout = StringIO()
+        call_command("reconcile_teacher_counters", stdout=stdout)
+        self.assertIn("Profesores corregidos: 1", stdout.getvalue())
+        self.teacher.refresh_from_db()
+        self.assertEqual((self.teacher.completed_count, self.teacher.distinct_students), (1, 1))
+
+        popular_plan = TeacherProfile.objects.order_by(*TEACHER_POPULARITY_ORDERING).explain()
+        soonest_plan = TeacherProfile.objects.order_by(*TEACHER_SOONEST_ORDERING).explain()
+        self.assertIn("teacher_popularity_idx", popular_plan)
+        self.assertNotIn("TEMP B-TREE", popular_plan)
+        self.assertIn("teacher_next_free_slot_idx", soonest_plan)
+        self.assertNotIn("TEMP B-TREE", soonest_plan)
+
+
+class StudentRecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.teachers = {}
+        for username, subjects, completed_count in (
+            ("fisico-popular", "Fisica", 9),
+            ("fisico-libre", "Fisica avanzada", 1),
+            ("matematico", "Matematicas", 20),
+            ("historiador", "Historia", 50),
+        ):
+            user = user_model.objects.create_user(username=username, user_type=user_model.UserType.TEACHER)
+            self.teachers[username] = TeacherProfile.objects.create(
+                user=user, subjects=subjects, hourly_rate=Decimal("20"), completed_count=completed_count
+            )
+        TeacherProfile.objects.filter(pk=self.teachers["fisico-libre"].pk).update(
+            next_free_slot_at=timezone.now() + timedelta(days=1)
+        )
+        self.user = user_model.objects.create_user(username="curioso", user_type=user_model.UserType.STUDENT)
+        self.student = StudentProfile.objects.create(
+            user=self.user, preferred_subject="Fisica", learning_goals="Repasar matematicas para la prueba"
+        )
+
+    def test_preferred_subject_then_availability_then_popularity(self):
+        self.assertEqual(
+            compute_recommendations(self.student),
+            [self.teachers[name].pk for name in ("fisico-libre", "fisico-popular", "matematico")],
+        )
+
+    def test_home_queues_one_refresh_and_then_reads_the_cached_ids(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("accounts:home")), "Estamos preparando tus recomendaciones")
+        self.client.get(reverse("accounts:home"))
+        self.assertEqual(OutboxTask.objects.filter(name="recommendations.refresh").count(), 1)
+
+        call_command("run_tasks", "--once", "--workers", "1", stdout=StringIO())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("accounts:home"))
+        teacher_queries = [query for query in queries if '"accounts_teacherprofile"' in query["sql"]]
+        self.assertEqual(len(teacher_queries), 1)
+        self.assertEqual(
+            [teacher.pk for teacher in response.context["recommended_teachers"]],
+            [self.teachers[name].pk for name in ("fisico-libre", "fisico-popular", "matematico")],
+        )
+        self.assertNotContains(response, self.teachers["historiador"].display_name)
+
+    def test_changing_interests_queues_a_new_refresh(self):
+        call_command("run_tasks", "--once", "--workers", "1", stdout=StringIO())
+        self.student.learning_goals = ""
+        self.student.save(update_fields=["learning_goals"])
+        self.student.save(update_fields=["updated_at"])
+        self.assertEqual(
+            OutboxTask.objects.filter(name="recommendations.refresh", status=OutboxTask.Status.PENDING).count(), 1
+        )
+
+
+class HomeSessionDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        teacher_user = user_model.objects.create_user(
+            username="agenda", first_name="Rosa", user_type=user_model.UserType.TEACHER
+        )
+        self.teacher = TeacherProfile.objects.create(user=teacher_user, subjects="Biologia", hourly_rate=Decimal("20"))
+        self.user = user_model.objects.create_user(username="puntual", user_type=user_model.UserType.STUDENT)
+        self.student = StudentProfile.objects.create(user=self.user)
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.later = self._session(self.start + timedelta(hours=3), "Celulas")
+        past = self._session(self.start + timedelta(hours=1), "Tejidos")
+        ClassSession.objects.filter(pk=past.pk).update(
+            start_time=self.start - timedelta(days=3),
+            end_time=self.start - timedelta(days=3, hours=-1),
+            status=ClassSession.Status.COMPLETED,
+        )
+
+    def _session(self, start, topic):
+        slot = TeacherAvailabilitySlot.objects.create(teacher=self.teacher, start_time=start)
+        return ClassSession.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            topic=topic,
+            start_time=start,
+            end_time=slot.end_time,
+            slot=slot,
+        )
+
+    def test_home_reads_next_class_and_counters_from_cache(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("accounts:home"))
+        self.assertContains(response, "Tu proxima clase:</strong> Celulas con Rosa")
+        self.assertEqual(response.context["session_dashboard"]["upcoming_count"], 1)
+        self.assertEqual(response.context["session_dashboard"]["past_count"], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("accounts:home"))
+        self.assertFalse(any("accounts_classsession" in query["sql"] for query in queries))
+
+    def test_booking_and_cancelling_refresh_both_participants(self):
+        self.assertEqual(session_dashboard("teacher", self.teacher.pk)["upcoming_count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            sooner = self._session(self.start, "Genetica")
+        dashboard = session_dashboard("student", self.student.pk)
+        self.assertEqual(dashboard["next_session"]["id"], sooner.pk)
+        self.assertEqual(dashboard["upcoming_count"], 2)
+        self.assertEqual(session_dashboard("teacher", self.teacher.pk)["upcoming_count"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_sessions(ClassSession.objects.filter(pk=sooner.pk))
+        dashboard = session_dashboard("student", self.student.pk)
+        self.assertEqual(dashboard["next_session"]["id"], self.later.pk)
+        self.assertEqual((dashboard["upcoming_count"], dashboard["past_count"]), (1, 1))
+        self.assertEqual(session_dashboard("teacher", self.teacher.pk)["past_count"], 1)
@@ -1,24 +1,51 @@
 from django.urls import path
 
+from .ratelimit import Rate
 from .views import (
+    AvailableTeacherSearchView,
+    CalendarFeedView,
     ClassSessionCreateView,
     ClassSessionDetailView,
     ClassSessionListView,
     ClassSessionRoomView,
     CustomLoginView,
     CustomLogoutView,
+    ExportView,
+    HashingMetricsView,
     HomeView,
     LandingPageView,
     ProfileUpdateView,
+    QuickBookView,
+    RoomJoinView,
+    SessionApiView,
+    SessionStatusStreamView,
+    SlotAvailabilityView,
+    SlotHoldView,
     StudentSignUpView,
     TeacherSignUpView,
     TeacherSearchView,
     TeacherProfileDetailView,
+    TeacherStatsView,
+    TeacherWeekApiView,
+    TeacherWeekView,
+    TeacherSearchApiView,
+    TeacherSlotsApiView,
 )
 
 
 app_name = "accounts"
 
+# Token buckets per URL name, checked by RateLimitMiddleware before the view runs.
+BOOKING_RATE_LIMITS = (Rate("ip", 30, per=60), Rate("user", 10, per=60))
+RATE_LIMITS = {
+    "login": (Rate("ip", 20, per=60), Rate("username", 5, per=300)),
+    "student_signup": (Rate("ip", 10, per=60 * 60),),
+    "teacher_signup": (Rate("ip", 10, per=60 * 60),),
+    "session_create": BOOKING_RATE_LIMITS,
+    "quick_book": BOOKING_RATE_LIMITS,
+    "slot_hold": (Rate("user", 30, per=60),),
+}
+
 
 urlpatterns = [
     path("", LandingPageView.as_view(), name="landing"),
@@ -27,11 +54,43 @@ urlpatterns = [
     path("logout/", CustomLogoutView.as_view(), name="logout"),
     path("perfil/", ProfileUpdateView.as_view(), name="profile_update"),
     path("profesores/", TeacherSearchView.as_view(), name="teacher_search"),
+    path("profesores/disponibles/", AvailableTeacherSearchView.as_view(), name="available_teachers"),
     path("profesores/<int:pk>/", TeacherProfileDetailView.as_view(), name="teacher_detail"),
+    path("profesores/<int:pk>/semana/", TeacherWeekView.as_view(), name="teacher_week"),
     path("profesores/<int:teacher_pk>/programar/", ClassSessionCreateView.as_view(), name="session_create"),
+    path(
+        "profesores/<int:teacher_pk>/horarios/estado/",
+        SlotAvailabilityView.as_view(),
+        name="slot_availability",
+    ),
+    path(
+        "profesores/<int:teacher_pk>/horarios/<int:slot_pk>/apartar/",
+        SlotHoldView.as_view(),
+        name="slot_hold",
+    ),
+    path("horarios/<int:slot_pk>/reservar/", QuickBookView.as_view(), name="quick_book"),
     path("sesiones/", ClassSessionListView.as_view(), name="session_list"),
+    path("sesiones/estado/", SessionStatusStreamView.as_view(), name="session_stream"),
     path("sesiones/<int:pk>/", ClassSessionDetailView.as_view(), name="session_detail"),
     path("sesiones/<int:pk>/sala/", ClassSessionRoomView.as_view(), name="session_room"),
+    path("sala/<str:token>/", RoomJoinView.as_view(), name="room_join"),
+    path(
+        "exportar/sesiones/",
+        ExportView.as_view(kind="sessions", filename_prefix="clasesya-sesiones"),
+        name="export_sessions",
+    ),
+    path(
+        "exportar/horarios/",
+        ExportView.as_view(kind="slots", filename_prefix="clasesya-horarios"),
+        name="export_slots",
+    ),
+    path("estadisticas/profesores/", TeacherStatsView.as_view(), name="teacher_stats"),
+    path("estadisticas/contrasenas/", HashingMetricsView.as_view(), name="hashing_metrics"),
+    path("calendario/<str:token>.ics", CalendarFeedView.as_view(), name="calendar_feed"),
+    path("api/profesores/", TeacherSearchApiView.as_view(), name="api_teacher_search"),
+    path("api/profesores/<int:pk>/horarios/", TeacherSlotsApiView.as_view(), name="api_teacher_slots"),
+    path("api/profesores/<int:pk>/semana/", TeacherWeekApiView.as_view(), name="api_teacher_week"),
+    path("api/sesiones/", SessionApiView.as_view(), name="api_sessions"),
     path("registro/alumno/", StudentSignUpView.as_view(), name="student_signup"),
     path("registro/profesor/", TeacherSignUpView.as_view(), name="teacher_signup"),
 ]
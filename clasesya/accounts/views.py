@@ -1,28 +1,93 @@
-from urllib.parse import urlparse
+import asyncio
+import json
+from datetime import date, timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
-from django.views.generic import CreateView, DetailView, FormView, TemplateView
-
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.generic import CreateView, DetailView, FormView, TemplateView, View
+
+from .api import (
+    SESSION_DEFAULT_FIELDS,
+    SESSION_FIELDS,
+    SESSION_ORDERING,
+    SLOT_DEFAULT_FIELDS,
+    SLOT_FIELDS,
+    SLOT_ORDERING,
+    TEACHER_DEFAULT_FIELDS,
+    TEACHER_FIELDS,
+    TEACHER_ORDERING,
+    ApiError,
+    free_slots_queryset,
+    paginate,
+    parse_fields,
+    render_payload,
+    teacher_search_queryset,
+)
+from .archive import past_sessions
+from .caching import aslots_version, calendar_feed_key, slots_version
+from .dashboard import session_dashboard
+from .events import record_session_event, record_status_change
+from .exports import stream_export
+from .feed import aread_changes, afeed_position, feed_position
 from .forms import (
+    AvailableTeacherSearchForm,
     BootstrapAuthenticationForm,
+    ExportFilterForm,
     StudentSignUpForm,
     StudentProfileUpdateForm,
     TeacherSignUpForm,
     TeacherProfileUpdateForm,
     TeacherSearchForm,
+    TeacherStatsFilterForm,
     UserAccountUpdateForm,
     ClassSessionScheduleForm,
     ClassSessionStatusForm,
 )
-from .models import ClassSession, StudentProfile, TeacherProfile
+from .hashing import HashingBusy, hashing_service
+from .holds import SLOT_HOLD_TTL, bookable_slots, hold_slot, release_holds
+from .ical import feed_etag, feed_token, iter_and_cache_feed, read_feed_token
+from .matching import match_free_slots
+from .models import (
+    TEACHER_POPULARITY_ORDERING,
+    TEACHER_SOONEST_ORDERING,
+    ClassSession,
+    SessionEvent,
+    StudentProfile,
+    TeacherAvailabilitySlot,
+    TeacherDailyStats,
+    TeacherProfile,
+)
+from .prewarm import session_snapshot
+from .recommendations import recommended_teachers
+from .rooms import (
+    ROOM_SHELL_TIMEOUT,
+    issue_room_token,
+    read_room_token,
+    render_room_shell,
+    revoked_sessions,
+    room_shell_key,
+    room_token_expired,
+)
+from .tasks import enqueue
+from .weekgrid import public_week_grid, week_grid, week_start
+
+ROOM_CANCELLED_MESSAGE = "Esta sesion fue cancelada. No es posible acceder a la sala virtual."
+HASHING_BUSY_MESSAGE = "Estamos recibiendo muchos ingresos a la vez. Intenta nuevamente en unos segundos."
+HASHING_RETRY_AFTER = 5
 
 
 class LandingPageView(TemplateView):
@@ -33,30 +98,56 @@ class HomeView(LoginRequiredMixin, TemplateView):
     template_name = "home.html"
     login_url = reverse_lazy("accounts:login")
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        if user.is_student():
+            context["recommended_teachers"] = recommended_teachers(user.pk)
+        participant = participant_role(user)
+        # The template reads the same profile, so the reverse accessor's cached instance costs no extra query.
+        profile = getattr(user, f"{participant[0]}_profile", None) if participant else None
+        if profile is not None:
+            context["session_dashboard"] = session_dashboard(participant[0], profile.pk)
+        return context
+
 
-class StudentSignUpView(CreateView):
+class HashingBusyMixin:
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except HashingBusy:
+            response = HttpResponse(HASHING_BUSY_MESSAGE, status=503, content_type="text/plain; charset=utf-8")
+            response["Retry-After"] = str(HASHING_RETRY_AFTER)
+            return response
+
+
+class StudentSignUpView(HashingBusyMixin, CreateView):
     form_class = StudentSignUpForm
     template_name = "accounts/student_signup.html"
     success_url = reverse_lazy("accounts:home")
 
     def form_valid(self, form):
-        user = form.save()
+        with transaction.atomic():
+            user = form.save()
+            enqueue("notifications.welcome", user_id=user.pk)
         login(self.request, user)
         return redirect(self.success_url)
 
 
-class TeacherSignUpView(CreateView):
+class TeacherSignUpView(HashingBusyMixin, CreateView):
     form_class = TeacherSignUpForm
     template_name = "accounts/teacher_signup.html"
     success_url = reverse_lazy("accounts:home")
 
     def form_valid(self, form):
-        user = form.save()
+        with transaction.atomic():
+            user = form.save()
+            enqueue("notifications.welcome", user_id=user.pk)
         login(self.request, user)
         return redirect(self.success_url)
 
 
-class CustomLoginView(LoginView):
+class CustomLoginView(HashingBusyMixin, LoginView):
     authentication_form = BootstrapAuthenticationForm
     template_name = "registration/login.html"
 
@@ -132,15 +223,18 @@ class TeacherSearchView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         form = TeacherSearchForm(self.request.GET or None)
-        teachers_queryset = (
-            TeacherProfile.objects.select_related("user")
-            .order_by("user__first_name", "user__last_name")
-        )
+        teachers_queryset = TeacherProfile.objects.order_by("display_name")
         applied_filters = False
 
         if form.is_valid():
             subject = form.cleaned_data.get("subject")
             availability = form.cleaned_data.get("availability")
+            ordering = form.cleaned_data.get("ordering")
+
+            if ordering == "popular":
+                teachers_queryset = teachers_queryset.order_by(*TEACHER_POPULARITY_ORDERING)
+            elif ordering == "soonest":
+                teachers_queryset = teachers_queryset.order_by(*TEACHER_SOONEST_ORDERING)
 
             if subject:
                 teachers_queryset = teachers_queryset.filter(subjects__icontains=subject)
@@ -186,7 +280,8 @@ class TeacherProfileDetailView(LoginRequiredMixin, DetailView):
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
-        teacher_name = self.object.user.get_full_name() or self.object.user.username
+        teacher_name = self.object.display_name
+        enqueue("notifications.teacher_selected", student_user_id=request.user.pk, teacher_id=self.object.pk)
         messages.success(
             request,
             f"Has seleccionado a {teacher_name}. Te enviaremos los siguientes pasos a tu correo.",
@@ -195,13 +290,137 @@ class TeacherProfileDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        available_slots = self.object.upcoming_available_slots()
+        available_slots, has_more_slots = self.object.next_free_slots()
         context["availability_labels"] = self.object.availability_labels()
-        context["available_slots"] = available_slots[:10]
-        context["has_more_slots"] = available_slots.count() > 10
+        context["available_slots"] = available_slots
+        context["has_more_slots"] = has_more_slots
         return context
 
 
+class WeekGridMixin:
+    def can_view_week(self, teacher_id) -> bool:
+        user = self.request.user
+        if user.is_student():
+            return True
+        profile = getattr(user, "teacher_profile", None) if user.is_teacher() else None
+        return profile is not None and profile.pk == teacher_id
+
+    def get_week_start(self):
+        raw = self.request.GET.get("semana")
+        if raw:
+            try:
+                return week_start(date.fromisoformat(raw))
+            except ValueError:
+                pass
+        return week_start(timezone.localdate())
+
+    def get_week_grid(self, teacher_id, monday):
+        grid = week_grid(teacher_id, monday)
+        if self.request.user.is_student():
+            return public_week_grid(grid)
+        return grid
+
+
+class TeacherWeekView(LoginRequiredMixin, WeekGridMixin, TemplateView):
+    template_name = "accounts/teacher_week.html"
+    login_url = reverse_lazy("accounts:login")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not self.can_view_week(kwargs["pk"]):
+            messages.info(request, "Solo puedes consultar tu propio calendario semanal.")
+            return redirect("accounts:home")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        teacher = get_object_or_404(TeacherProfile, pk=self.kwargs["pk"])
+        monday = self.get_week_start()
+        grid = self.get_week_grid(teacher.pk, monday)
+        context.update(
+            {
+                "teacher": teacher,
+                "week_start": monday,
+                "week_end": monday + timedelta(days=6),
+                "previous_week": (monday - timedelta(days=7)).isoformat(),
+                "next_week": (monday + timedelta(days=7)).isoformat(),
+                "days": [date.fromisoformat(day["date"]) for day in grid["days"]],
+                "hour_rows": [
+                    (hour, [day["hours"][hour] for day in grid["days"]]) for hour in range(24)
+                ],
+            }
+        )
+        return context
+
+
+def book_session(form, student_profile, actor):
+    with transaction.atomic():
+        session = form.save()
+        release_holds(student_profile)
+        record_session_event(session, SessionEvent.Kind.BOOKED, actor=actor)
+        enqueue("notifications.session_booked", session_id=session.pk)
+    return session
+
+
+class AvailableTeacherSearchView(LoginRequiredMixin, TemplateView):
+    template_name = "accounts/available_teachers.html"
+    login_url = reverse_lazy("accounts:login")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not request.user.is_student():
+            messages.info(request, "Solo los alumnos pueden buscar profesores.")
+            return redirect("accounts:home")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = AvailableTeacherSearchForm(self.request.GET or None)
+        matches = None
+        if form.is_valid():
+            student_profile, _ = StudentProfile.objects.get_or_create(user=self.request.user)
+            matches = match_free_slots(
+                form.cleaned_data["subject"],
+                form.cleaned_data["desired_start"],
+                form.cleaned_data["flexibility_delta"],
+                student_profile,
+                ordering=form.cleaned_data["ordering"],
+            )
+        context.update({"form": form, "matches": matches, "search_query": self.request.GET.urlencode()})
+        return context
+
+
+class QuickBookView(LoginRequiredMixin, View):
+    http_method_names = ["post"]
+    login_url = reverse_lazy("accounts:login")
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_student():
+            messages.info(request, "Solo los alumnos pueden programar sesiones en linea.")
+            return redirect("accounts:home")
+        slot = get_object_or_404(TeacherAvailabilitySlot.objects.select_related("teacher"), pk=kwargs["slot_pk"])
+        student_profile, _ = StudentProfile.objects.get_or_create(user=request.user)
+        form = ClassSessionScheduleForm(
+            data={"topic": request.POST.get("topic", ""), "description": "", "slot": slot.pk},
+            teacher=slot.teacher,
+            student=student_profile,
+        )
+        if form.is_valid():
+            try:
+                session = book_session(form, student_profile, request.user)
+            except ValidationError:
+                pass
+            else:
+                messages.success(
+                    request,
+                    "Tu clase se programo correctamente. Puedes acceder a los detalles desde tus sesiones.",
+                )
+                return redirect("accounts:session_detail", pk=session.pk)
+
+        messages.error(request, "El horario ya no esta disponible. Elige otro profesor u horario.")
+        search_url = reverse("accounts:available_teachers")
+        search_query = request.POST.get("search_query", "")
+        return redirect(f"{search_url}?{search_query}" if search_query else search_url)
+
+
 class ClassSessionCreateView(LoginRequiredMixin, FormView):
     template_name = "accounts/class_session_form.html"
     form_class = ClassSessionScheduleForm
@@ -211,9 +430,7 @@ class ClassSessionCreateView(LoginRequiredMixin, FormView):
         if not request.user.is_student():
             messages.info(request, "Solo los alumnos pueden programar sesiones en linea.")
             return redirect("accounts:home")
-        self.teacher_profile = get_object_or_404(
-            TeacherProfile.objects.select_related("user"), pk=kwargs["teacher_pk"]
-        )
+        self.teacher_profile = get_object_or_404(TeacherProfile, pk=kwargs["teacher_pk"])
         self.student_profile, _ = StudentProfile.objects.get_or_create(user=request.user)
         self._form_error_reported = False
         if request.method == "GET" and not self._teacher_has_available_slots():
@@ -236,13 +453,15 @@ class ClassSessionCreateView(LoginRequiredMixin, FormView):
             {
                 "teacher": self.teacher_profile,
                 "available_slots": self.teacher_profile.upcoming_available_slots(),
+                "slots_version": slots_version(self.teacher_profile.pk),
+                "slot_poll_delay_ms": SlotAvailabilityView.client_poll_delay_ms(),
             }
         )
         return context
 
     def form_valid(self, form):
         try:
-            session = form.save()
+            session = book_session(form, self.student_profile, self.request.user)
         except ValidationError as exc:
             for field, errors in exc.message_dict.items():
                 target_field = field if field in form.fields else None
@@ -266,52 +485,242 @@ class ClassSessionCreateView(LoginRequiredMixin, FormView):
         return super().form_invalid(form)
 
     def _teacher_has_available_slots(self) -> bool:
-        return self.teacher_profile.upcoming_available_slots().exists()
+        available_slots, _ = self.teacher_profile.next_free_slots()
+        return bool(available_slots)
+
+
+def booking_access_error(user):
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Autenticacion requerida."}, status=401)
+    if not user.is_student():
+        return JsonResponse({"error": "Solo disponible para alumnos."}, status=403)
+    return None
+
+
+class BookingSlotsMixin:
+    def dispatch(self, request, *args, **kwargs):
+        error = booking_access_error(request.user)
+        if error is not None:
+            return error
+        self.teacher_profile = get_object_or_404(TeacherProfile, pk=kwargs["teacher_pk"])
+        self.student_profile, _ = StudentProfile.objects.get_or_create(user=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class SlotAvailabilityView(View):
+    http_method_names = ["get"]
+    poll_timeout = 25.0
+    poll_interval = 0.5
+    short_poll_seconds = 5
+
+    @classmethod
+    def client_poll_delay_ms(cls) -> int:
+        return 0 if settings.SESSION_STATUS_STREAM else cls.short_poll_seconds * 1000
+
+    def get_poll_timeout(self) -> float:
+        # Waiting only pays off under ASGI; under WSGI a held request pins a worker thread.
+        return self.poll_timeout if settings.SESSION_STATUS_STREAM else 0
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        error = booking_access_error(user)
+        if error is not None:
+            return error
+        teacher = await TeacherProfile.objects.filter(pk=kwargs["teacher_pk"]).afirst()
+        if teacher is None:
+            raise Http404("Profesor no encontrado.")
+        student = await StudentProfile.objects.filter(user=user).afirst()
+        if student is None:
+            return JsonResponse({"error": "Completa tu perfil de alumno."}, status=403)
+
+        known_version = request.GET.get("version", "")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.get_poll_timeout()
+        version = await aslots_version(teacher.pk)
+        while str(version) == known_version and loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            version = await aslots_version(teacher.pk)
+
+        if str(version) == known_version:
+            return JsonResponse({"version": version, "changed": False})
+        slots = [
+            {"id": slot.pk, "label": ClassSessionScheduleForm.format_slot_label(slot)}
+            async for slot in bookable_slots(teacher, student)
+        ]
+        return JsonResponse({"version": version, "changed": True, "slots": slots})
+
+
+class SlotHoldView(BookingSlotsMixin, View):
+    def post(self, request, *args, **kwargs):
+        slot = bookable_slots(self.teacher_profile, self.student_profile).filter(pk=kwargs["slot_pk"]).first()
+        hold = hold_slot(slot, self.student_profile) if slot is not None else None
+        if hold is None:
+            return JsonResponse(
+                {"held": False, "error": "El horario ya no esta disponible. Selecciona otro horario."},
+                status=409,
+            )
+        return JsonResponse(
+            {"held": True, "expires_at": hold.expires_at, "ttl": int(SLOT_HOLD_TTL.total_seconds())}
+        )
 
 
 class ClassSessionListView(LoginRequiredMixin, TemplateView):
     template_name = "accounts/class_session_list.html"
     login_url = reverse_lazy("accounts:login")
 
-    def get_queryset(self):
+    past_sessions_limit = 6
+
+    def get_participant_filter(self):
         user = self.request.user
-        base_qs = ClassSession.objects.select_related("teacher__user", "student__user")
         if user.is_student():
-            return base_qs.filter(student__user=user)
+            return Q(student__user=user)
         if user.is_teacher():
-            return base_qs.filter(teacher__user=user)
-        return base_qs.none()
+            return Q(teacher__user=user)
+        return None
+
+    def get_queryset(self):
+        participant_filter = self.get_participant_filter()
+        base_qs = ClassSession.objects.select_related("teacher", "student")
+        if participant_filter is None:
+            return base_qs.none()
+        return base_qs.filter(participant_filter)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         now = timezone.now()
-        sessions_qs = self.get_queryset()
-        upcoming_sessions = sessions_qs.filter(
+        upcoming_sessions = self.get_queryset().filter(
             status=ClassSession.Status.SCHEDULED,
             start_time__gte=now,
         ).order_by("start_time")
-        past_sessions = sessions_qs.exclude(
-            Q(status=ClassSession.Status.SCHEDULED) & Q(start_time__gte=now)
-        ).order_by("-start_time")
+        participant_filter = self.get_participant_filter()
+        role, profile_id = self._participant_profile()
         context.update(
             {
                 "upcoming_sessions": upcoming_sessions,
-                "past_sessions": past_sessions,
+                "past_sessions": (
+                    past_sessions(participant_filter, now, self.past_sessions_limit)
+                    if participant_filter is not None
+                    else []
+                ),
+                "calendar_feed_url": self._calendar_feed_url(role, profile_id),
+                "session_feed_position": feed_position(role, profile_id) if profile_id is not None else None,
+                "session_stream_enabled": settings.SESSION_STATUS_STREAM,
+                "session_list_refresh_seconds": settings.SESSION_LIST_REFRESH_SECONDS,
                 "is_student": self.request.user.is_student(),
                 "is_teacher": self.request.user.is_teacher(),
             }
         )
         return context
 
+    def _participant_profile(self):
+        participant = participant_role(self.request.user)
+        if participant is None:
+            return None, None
+        role, profile_model = participant
+        return role, profile_model.objects.filter(user=self.request.user).values_list("pk", flat=True).first()
+
+    def _calendar_feed_url(self, role, profile_id):
+        if profile_id is None:
+            return None
+        feed_url = reverse("accounts:calendar_feed", kwargs={"token": feed_token(role, profile_id)})
+        return self.request.build_absolute_uri(feed_url)
+
+
+def participant_role(user):
+    if user.is_student():
+        return "student", StudentProfile
+    if user.is_teacher():
+        return "teacher", TeacherProfile
+    return None
+
+
+class SessionStatusStreamView(View):
+    http_method_names = ["get"]
+    poll_interval = 1.0
+    keepalive_interval = 15.0
+    stream_timeout = 300.0
+    retry_milliseconds = 3000
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"error": "Autenticacion requerida."}, status=401)
+        participant = participant_role(user)
+        profile_id = None
+        if participant is not None:
+            role, profile_model = participant
+            profile_id = await profile_model.objects.filter(user=user).values_list("pk", flat=True).afirst()
+        if profile_id is None:
+            return JsonResponse({"error": "Solo disponible para alumnos y profesores."}, status=403)
+
+        last_seen = request.headers.get("Last-Event-ID") or request.GET.get("since", "")
+        response = StreamingHttpResponse(
+            self.stream(role, profile_id, int(last_seen) if last_seen.isdigit() else None),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
 
-class ClassSessionDetailView(LoginRequiredMixin, DetailView):
+    async def stream(self, role, profile_id, last_seen):
+        if last_seen is None:
+            last_seen = await afeed_position(role, profile_id)
+        yield f"retry: {self.retry_milliseconds}\n\n"
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.stream_timeout
+        last_write = loop.time()
+        while True:
+            position, changes = await aread_changes(role, profile_id, last_seen)
+            if changes is None:
+                yield self.event("reset", {"seq": position}, position)
+            for change in changes or ():
+                yield self.event("status", change, change["seq"])
+            if position != last_seen:
+                last_seen = position
+                last_write = loop.time()
+
+            if loop.time() >= deadline:
+                # An id-only frame moves Last-Event-ID forward so the reconnect resumes from here.
+                yield f"id: {last_seen}\n\n"
+                return
+            if loop.time() - last_write >= self.keepalive_interval:
+                yield f": keepalive\nid: {last_seen}\n\n"
+                last_write = loop.time()
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def event(kind, data, event_id):
+        return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+class ParticipantSessionMixin:
+    def is_participant(self, session) -> bool:
+        user = self.request.user
+        if user.is_student():
+            return session.student.user_id == user.pk
+        if user.is_teacher():
+            return session.teacher.user_id == user.pk
+        return False
+
+    def get_object(self, queryset=None):
+        # Reads come from a shared snapshot so the top-of-hour rush costs one query per session.
+        if self.request.method not in ("GET", "HEAD"):
+            return super().get_object(queryset)
+        session = session_snapshot(self.kwargs["pk"])
+        if session is None or not self.is_participant(session):
+            raise Http404("Sesion no encontrada.")
+        return session
+
+
+class ClassSessionDetailView(LoginRequiredMixin, ParticipantSessionMixin, DetailView):
     model = ClassSession
     template_name = "accounts/class_session_detail.html"
     context_object_name = "session"
     login_url = reverse_lazy("accounts:login")
 
     def get_queryset(self):
-        base_qs = super().get_queryset().select_related("teacher__user", "student__user")
+        base_qs = super().get_queryset().select_related("teacher", "student")
         user = self.request.user
         if user.is_student():
             return base_qs.filter(student__user=user)
@@ -328,9 +737,17 @@ class ClassSessionDetailView(LoginRequiredMixin, DetailView):
             messages.error(request, "No tienes permisos para modificar esta sesion.")
             return redirect("accounts:session_detail", pk=self.object.pk)
 
+        previous_status = self.object.status
         form = ClassSessionStatusForm(data=request.POST, instance=self.object)
         if form.is_valid():
-            updated_session = form.save()
+            with transaction.atomic():
+                updated_session = form.save()
+                record_status_change(updated_session, previous_status, actor=request.user)
+                if (
+                    updated_session.status == ClassSession.Status.CANCELLED
+                    and previous_status != ClassSession.Status.CANCELLED
+                ):
+                    enqueue("notifications.session_cancelled", session_id=updated_session.pk)
             status_label = updated_session.get_status_display()
             messages.success(request, f"El estado de la sesion se actualizo a '{status_label}'.")
             return redirect("accounts:session_detail", pk=updated_session.pk)
@@ -342,6 +759,7 @@ class ClassSessionDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         session = self.object
         can_manage_status = self.request.user.is_teacher() and session.teacher.user_id == self.request.user.id
+        can_join_room = session.status == ClassSession.Status.SCHEDULED
         status_form = kwargs.get("status_form")
         if status_form is None and can_manage_status:
             status_form = ClassSessionStatusForm(instance=session)
@@ -349,49 +767,277 @@ class ClassSessionDetailView(LoginRequiredMixin, DetailView):
             {
                 "status_form": status_form,
                 "can_manage_status": can_manage_status,
-                "can_join_room": session.status == ClassSession.Status.SCHEDULED,
+                "can_join_room": can_join_room,
+                "room_join_url": self._room_join_url() if can_join_room else None,
                 "start_time_local": timezone.localtime(session.start_time),
                 "end_time_local": timezone.localtime(session.end_time),
             }
         )
         return context
 
+    def _room_join_url(self):
+        role, _ = participant_role(self.request.user)
+        return reverse("accounts:room_join", kwargs={"token": issue_room_token(self.object, role)})
 
-class ClassSessionRoomView(LoginRequiredMixin, DetailView):
+
+class ClassSessionRoomView(LoginRequiredMixin, ParticipantSessionMixin, DetailView):
     model = ClassSession
-    template_name = "accounts/class_session_room.html"
-    context_object_name = "session"
     login_url = reverse_lazy("accounts:login")
 
-    def get_queryset(self):
-        base_qs = super().get_queryset().select_related("teacher__user", "student__user")
-        user = self.request.user
-        if user.is_student():
-            return base_qs.filter(student__user=user)
-        if user.is_teacher():
-            return base_qs.filter(teacher__user=user)
-        return base_qs.none()
-
-    def dispatch(self, request, *args, **kwargs):
-        response = super().dispatch(request, *args, **kwargs)
-        session = self.object
+    def get(self, request, *args, **kwargs):
+        session = self.get_object()
         if session.status == ClassSession.Status.CANCELLED:
-            messages.error(request, "Esta sesion fue cancelada. No es posible acceder a la sala virtual.")
+            messages.error(request, ROOM_CANCELLED_MESSAGE)
             return redirect("accounts:session_detail", pk=session.pk)
+        role, _ = participant_role(request.user)
+        return redirect("accounts:room_join", token=issue_room_token(session, role))
+
+
+class RoomJoinView(View):
+    http_method_names = ["get"]
+
+    async def get(self, request, token, *args, **kwargs):
+        payload = read_room_token(token)
+        if payload is None:
+            raise Http404("Enlace de sala invalido.")
+        if room_token_expired(payload):
+            messages.info(request, "El enlace de la sala vencio. Vuelve a entrar desde el detalle de la sesion.")
+            return redirect("accounts:session_detail", pk=payload["session"])
+
+        if revoked_sessions.is_stale():
+            await sync_to_async(revoked_sessions.refresh)()
+        if payload["session"] in revoked_sessions:
+            messages.error(request, ROOM_CANCELLED_MESSAGE)
+            return redirect("accounts:session_detail", pk=payload["session"])
+
+        shell_key = room_shell_key(payload)
+        shell = await cache.aget(shell_key)
+        if shell is None:
+            shell = render_room_shell(payload)
+            await cache.aset(shell_key, shell, ROOM_SHELL_TIMEOUT)
+        response = HttpResponse(shell)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class StaffOnlyMixin(LoginRequiredMixin):
+    login_url = reverse_lazy("accounts:login")
+    staff_only_message = "Solo el equipo de ClasesYa puede acceder a esta seccion."
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not request.user.is_staff:
+            messages.info(request, self.staff_only_message)
+            return redirect("accounts:home")
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ExportView(StaffOnlyMixin, View):
+    staff_only_message = "Solo el equipo de ClasesYa puede descargar exportaciones."
+    kind = None
+    filename_prefix = None
+
+    def get(self, request, *args, **kwargs):
+        form = ExportFilterForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text(), content_type="text/plain; charset=utf-8")
+
+        output_format = form.cleaned_data["format"]
+        compress = form.cleaned_data["gzip"]
+        content = stream_export(
+            self.kind,
+            output_format,
+            compress,
+            date_from=form.cleaned_data["date_from"],
+            date_to=form.cleaned_data["date_to"],
+            teacher_id=form.cleaned_data["teacher"],
+        )
+        if compress:
+            content_type = "application/gzip"
+        elif output_format == "csv":
+            content_type = "text/csv; charset=utf-8"
+        else:
+            content_type = "application/x-ndjson; charset=utf-8"
+
+        filename = f"{self.filename_prefix}-{timezone.localdate():%Y%m%d}.{output_format}"
+        if compress:
+            filename += ".gz"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
+
+class CalendarFeedView(View):
+    content_type = "text/calendar; charset=utf-8"
+
+    def get(self, request, token, *args, **kwargs):
+        feed = read_feed_token(token)
+        if feed is None:
+            raise Http404("Calendario no encontrado.")
+        role, profile_id = feed
+        today = timezone.localdate()
+
+        cached = cache.get(calendar_feed_key(role, profile_id, today))
+        if cached is not None:
+            etag, body = cached
+        else:
+            etag, body = feed_etag(role, profile_id, today), None
+
+        not_modified = get_conditional_response(request, etag=quote_etag(etag))
+        if not_modified is not None:
+            return not_modified
+
+        if body is not None:
+            response = HttpResponse(body, content_type=self.content_type)
+        else:
+            response = StreamingHttpResponse(
+                iter_and_cache_feed(role, profile_id, today, etag),
+                content_type=self.content_type,
+            )
+        response["ETag"] = quote_etag(etag)
+        response["Cache-Control"] = "private, max-age=300"
+        response["Content-Disposition"] = 'inline; filename="clasesya.ics"'
+        return response
+
+
+class HashingMetricsView(StaffOnlyMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(hashing_service.metrics())
+
+
+class TeacherStatsView(StaffOnlyMixin, TemplateView):
+    template_name = "accounts/teacher_stats.html"
+    default_days = 30
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        session = self.object
-        parsed_url = urlparse(session.virtual_room_url)
-        room_name = parsed_url.path.strip("/")
+        today = timezone.localdate()
+        form = TeacherStatsFilterForm(self.request.GET or None)
+        date_from = today - timedelta(days=self.default_days - 1)
+        date_to = today
+        if form.is_valid():
+            date_from = form.cleaned_data["date_from"] or date_from
+            date_to = form.cleaned_data["date_to"] or date_to
+
+        counters = {
+            "slots_offered": Sum("slots_offered"),
+            "slots_booked": Sum("slots_booked"),
+            "sessions_completed": Sum("sessions_completed"),
+            "sessions_cancelled": Sum("sessions_cancelled"),
+            "revenue": Sum("revenue"),
+        }
+        stats = TeacherDailyStats.objects.filter(day__gte=date_from, day__lte=date_to)
+        teacher_rows = list(
+            stats.values(
+                "teacher_id",
+                "teacher__display_name",
+            )
+            .annotate(**counters)
+            .order_by("-revenue", "teacher_id")
+        )
+        totals = stats.aggregate(**counters)
+        for row in [*teacher_rows, totals]:
+            offered = row["slots_offered"] or 0
+            row["utilization"] = round(100 * (row["slots_booked"] or 0) / offered) if offered else None
+
         context.update(
             {
-                "room_domain": parsed_url.netloc,
-                "room_name": room_name,
-                "start_time_local": timezone.localtime(session.start_time),
-                "end_time_local": timezone.localtime(session.end_time),
-                "is_in_future": session.start_time > timezone.now(),
+                "form": form,
+                "date_from": date_from,
+                "date_to": date_to,
+                "teacher_rows": teacher_rows,
+                "totals": totals,
             }
         )
         return context
+
+
+class ApiView(View):
+    http_method_names = ["get", "head", "options"]
+    students_only = False
+    available_fields = {}
+    default_fields = ()
+    ordering = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Autenticacion requerida."}, status=401)
+        if self.students_only and not request.user.is_student():
+            return JsonResponse({"error": "Solo disponible para alumnos."}, status=403)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": error.message}, status=error.status)
+
+    def get(self, request, *args, **kwargs):
+        fields = parse_fields(request.GET, self.available_fields, self.default_fields)
+        payload = paginate(self.get_queryset(), self.available_fields, fields, self.ordering, request.GET)
+        return self.render_payload(payload)
+
+    def render_payload(self, payload):
+        body, etag = render_payload(payload)
+        not_modified = get_conditional_response(self.request, etag=quote_etag(etag))
+        if not_modified is None:
+            response = HttpResponse(body, content_type="application/json")
+        else:
+            response = not_modified
+        response["ETag"] = quote_etag(etag)
+        response["Cache-Control"] = "private, no-cache"
+        response["Vary"] = "Cookie"
+        return response
+
+
+class TeacherSearchApiView(ApiView):
+    students_only = True
+    available_fields = TEACHER_FIELDS
+    default_fields = TEACHER_DEFAULT_FIELDS
+    ordering = TEACHER_ORDERING
+
+    def get_queryset(self):
+        form = TeacherSearchForm(self.request.GET)
+        if not form.is_valid():
+            raise ApiError(form.errors.as_text())
+        return teacher_search_queryset(form.cleaned_data["subject"], form.cleaned_data["availability"])
+
+
+class TeacherSlotsApiView(ApiView):
+    students_only = True
+    available_fields = SLOT_FIELDS
+    default_fields = SLOT_DEFAULT_FIELDS
+    ordering = SLOT_ORDERING
+
+    def get_queryset(self):
+        if not TeacherProfile.objects.filter(pk=self.kwargs["pk"]).exists():
+            raise ApiError("Profesor no encontrado.", status=404)
+        return free_slots_queryset(self.kwargs["pk"])
+
+
+class TeacherWeekApiView(WeekGridMixin, ApiView):
+    def get(self, request, *args, **kwargs):
+        if not self.can_view_week(kwargs["pk"]):
+            raise ApiError("Solo puedes consultar tu propio calendario semanal.", status=403)
+        if not TeacherProfile.objects.filter(pk=kwargs["pk"]).exists():
+            raise ApiError("Profesor no encontrado.", status=404)
+        return self.render_payload(self.get_week_grid(kwargs["pk"], self.get_week_start()))
+
+
+class SessionApiView(ApiView):
+    available_fields = SESSION_FIELDS
+    default_fields = SESSION_DEFAULT_FIELDS
+    ordering = SESSION_ORDERING
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_student():
+            queryset = ClassSession.objects.filter(student__user=user)
+        elif user.is_teacher():
+            queryset = ClassSession.objects.filter(teacher__user=user)
+        else:
+            queryset = ClassSession.objects.none()
+        status = self.request.GET.get("status")
+        if status:
+            if status not in ClassSession.Status.values:
+                raise ApiError(f"Estado desconocido: {status}.")
+            queryset = queryset.filter(status=status)
+        return queryset
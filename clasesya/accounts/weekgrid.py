@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import WEEK_GRID_TIMEOUT, slots_version, week_grid_key
+from .models import ClassSession, TeacherAvailabilitySlot
+
+DAYS_PER_WEEK = 7
+HOURS_PER_DAY = 24
+SESSION_CELL_STATES = {
+    ClassSession.Status.SCHEDULED: "booked",
+    ClassSession.Status.COMPLETED: "completed",
+}
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _week_bounds(monday):
+    start = timezone.make_aware(datetime.combine(monday, time.min))
+    end = timezone.make_aware(datetime.combine(monday + timedelta(days=DAYS_PER_WEEK), time.min))
+    return start, end
+
+
+def _cell(grid, monday, start_time):
+    local = timezone.localtime(start_time)
+    day_index = (local.date() - monday).days
+    if not 0 <= day_index < DAYS_PER_WEEK:
+        return None
+    return grid[day_index]["hours"][local.hour]
+
+
+def build_week_grid(teacher_id, monday) -> dict:
+    start, end = _week_bounds(monday)
+    slots = TeacherAvailabilitySlot.objects.filter(
+        teacher_id=teacher_id,
+        start_time__gte=start,
+        start_time__lt=end,
+    ).values_list("pk", "start_time", "is_active")
+    sessions = ClassSession.objects.filter(
+        teacher_id=teacher_id,
+        start_time__gte=start,
+        start_time__lt=end,
+        status__in=SESSION_CELL_STATES,
+    ).values_list("pk", "start_time", "status", "slot_id")
+
+    grid = [
+        {
+            "date": (monday + timedelta(days=day)).isoformat(),
+            "hours": [{"state": "empty", "slot_id": None, "session_id": None} for _ in range(HOURS_PER_DAY)],
+        }
+        for day in range(DAYS_PER_WEEK)
+    ]
+    for slot_id, start_time, is_active in slots:
+        cell = _cell(grid, monday, start_time)
+        if cell is not None:
+            cell.update(state="free" if is_active else "inactive", slot_id=slot_id)
+    for session_id, start_time, status, slot_id in sessions:
+        cell = _cell(grid, monday, start_time)
+        if cell is not None:
+            cell.update(state=SESSION_CELL_STATES[status], slot_id=slot_id, session_id=session_id)
+    return {"teacher_id": teacher_id, "week_start": monday.isoformat(), "days": grid}
+
+
+def week_grid(teacher_id, monday) -> dict:
+    # The key carries the teacher's slot version, which every slot or session write already bumps on commit.
+    key = week_grid_key(teacher_id, monday, slots_version(teacher_id))
+    grid = cache.get(key)
+    if grid is None:
+        grid = build_week_grid(teacher_id, monday)
+        cache.set(key, grid, WEEK_GRID_TIMEOUT)
+    return grid
+
+
+def public_week_grid(grid) -> dict:
+    return {
+        **grid,
+        "days": [
+            {**day, "hours": [{**cell, "session_id": None} for cell in day["hours"]]}
+            for day in grid["days"]
+        ],
+    }
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +32,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -45,8 +47,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.middleware.SessionEventBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'clasesya.urls'
@@ -68,6 +72,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'clasesya.wsgi.application'
+ASGI_APPLICATION = 'clasesya.asgi.application'
 
 
 # Database
@@ -81,6 +86,48 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Multi-process deployments should point this to a shared backend (Redis, Memcached).
+
+_cache_backend = os.environ.get('CLASESYA_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('CLASESYA_CACHE_LOCATION', 'clasesya'),
+    }
+}
+if _cache_backend.endswith('.LocMemCache'):
+    # The default of 300 entries is culled by a single class hour worth of sessions, snapshots and room pages.
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CLASESYA_CACHE_MAX_ENTRIES', '20000'))}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/#configuring-the-session-engine
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+_session_engine = os.environ.get('CLASESYA_SESSION_ENGINE', 'cached_db')
+SESSION_ENGINE = SESSION_ENGINES.get(_session_engine, _session_engine)
+
+# Flash messages travel in their own cookie so POST-redirect flows don't write the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
+# Email
+# https://docs.djangoproject.com/en/5.1/topics/email/
+# Notifications are sent by the background worker (manage.py run_tasks), never during the request.
+
+EMAIL_BACKEND = os.environ.get('CLASESYA_EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'tmp' / 'emails'
+DEFAULT_FROM_EMAIL = 'ClasesYa <no-reply@clasesya.local>'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -99,6 +146,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ['accounts.backends.PooledHashingBackend']
+
+# Password hashing for login and signup runs on a bounded process pool (0 workers hashes inline).
+AUTH_HASHING_WORKERS = int(os.environ.get('CLASESYA_AUTH_HASHING_WORKERS', '2'))
+AUTH_HASHING_MAX_PENDING = int(os.environ.get('CLASESYA_AUTH_HASHING_MAX_PENDING', '32'))
+AUTH_HASHING_WAIT_SECONDS = float(os.environ.get('CLASESYA_AUTH_HASHING_WAIT_SECONDS', '5'))
+
+# Held connections (the "Mis sesiones" stream and the slot availability long-poll) need an ASGI server;
+# under WSGI the pages fall back to periodic refreshes and short polls instead.
+SESSION_STATUS_STREAM = os.environ.get('CLASESYA_SESSION_STATUS_STREAM', '0') == '1'
+SESSION_LIST_REFRESH_SECONDS = int(os.environ.get('CLASESYA_SESSION_LIST_REFRESH_SECONDS', '60'))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/